@@ -0,0 +1,65 @@
+"""
+Configuración de Gunicorn para producción (ECS Fargate)
+Uso: gunicorn -c gunicorn.conf.py
+
+Variante asyncio (Quart):
+  APP_MODULE=main_async:app GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker
+"""
+import multiprocessing
+import os
+import shutil
+
+wsgi_app = os.getenv('APP_MODULE', 'main:app')
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# Procesos pre-fork con hilos: las peticiones pasan casi todo el tiempo
+# esperando a DynamoDB, así que varios hilos por worker aprovechan la CPU.
+# Con el worker de uvicorn los hilos no se usan (un event loop por worker)
+workers = int(os.getenv('WEB_CONCURRENCY', max(2, multiprocessing.cpu_count() * 2)))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+# La caché de notas (shared/cache.py) es de cada worker: una escritura en
+# uno no invalida la de los demás, que seguirían sirviendo (y dando 304 con)
+# la nota anterior. Con varios workers se desactiva aunque se haya pedido.
+# Los workers heredan el entorno al arrancar.
+if workers > 1 and float(os.getenv('NOTE_CACHE_TTL', '0')) > 0:
+    print(f"NOTE_CACHE_TTL ignorado: la caché de notas no es coherente entre {workers} workers")
+    os.environ['NOTE_CACHE_TTL'] = '0'
+
+# El idle timeout del NLB es de 350 s: el servidor no debe cerrar antes
+# conexiones keep-alive que el balanceador sigue considerando abiertas
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '360'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+
+# Con SIGTERM (ECS al parar la tarea) se dejan terminar las peticiones en
+# curso; debe ser menor que el stopTimeout del contenedor (30 s)
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '25'))
+
+# Reciclar workers de vez en cuando para acotar el crecimiento de memoria
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+# Heartbeat de workers en memoria (evita bloqueos en el disco de Fargate)
+worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Métricas de Prometheus (GET /metrics) agregadas entre workers: cada
+# proceso escribe sus valores en este directorio, que se vacía al arrancar
+# para no mezclar los de una ejecución anterior
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/dev/shm/prometheus')
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Los gauges del worker que termina dejan de contar
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -2,137 +2,318 @@
 API REST de Notas con Flask - Versión todo-en-uno
 """
 import os
-import uuid
+import sys
+import time
 from datetime import datetime
-from typing import List, Dict, Optional
-from flask import Flask, request, jsonify
+from itertools import chain
+from typing import List, Dict, Optional, Iterator
+from flask import Flask, Response, g, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from pydantic import BaseModel, Field, field_validator
-import boto3
 from botocore.exceptions import ClientError
 
-# ============= MODELOS PYDANTIC =============
-
-class NoteCreate(BaseModel):
-    title: str = Field(..., min_length=1, max_length=200)
-    content: str = Field(..., min_length=1, max_length=10000)
-    tags: Optional[List[str]] = Field(default_factory=list)
-
-    @field_validator('tags')
-    @classmethod
-    def validate_tags(cls, v):
-        if v is None:
-            return []
-        if len(v) > 10:
-            raise ValueError('Máximo 10 tags permitidos')
-        for tag in v:
-            if len(tag) > 50:
-                raise ValueError('Cada tag debe tener máximo 50 caracteres')
-        return v
-
-
-class NoteUpdate(BaseModel):
-    title: Optional[str] = Field(None, min_length=1, max_length=200)
-    content: Optional[str] = Field(None, min_length=1, max_length=10000)
-    tags: Optional[List[str]] = None
-
-    @field_validator('tags')
-    @classmethod
-    def validate_tags(cls, v):
-        if v is None:
-            return None
-        if len(v) > 10:
-            raise ValueError('Máximo 10 tags permitidos')
-        for tag in v:
-            if len(tag) > 50:
-                raise ValueError('Cada tag debe tener máximo 50 caracteres')
-        return v
-
+# Código compartido con las Lambdas: en la imagen Docker se copia en ./shared,
+# en local se usa directamente app-lambda/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared import serializer, prometheus
+from shared.models import NoteCreate, NoteUpdate
+from shared.cache import TTLCache, MISSING
+from shared.singleflight import SingleFlight, forget_reads
+from shared.batch import create_many, get_many, delete_many, parse_note_list, parse_id_list
+from shared.storage import notes_table, index_table
+from shared.indexes import NoteIndexes
+from shared.search import parse_query, find_notes
+from shared.changes import parse_since, is_expired, list_changes
+from shared.tags import parse_tag_filter, list_by_tags
+from shared.compression import (
+    COMPRESSION_MIN_SIZE, choose_encoding, compress, iter_compress, is_compressible, weak_etag
+)
+from shared.utils import (
+    public_note, project_note, new_note_item, encode_cursor, decode_cursor, parse_limit, parse_fields,
+    note_etag, collection_etag, http_date, validator_headers, is_not_modified
+)
 
 # ============= DATABASE =============
 
-class DynamoDBDatabase:
+# Latencia y errores de cada método y llamadas a DynamoDB (GET /metrics)
+prometheus.instrument_boto3()
+
+
+@prometheus.instrument
+class NotesDatabase:
     def __init__(self):
         self.table_name = os.getenv('DB_DYNAMONAME', 'Notes')
         self.region = os.getenv('AWS_REGION', 'us-east-1')
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.region)
-        self.table = self.dynamodb.Table(self.table_name)
+        # Tabla de notas del backend de DB_TYPE (dynamodb, memory o sqlite;
+        # ver shared/storage.py)
+        self.notes = notes_table(self.table_name, region_name=self.region)
+        # Desactivada salvo NOTE_CACHE_TTL y un solo worker (gunicorn.conf.py)
+        self.cache = TTLCache()
+        # Lecturas idénticas concurrentes (misma nota, misma página) comparten
+        # una sola llamada a DynamoDB; las escrituras olvidan las que afectan
+        self.flights = SingleFlight()
+        # Índices de búsqueda y tags (tabla pk/sk aparte)
+        self.indexes = NoteIndexes(
+            index_table(os.getenv('DB_DYNAMOINDEXNAME', 'NotesIndex'), region_name=self.region)
+        )
 
-    def create_note(self, note_data: Dict) -> Dict:
-        note_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().isoformat() + 'Z'
-        
-        item = {
-            'note_id': note_id,
-            'title': note_data['title'],
-            'content': note_data['content'],
-            'tags': note_data.get('tags', []),
-            'created_at': timestamp,
-            'updated_at': timestamp
-        }
-        
-        self.table.put_item(Item=item)
-        return item
+    def _coalesce(self, operation: str, key, func):
+        value, shared = self.flights.do((operation, key), func)
+        if shared:
+            prometheus.COALESCED_REQUESTS.labels(operation).inc()
+        return value
 
-    def get_note(self, note_id: str) -> Optional[Dict]:
+    def _forget_reads(self, note_ids: List[str]) -> None:
+        """Las lecturas que empiecen después de una escritura no se unen a las de antes"""
+        forget_reads(self.flights, note_ids)
+
+    def create_note(self, note_data: Dict) -> Dict:
+        item = new_note_item(note_data)
+        self.notes.put(item)
+        self.indexes.update(None, item)
+        self._forget_reads([])
+        return public_note(item)
+
+    def batch_create(self, raw_notes: List, validate) -> List[Dict]:
+        results = create_many(self.notes, raw_notes, validate)
+        self.indexes.update_many([(None, r['note']) for r in results if r['status'] == 201])
+        self._forget_reads([])
+        return results
+
+    def batch_get(self, note_ids: List[str]) -> List[Dict]:
+        generations = {note_id: self.cache.generation(note_id) for note_id in note_ids}
+        results = get_many(self.notes, note_ids)
+        for result in results:
+            if result['status'] == 200:
+                self.cache.set(result['note_id'], result['note'], generations[result['note_id']])
+        return results
+
+    def batch_delete(self, note_ids: List[str]) -> List[Dict]:
+        for note_id in note_ids:
+            self.cache.invalidate(note_id)
+        results, deleted = delete_many(self.notes, note_ids)
+        self.indexes.update_many([(item, None) for item in deleted])
+        self._forget_reads(note_ids)
+        return results
+
+    def _fetch_note(self, note_id: str) -> Optional[Dict]:
         try:
-            response = self.table.get_item(Key={'note_id': note_id})
-            return response.get('Item')
+            item = self.notes.get(note_id)
+            return public_note(item) if item else None
         except ClientError:
             return None
 
-    def list_notes(self) -> List[Dict]:
-        try:
-            response = self.table.scan()
-            return response.get('Items', [])
-        except ClientError:
-            return []
+    def get_note(self, note_id: str) -> Optional[Dict]:
+        note = self.cache.get(note_id)
+        if note is not MISSING:
+            return note
+        # Si update_note escribe la nota durante la lectura, la lectura no
+        # pisa en caché su valor
+        generation = self.cache.generation(note_id)
+        note = self._coalesce('get_note', note_id, lambda: self._fetch_note(note_id))
+        if note:
+            self.cache.set(note_id, note, generation)
+        return note
+
+    def iter_note_pages(self, fields: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """
+        Todas las notas (solo fields, si se indican) página a página, sin
+        cargar la tabla entera en memoria
+        """
+        start_key = None
+        while True:
+            items, start_key = self.notes.query_by_date(start_key=start_key, fields=fields)
+            yield [project_note(item, fields) for item in items]
+            if not start_key:
+                return
+
+    def list_notes(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Todas las notas, de la más reciente a la más antigua"""
+        return [note for page in self.iter_note_pages(fields) for note in page]
+
+    def iter_export_pages(self, segments: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Tabla completa sin orden (en DynamoDB, scan paralelo por segmentos)"""
+        for page in self.notes.scan_pages(segments):
+            yield [public_note(item) for item in page]
+
+    def list_notes_page(self, limit: int, cursor: Optional[str] = None,
+                        fields: Optional[List[str]] = None) -> Dict:
+        """Una página de notas y el cursor para pedir la siguiente"""
+        start_key = decode_cursor(cursor) if cursor else None
+
+        def query():
+            items, last_key = self.notes.query_by_date(limit, start_key, fields)
+            return {
+                'items': [project_note(item, fields) for item in items],
+                'next_cursor': encode_cursor(last_key)
+            }
+
+        return self._coalesce('list_notes_page', (limit, cursor, tuple(fields or ())), query)
+
+    def search_notes(self, terms: List[str], limit: int) -> Dict:
+        """Notas que contienen todos los términos, por relevancia, y si la búsqueda se ha cortado"""
+        items, truncated = find_notes(self.indexes.search, self.notes, terms, limit)
+        return {'items': [public_note(item) for item in items], 'truncated': truncated}
+
+    def list_notes_by_tags(self, tags: List[str], match: str, limit: int,
+                           cursor: Optional[str] = None, fields: Optional[List[str]] = None) -> Dict:
+        """Una página de notas con los tags (todos o alguno), más recientes primero"""
+        cursor_key = decode_cursor(cursor) if cursor else None
+        items, next_key = list_by_tags(self.indexes.tags, self.notes, tags, match, limit, cursor_key, fields)
+        return {
+            'items': [project_note(item, fields) for item in items],
+            'next_cursor': encode_cursor(next_key)
+        }
+
+    def tag_counts(self) -> List[Dict]:
+        return self.indexes.tags.counts()
+
+    def list_changes(self, since: str, limit: int) -> Dict:
+        """Notas cambiadas y borradas desde la posición since"""
+        result = list_changes(self.notes, self.indexes.table, since, limit)
+        result['items'] = [public_note(item) for item in result['items']]
+        return result
+
+    def collection_version(self):
+        """(versión, fecha de la última escritura) de la colección, para los ETag"""
+        return self._coalesce('collection_version', None, self.indexes.collection_version)
 
     def update_note(self, note_id: str, updates: Dict) -> Optional[Dict]:
-        note = self.get_note(note_id)
-        if not note:
-            return None
+        values = dict(updates, updated_at=datetime.utcnow().isoformat() + 'Z')
         
-        timestamp = datetime.utcnow().isoformat() + 'Z'
-        
-        update_expr_parts = []
-        expr_attr_values = {}
-        
-        for key, value in updates.items():
-            update_expr_parts.append(f'#{key} = :{key}')
-            expr_attr_values[f':{key}'] = value
-        
-        update_expr_parts.append('#updated_at = :updated_at')
-        expr_attr_values[':updated_at'] = timestamp
-        
-        update_expression = 'SET ' + ', '.join(update_expr_parts)
-        expr_attr_names = {f'#{key}': key for key in list(updates.keys()) + ['updated_at']}
-        
-        self.table.update_item(
-            Key={'note_id': note_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expr_attr_names,
-            ExpressionAttributeValues=expr_attr_values
-        )
+        # Una sola escritura condicional: si la nota no existe falla y no se crea
+        result = self.notes.update_with_previous(note_id, values)
+        if result is None:
+            self.cache.invalidate(note_id)
+            return None
         
-        return self.get_note(note_id)
+        previous, item = result
+        self.indexes.update(previous, item)
+        self._forget_reads([note_id])
+        note = public_note(item)
+        self.cache.set(note_id, note)
+        return note
 
     def delete_note(self, note_id: str) -> bool:
-        note = self.get_note(note_id)
-        if not note:
+        self.cache.invalidate(note_id)
+        item = self.notes.delete(note_id)
+        if item is None:
             return False
-        
-        self.table.delete_item(Key={'note_id': note_id})
+        self.indexes.update(item, None)
+        self._forget_reads([note_id])
         return True
 
 
 # ============= FLASK APP =============
 
+class NotesJSONProvider(DefaultJSONProvider):
+    """jsonify y get_json con el serializador compartido con las Lambdas"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return serializer.dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+
+
 app = Flask(__name__)
-CORS(app)
+app.json = NotesJSONProvider(app)
+CORS(app, expose_headers=['ETag', 'Last-Modified'])
 
 PORT = int(os.getenv('PORT', 8080))
-db = DynamoDBDatabase()
+db = NotesDatabase()
+
+
+def stream_json_array(pages: Iterator[List[Dict]]) -> Response:
+    """
+    Respuesta JSON (array) que se envía página a página a medida que llegan
+    de DynamoDB. La primera página se pide antes de devolver la respuesta
+    para que un error inicial siga siendo un 500 normal.
+    """
+    pages = iter(pages)
+    first_page = next(pages, [])
+
+    def generate():
+        yield '['
+        separator = ''
+        for page in chain([first_page], pages):
+            if page:
+                yield separator + ','.join(app.json.dumps(note) for note in page)
+                separator = ','
+        yield ']'
+
+    return Response(generate(), status=200, mimetype='application/json')
+
+
+@app.after_request
+def compress_response(response: Response) -> Response:
+    """
+    Compresión negociada con Accept-Encoding (shared/compression.py).
+    Los listados en streaming se comprimen a medida que se generan.
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype)):
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if not encoding:
+        return response
+    if response.is_streamed:
+        response.response = iter_compress(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    if 'ETag' in response.headers:
+        response.headers['ETag'] = weak_etag(response.headers['ETag'])
+    return response
+
+
+def not_modified(validators: Dict) -> bool:
+    """True si la petición condicional coincide con ETag/Last-Modified"""
+    return is_not_modified(request.headers, validators['ETag'], validators.get('Last-Modified'))
+
+
+def collection_validators() -> Dict:
+    """
+    Cabeceras de validación de un listado: versión de la colección y
+    parámetros de la consulta. Se calculan antes de consultar las notas.
+    """
+    version, modified_at = db.collection_version()
+    params = request.args.to_dict(flat=False)
+    return validator_headers(collection_etag(version, params), http_date(modified_at))
+
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+    prometheus.REQUESTS_IN_PROGRESS.labels(request.method, g.metrics_route).inc()
+
+
+@app.after_request
+def observe_request_metrics(response: Response) -> Response:
+    # En los listados en streaming se mide hasta que empieza la respuesta
+    prometheus.REQUEST_LATENCY.labels(request.method, g.metrics_route, response.status_code).observe(
+        time.perf_counter() - g.metrics_start
+    )
+    g.metrics_observed = True
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if 'metrics_start' not in g:
+        return
+    if not g.get('metrics_observed'):
+        # Excepción sin capturar: no pasa por after_request
+        prometheus.REQUEST_LATENCY.labels(request.method, g.metrics_route, 500).observe(
+            time.perf_counter() - g.metrics_start
+        )
+    prometheus.REQUESTS_IN_PROGRESS.labels(request.method, g.metrics_route).dec()
 
 
 @app.route('/health', methods=['GET'])
@@ -140,11 +321,101 @@ def health():
     return jsonify({'status': 'healthy'}), 200
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    body, content_type = prometheus.render()
+    return Response(body, status=200, content_type=content_type)
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(dict(db.cache.stats(), singleflight=db.flights.stats())), 200
+
+
 @app.route('/notes', methods=['GET'])
 def list_notes():
     try:
-        notes = db.list_notes()
-        return jsonify(notes), 200
+        validators = collection_validators()
+        if not_modified(validators):
+            return '', 304, validators
+
+        try:
+            fields = parse_fields(request.args.get('fields'), request.args.get('view'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if 'tag' in request.args:
+            try:
+                tags, match = parse_tag_filter(request.args.getlist('tag'), request.args.get('match'))
+                limit = parse_limit(request.args.get('limit'))
+                page = db.list_notes_by_tags(tags, match, limit, request.args.get('cursor') or None, fields)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(page), 200, validators
+
+        if 'limit' in request.args or 'cursor' in request.args:
+            try:
+                limit = parse_limit(request.args.get('limit'))
+                page = db.list_notes_page(limit, request.args.get('cursor') or None, fields)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(page), 200, validators
+
+        response = stream_json_array(db.iter_note_pages(fields))
+        response.headers.update(validators)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/tags', methods=['GET'])
+def list_tags():
+    try:
+        return jsonify({'tags': db.tag_counts()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/export', methods=['GET'])
+def export_notes():
+    try:
+        segments = request.args.get('segments')
+        if segments is not None:
+            try:
+                segments = int(segments)
+            except ValueError:
+                return jsonify({'error': 'segments debe ser un número entero'}), 400
+        return stream_json_array(db.iter_export_pages(segments))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/changes', methods=['GET'])
+def list_note_changes():
+    try:
+        try:
+            since = parse_since(request.args.get('since'))
+            limit = parse_limit(request.args.get('limit'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if is_expired(since):
+            return jsonify({
+                'error': 'since es anterior a los borrados que se conservan: recarga todas las notas'
+            }), 410
+        return jsonify(db.list_changes(since, limit)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/search', methods=['GET'])
+def search_notes():
+    try:
+        try:
+            terms = parse_query(request.args.get('q'))
+            limit = parse_limit(request.args.get('limit'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(db.search_notes(terms, limit)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -152,8 +423,8 @@ def list_notes():
 @app.route('/notes', methods=['POST'])
 def create_note():
     try:
-        data = request.get_json()
-        note_data = NoteCreate(**data)
+        # Validación directa del body JSON, sin pasar por un dict
+        note_data = NoteCreate.model_validate_json(request.get_data())
         note = db.create_note(note_data.model_dump())
         return jsonify(note), 201
     except ValueError as e:
@@ -162,13 +433,53 @@ def create_note():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/notes:batch', methods=['POST'])
+def batch_create_notes():
+    try:
+        try:
+            raw_notes = parse_note_list(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        results = db.batch_create(raw_notes, lambda raw: NoteCreate.model_validate(raw).model_dump())
+        return jsonify({'results': results}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes:batchGet', methods=['POST'])
+def batch_get_notes():
+    try:
+        try:
+            note_ids = parse_id_list(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'results': db.batch_get(note_ids)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes:batchDelete', methods=['POST'])
+def batch_delete_notes():
+    try:
+        try:
+            note_ids = parse_id_list(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'results': db.batch_delete(note_ids)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/notes/<note_id>', methods=['GET'])
 def get_note(note_id):
     try:
         note = db.get_note(note_id)
         if not note:
             return jsonify({'error': 'Nota no encontrada'}), 404
-        return jsonify(note), 200
+        validators = validator_headers(note_etag(note), http_date(note.get('updated_at')))
+        if not_modified(validators):
+            return '', 304, validators
+        return jsonify(note), 200, validators
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -176,8 +487,7 @@ def get_note(note_id):
 @app.route('/notes/<note_id>', methods=['PUT'])
 def update_note(note_id):
     try:
-        data = request.get_json()
-        note_data = NoteUpdate(**data)
+        note_data = NoteUpdate.model_validate_json(request.get_data())
         note = db.update_note(note_id, note_data.model_dump(exclude_unset=True))
         if not note:
             return jsonify({'error': 'Nota no encontrada'}), 404
@@ -0,0 +1,608 @@
+"""
+API REST de Notas con Quart (asyncio) - misma API que main.py
+
+Las mismas rutas (incluidos /notes:batch, /notes:batchGet,
+/notes:batchDelete, /notes/export y /metrics) con las mismas respuestas;
+la única diferencia es que solo admite DB_TYPE=dynamodb.
+
+Cada worker mantiene un único cliente DynamoDB asíncrono con un pool de
+conexiones compartido, así un contenedor puede tener cientos de llamadas a
+DynamoDB en vuelo en lugar de una por hilo. La capa de datos es la de
+main.py: shared/dynamo_async.py ejecuta las mismas peticiones que
+shared/dynamo.py y aquí solo se esperan las llamadas.
+
+Uso: APP_MODULE=main_async:app GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+     gunicorn -c gunicorn.conf.py
+"""
+import asyncio
+import os
+import sys
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from quart import Quart, Response, g, request, jsonify
+from quart.json.provider import DefaultJSONProvider
+from quart.wrappers.response import DataBody, IterableBody
+from quart_cors import cors
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared import serializer, prometheus
+from shared.cache import TTLCache, MISSING
+from shared.singleflight import AsyncSingleFlight, forget_reads
+from shared.models import NoteCreate, NoteUpdate
+from shared.batch import (
+    prepare_notes, create_results, get_results, delete_results, parse_note_list, parse_id_list
+)
+from shared.compression import (
+    COMPRESSION_MIN_SIZE, choose_encoding, compress, stream_compressor, is_compressible, weak_etag
+)
+from shared.utils import (
+    public_note, project_note, new_note_item, encode_cursor, decode_cursor, parse_limit, parse_fields,
+    note_etag, collection_etag, http_date, validator_headers, is_not_modified
+)
+from shared.storage import DB_TYPE
+from shared.clients import client_config, endpoint_url
+from shared.dynamo_async import AsyncNotesTable, AsyncIndexTable
+from shared.indexes import index_changes, collection_version, COLLECTION_VERSION_KEY
+from shared.changes import TOMBSTONE_PK, parse_since, is_expired, merge
+from shared.search import parse_query, term_query, rank, select_matches, postings_read_limit, trim_postings
+from shared.tags import TAG_COUNTS_PK, TagPage, parse_tag_filter, select_tagged, next_cursor_key, tag_counts
+
+
+# ============= DATABASE =============
+
+@prometheus.instrument
+class AsyncNotesDatabase:
+    """NotesDatabase de main.py con las tablas de shared/dynamo_async.py"""
+
+    def __init__(self):
+        # Habla con DynamoDB directamente (aiobotocore): los backends memory y
+        # sqlite de shared/storage.py solo los usan main.py y las Lambdas
+        if DB_TYPE != 'dynamodb':
+            raise ValueError(f"main_async solo admite DB_TYPE=dynamodb (DB_TYPE={DB_TYPE})")
+        self.table_name = os.getenv('DB_DYNAMONAME', 'Notes')
+        self.index_table_name = os.getenv('DB_DYNAMOINDEXNAME', 'NotesIndex')
+        self.region = os.getenv('AWS_REGION', 'us-east-1')
+        self.endpoint_url = endpoint_url()
+        # Timeouts, keep-alive y reintentos adaptive de shared/clients.py; el
+        # event loop tiene muchas más peticiones en vuelo que un worker con
+        # hilos, así que el pool por defecto es mayor
+        self.config = client_config(
+            AioConfig, max_pool_connections=int(os.getenv('DYNAMODB_MAX_POOL', '200'))
+        )
+        # Desactivada salvo NOTE_CACHE_TTL y un solo worker (gunicorn.conf.py)
+        self.cache = TTLCache()
+        self.flights = AsyncSingleFlight()
+        self.notes = None
+        self.index = None
+        self._stack = None
+
+    async def connect(self):
+        self._stack = AsyncExitStack()
+        session = get_session()
+        # Intentos a DynamoDB, reintentos incluidos (GET /metrics)
+        prometheus.instrument_session(session)
+        client = await self._stack.enter_async_context(
+            session.create_client(
+                'dynamodb',
+                region_name=self.region,
+                endpoint_url=self.endpoint_url,
+                config=self.config
+            )
+        )
+        self.notes = AsyncNotesTable(client, self.table_name)
+        self.index = AsyncIndexTable(client, self.index_table_name)
+
+    async def close(self):
+        if self._stack:
+            await self._stack.aclose()
+            self._stack = None
+            self.notes = None
+            self.index = None
+
+    async def _coalesce(self, operation: str, key, func):
+        value, shared = await self.flights.do((operation, key), func)
+        if shared:
+            prometheus.COALESCED_REQUESTS.labels(operation).inc()
+        return value
+
+    async def _update_indexes(self, changes: List[Tuple[Optional[Dict], Optional[Dict]]]) -> None:
+        """Mismo mantenimiento que NoteIndexes.update_many"""
+        if not changes:
+            return
+        try:
+            puts, deletes, counters = index_changes(changes)
+            unprocessed = await self.index.write(puts, deletes)
+            if unprocessed:
+                print(f"Índices: {unprocessed} entradas sin procesar")
+            await asyncio.gather(*(
+                self.index.add(pk, sk, 'count', delta) for (pk, sk), delta in counters.items()
+            ))
+        except Exception as e:
+            print(f"Error actualizando los índices: {str(e)}")
+        try:
+            await self.index.touch(*COLLECTION_VERSION_KEY, datetime.utcnow().isoformat() + 'Z')
+        except Exception as e:
+            print(f"Error actualizando la versión de la colección: {str(e)}")
+
+    async def collection_version(self) -> Tuple[int, Optional[str]]:
+        """(versión, fecha de la última escritura) de la colección, para los ETag"""
+        async def read():
+            return collection_version(await self.index.get(*COLLECTION_VERSION_KEY))
+
+        return await self._coalesce('collection_version', None, read)
+
+    async def search_notes(self, terms: List[str], limit: int) -> Dict:
+        """Notas que contienen todos los términos, por relevancia (shared.search.find_notes)"""
+        postings, truncated = trim_postings(dict(zip(terms, await asyncio.gather(*(
+            self.index.query_prefix(*term_query(term), max_items=postings_read_limit()) for term in terms
+        )))))
+        ranked = rank(terms, postings, limit * 2)
+        found = await self.notes.batch_get([note_id for note_id, _ in ranked])
+        items = select_matches(ranked, found, terms, limit)
+        return {'items': [public_note(item) for item in items], 'truncated': truncated}
+
+    async def list_notes_by_tags(self, tags: List[str], match: str, limit: int,
+                                 cursor: Optional[str] = None, fields: Optional[List[str]] = None) -> Dict:
+        """Una página de notas con los tags (shared.tags.list_by_tags)"""
+        state = TagPage(tags, match, limit, decode_cursor(cursor) if cursor else None)
+        while state.pending:
+            state.add(await asyncio.gather(*(
+                self.index.query_partition(pk, max_items=state.max_items, before=before)
+                for pk, before in state.reads()
+            )))
+        found = await self.notes.batch_get(
+            [entry['note_id'] for entry in state.page],
+            fields + ['tags'] if fields else None
+        )
+        return {
+            'items': [project_note(item, fields) for item in select_tagged(state.page, found, tags, match)],
+            'next_cursor': encode_cursor(next_cursor_key(state.page, state.has_more))
+        }
+
+    async def list_changes(self, since: str, limit: int) -> Dict:
+        """Notas cambiadas y borradas desde la posición since (shared.changes.list_changes)"""
+        timestamp, _, note_id = since.partition('#')
+        (items, items_more), deleted = await asyncio.gather(
+            self.notes.query_by_update(timestamp, limit + 1, note_id or None),
+            self.index.query_after(TOMBSTONE_PK, since, max_items=limit + 1)
+        )
+        result = merge(items, deleted, since, limit, items_more)
+        result['items'] = [public_note(item) for item in result['items']]
+        return result
+
+    async def tag_counts(self) -> List[Dict]:
+        return tag_counts(await self.index.query_partition(TAG_COUNTS_PK))
+
+    async def create_note(self, note_data: Dict) -> Dict:
+        item = new_note_item(note_data)
+        await self.notes.put(item)
+        await self._update_indexes([(None, item)])
+        forget_reads(self.flights, [])
+        return public_note(item)
+
+    async def batch_create(self, raw_notes: List, validate) -> List[Dict]:
+        results, items = prepare_notes(raw_notes, validate)
+        results = create_results(results, items, await self.notes.put_many(list(items.values())))
+        await self._update_indexes([(None, r['note']) for r in results if r['status'] == 201])
+        forget_reads(self.flights, [])
+        return results
+
+    async def batch_get(self, note_ids: List[str]) -> List[Dict]:
+        generations = {note_id: self.cache.generation(note_id) for note_id in note_ids}
+        found, unprocessed = await self.notes.batch_get_with_unprocessed(note_ids)
+        results = get_results(note_ids, found, unprocessed)
+        for result in results:
+            if result['status'] == 200:
+                self.cache.set(result['note_id'], result['note'], generations[result['note_id']])
+        return results
+
+    async def batch_delete(self, note_ids: List[str]) -> List[Dict]:
+        for note_id in note_ids:
+            self.cache.invalidate(note_id)
+        existing, unread = await self.notes.batch_get_with_unprocessed(note_ids)
+        failed = await self.notes.delete_many([note_id for note_id in note_ids if note_id in existing])
+        results, deleted = delete_results(note_ids, existing, unread + failed)
+        await self._update_indexes([(item, None) for item in deleted])
+        forget_reads(self.flights, note_ids)
+        return results
+
+    async def _fetch_note(self, note_id: str) -> Optional[Dict]:
+        try:
+            item = await self.notes.get(note_id)
+            return public_note(item) if item else None
+        except ClientError:
+            return None
+
+    async def get_note(self, note_id: str) -> Optional[Dict]:
+        note = self.cache.get(note_id)
+        if note is not MISSING:
+            return note
+        # Si update_note escribe la nota durante la lectura, la lectura no
+        # pisa en caché su valor
+        generation = self.cache.generation(note_id)
+        note = await self._coalesce('get_note', note_id, lambda: self._fetch_note(note_id))
+        if note:
+            self.cache.set(note_id, note, generation)
+        return note
+
+    async def iter_note_pages(self, fields: Optional[List[str]] = None) -> AsyncIterator[List[Dict]]:
+        start_key = None
+        while True:
+            items, start_key = await self.notes.query_by_date(start_key=start_key, fields=fields)
+            yield [project_note(item, fields) for item in items]
+            if not start_key:
+                return
+
+    async def iter_export_pages(self, segments: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        """Tabla completa sin orden (scan paralelo por segmentos)"""
+        async for page in self.notes.scan_pages(segments):
+            yield [public_note(item) for item in page]
+
+    async def list_notes_page(self, limit: int, cursor: Optional[str] = None,
+                              fields: Optional[List[str]] = None) -> Dict:
+        start_key = decode_cursor(cursor) if cursor else None
+
+        async def query():
+            items, last_key = await self.notes.query_by_date(limit, start_key, fields)
+            return {
+                'items': [project_note(item, fields) for item in items],
+                'next_cursor': encode_cursor(last_key)
+            }
+
+        return await self._coalesce('list_notes_page', (limit, cursor, tuple(fields or ())), query)
+
+    async def update_note(self, note_id: str, updates: Dict) -> Optional[Dict]:
+        values = dict(updates, updated_at=datetime.utcnow().isoformat() + 'Z')
+        result = await self.notes.update_with_previous(note_id, values)
+        if result is None:
+            self.cache.invalidate(note_id)
+            return None
+
+        previous, item = result
+        await self._update_indexes([(previous, item)])
+        forget_reads(self.flights, [note_id])
+        note = public_note(item)
+        self.cache.set(note_id, note)
+        return note
+
+    async def delete_note(self, note_id: str) -> bool:
+        self.cache.invalidate(note_id)
+        item = await self.notes.delete(note_id)
+        if item is None:
+            return False
+        await self._update_indexes([(item, None)])
+        forget_reads(self.flights, [note_id])
+        return True
+
+
+# ============= QUART APP =============
+
+class NotesJSONProvider(DefaultJSONProvider):
+    """jsonify y get_json con el serializador compartido con las Lambdas"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return serializer.dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+
+
+app = Quart(__name__)
+app.json = NotesJSONProvider(app)
+# Como flask_cors en main.py: cualquier origen, preflight OPTIONS y ETag /
+# Last-Modified visibles para las peticiones condicionales del navegador
+app = cors(app, allow_origin='*', expose_headers=['ETag', 'Last-Modified'])
+db = AsyncNotesDatabase()
+
+
+@app.before_serving
+async def startup():
+    await db.connect()
+
+
+@app.after_serving
+async def shutdown():
+    await db.close()
+
+
+async def compress_body(body: IterableBody, encoding: str) -> AsyncIterator[bytes]:
+    compress_chunk, finish = stream_compressor(encoding)
+    async with body as chunks:
+        async for chunk in chunks:
+            data = compress_chunk(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            if data:
+                yield data
+    yield finish()
+
+
+@app.after_request
+async def compress_response(response):
+    """Compresión negociada con Accept-Encoding, como en main.py"""
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype)):
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if not encoding:
+        return response
+    if isinstance(response.response, DataBody):
+        data = await response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+    elif isinstance(response.response, IterableBody):
+        response.response = IterableBody(compress_body(response.response, encoding))
+        response.headers.pop('Content-Length', None)
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+    if 'ETag' in response.headers:
+        response.headers['ETag'] = weak_etag(response.headers['ETag'])
+    return response
+
+
+async def stream_json_array(pages: AsyncIterator[List[Dict]]) -> Response:
+    """
+    Respuesta JSON (array) enviada página a página, como en main.py. La
+    primera página se pide antes para que un error inicial sea un 500 normal.
+    """
+    first_page = await anext(pages, [])
+
+    async def generate():
+        yield '['
+        separator = ''
+        page = first_page
+        while True:
+            if page:
+                yield separator + ','.join(app.json.dumps(note) for note in page)
+                separator = ','
+            try:
+                page = await pages.__anext__()
+            except StopAsyncIteration:
+                break
+        yield ']'
+
+    return Response(generate(), status=200, mimetype='application/json')
+
+
+def not_modified(validators: Dict) -> bool:
+    return is_not_modified(request.headers, validators['ETag'], validators.get('Last-Modified'))
+
+
+async def collection_validators() -> Dict:
+    version, modified_at = await db.collection_version()
+    params = request.args.to_dict(flat=False)
+    return validator_headers(collection_etag(version, params), http_date(modified_at))
+
+
+@app.before_request
+async def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+    prometheus.REQUESTS_IN_PROGRESS.labels(request.method, g.metrics_route).inc()
+
+
+@app.after_request
+async def observe_request_metrics(response):
+    # En los listados en streaming se mide hasta que empieza la respuesta
+    prometheus.REQUEST_LATENCY.labels(request.method, g.metrics_route, response.status_code).observe(
+        time.perf_counter() - g.metrics_start
+    )
+    g.metrics_observed = True
+    return response
+
+
+@app.teardown_request
+async def finish_request_metrics(error=None):
+    if 'metrics_start' not in g:
+        return
+    if not g.get('metrics_observed'):
+        # Excepción sin capturar: no pasa por after_request
+        prometheus.REQUEST_LATENCY.labels(request.method, g.metrics_route, 500).observe(
+            time.perf_counter() - g.metrics_start
+        )
+    prometheus.REQUESTS_IN_PROGRESS.labels(request.method, g.metrics_route).dec()
+
+
+@app.route('/health', methods=['GET'])
+async def health():
+    return jsonify({'status': 'healthy'}), 200
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    body, content_type = prometheus.render()
+    return Response(body, status=200, content_type=content_type)
+
+
+@app.route('/cache/stats', methods=['GET'])
+async def cache_stats():
+    return jsonify(dict(db.cache.stats(), singleflight=db.flights.stats())), 200
+
+
+@app.route('/notes', methods=['GET'])
+async def list_notes():
+    try:
+        validators = await collection_validators()
+        if not_modified(validators):
+            return '', 304, validators
+
+        try:
+            fields = parse_fields(request.args.get('fields'), request.args.get('view'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if 'tag' in request.args:
+            try:
+                tags, match = parse_tag_filter(request.args.getlist('tag'), request.args.get('match'))
+                limit = parse_limit(request.args.get('limit'))
+                page = await db.list_notes_by_tags(tags, match, limit, request.args.get('cursor') or None, fields)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(page), 200, validators
+
+        if 'limit' in request.args or 'cursor' in request.args:
+            try:
+                limit = parse_limit(request.args.get('limit'))
+                page = await db.list_notes_page(limit, request.args.get('cursor') or None, fields)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(page), 200, validators
+
+        response = await stream_json_array(db.iter_note_pages(fields))
+        response.headers.update(validators)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/tags', methods=['GET'])
+async def list_tags():
+    try:
+        return jsonify({'tags': await db.tag_counts()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/export', methods=['GET'])
+async def export_notes():
+    try:
+        segments = request.args.get('segments')
+        if segments is not None:
+            try:
+                segments = int(segments)
+            except ValueError:
+                return jsonify({'error': 'segments debe ser un número entero'}), 400
+        return await stream_json_array(db.iter_export_pages(segments))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/changes', methods=['GET'])
+async def list_note_changes():
+    try:
+        try:
+            since = parse_since(request.args.get('since'))
+            limit = parse_limit(request.args.get('limit'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if is_expired(since):
+            return jsonify({
+                'error': 'since es anterior a los borrados que se conservan: recarga todas las notas'
+            }), 410
+        return jsonify(await db.list_changes(since, limit)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/search', methods=['GET'])
+async def search_notes():
+    try:
+        try:
+            terms = parse_query(request.args.get('q'))
+            limit = parse_limit(request.args.get('limit'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(await db.search_notes(terms, limit)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes', methods=['POST'])
+async def create_note():
+    try:
+        # Validación directa del body JSON, sin pasar por un dict
+        note_data = NoteCreate.model_validate_json(await request.get_data())
+        note = await db.create_note(note_data.model_dump())
+        return jsonify(note), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes:batch', methods=['POST'])
+async def batch_create_notes():
+    try:
+        try:
+            raw_notes = parse_note_list(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        results = await db.batch_create(raw_notes, lambda raw: NoteCreate.model_validate(raw).model_dump())
+        return jsonify({'results': results}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes:batchGet', methods=['POST'])
+async def batch_get_notes():
+    try:
+        try:
+            note_ids = parse_id_list(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'results': await db.batch_get(note_ids)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes:batchDelete', methods=['POST'])
+async def batch_delete_notes():
+    try:
+        try:
+            note_ids = parse_id_list(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'results': await db.batch_delete(note_ids)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/<note_id>', methods=['GET'])
+async def get_note(note_id):
+    try:
+        note = await db.get_note(note_id)
+        if not note:
+            return jsonify({'error': 'Nota no encontrada'}), 404
+        validators = validator_headers(note_etag(note), http_date(note.get('updated_at')))
+        if not_modified(validators):
+            return '', 304, validators
+        return jsonify(note), 200, validators
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/<note_id>', methods=['PUT'])
+async def update_note(note_id):
+    try:
+        note_data = NoteUpdate.model_validate_json(await request.get_data())
+        note = await db.update_note(note_id, note_data.model_dump(exclude_unset=True))
+        if not note:
+            return jsonify({'error': 'Nota no encontrada'}), 404
+        return jsonify(note), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/notes/<note_id>', methods=['DELETE'])
+async def delete_note(note_id):
+    try:
+        success = await db.delete_note(note_id)
+        if not success:
+            return jsonify({'error': 'Nota no encontrada'}), 404
+        return '', 204
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+if __name__ == '__main__':
+    port = int(os.getenv('PORT', 8080))
+    print(f"Starting Quart app on port {port}...")
+    app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,47 @@
+"""
+Lambda function: Batch Create Notes
+POST /notes:batch
+"""
+import os
+
+from shared.emf import instrument, phase
+from shared.models import NoteCreate
+from shared.utils import create_response, parse_json_body
+from shared.batch import create_many, parse_note_list
+from shared.indexes import NoteIndexes
+from shared.storage import notes_table, index_table
+
+# Almacenamiento según DB_TYPE (shared/storage.py)
+table_name = os.environ.get('TABLE_NAME', 'Notes')
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+indexes = NoteIndexes(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
+
+
+def validate_note(raw):
+    with phase('Validation'):
+        return NoteCreate.model_validate(raw).model_dump()
+
+
+@instrument('batch_create')
+def lambda_handler(event, context):
+    """
+    Handler para crear varias notas con BatchWriteItem.
+    Devuelve un resultado por nota (201, 400 o 503).
+    """
+    try:
+        try:
+            with phase('Validation'):
+                raw_notes = parse_note_list(parse_json_body(event))
+        except ValueError as e:
+            return create_response(400, {'error': str(e)})
+        
+        results = create_many(notes, raw_notes, validate_note)
+        indexes.update_many([(None, r['note']) for r in results if r['status'] == 201])
+        return create_response(200, {'results': results})
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return create_response(500, {
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        })
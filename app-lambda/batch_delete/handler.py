@@ -0,0 +1,46 @@
+"""
+Lambda function: Batch Delete Notes
+POST /notes:batchDelete
+"""
+import os
+
+from shared.emf import instrument, phase
+from shared.utils import create_response, parse_json_body
+from shared.batch import delete_many, parse_id_list
+from shared.cache import note_cache
+from shared.indexes import NoteIndexes
+from shared.storage import notes_table, index_table
+
+# Almacenamiento según DB_TYPE (shared/storage.py)
+table_name = os.environ.get('TABLE_NAME', 'Notes')
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+indexes = NoteIndexes(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
+
+
+@instrument('batch_delete')
+def lambda_handler(event, context):
+    """
+    Handler para eliminar varias notas con BatchWriteItem.
+    Devuelve un resultado por id (204, 404 o 503).
+    """
+    try:
+        try:
+            with phase('Validation'):
+                note_ids = parse_id_list(parse_json_body(event))
+        except ValueError as e:
+            return create_response(400, {'error': str(e)})
+        
+        for note_id in note_ids:
+            note_cache.invalidate(note_id)
+        
+        results, deleted = delete_many(notes, note_ids)
+        indexes.update_many([(item, None) for item in deleted])
+        
+        return create_response(200, {'results': results})
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return create_response(500, {
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        })
@@ -0,0 +1,39 @@
+"""
+Lambda function: Batch Get Notes
+POST /notes:batchGet
+"""
+import os
+
+from shared.emf import instrument, phase
+from shared.utils import create_response, parse_json_body
+from shared.batch import get_many, parse_id_list
+from shared.storage import notes_table
+
+# Almacenamiento según DB_TYPE (shared/storage.py)
+table_name = os.environ.get('TABLE_NAME', 'Notes')
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+
+
+@instrument('batch_get')
+def lambda_handler(event, context):
+    """
+    Handler para leer varias notas con BatchGetItem.
+    Devuelve un resultado por id: 200, 404 o 503 si la clave quedó sin
+    procesar tras los reintentos (el cliente puede volver a pedirla).
+    """
+    try:
+        try:
+            with phase('Validation'):
+                note_ids = parse_id_list(parse_json_body(event))
+        except ValueError as e:
+            return create_response(400, {'error': str(e)})
+        
+        return create_response(200, {'results': get_many(notes, note_ids)},
+                               request_headers=event.get('headers'))
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return create_response(500, {
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        })
@@ -2,59 +2,45 @@
 Lambda function: Create Note
 POST /notes
 """
-import json
 import os
-import uuid
-from datetime import datetime
-import boto3
 from pydantic import ValidationError
-import sys
 
-from shared.models import NoteCreate
-from shared.utils import create_response, parse_json_body
+from shared.emf import instrument, phase
+from shared.models import NoteCreate, validation_errors
+from shared.utils import create_response, raw_body, public_note, new_note_item
+from shared.storage import notes_table, index_table
+from shared.indexes import NoteIndexes
 
-# Cliente DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'us-east-1'))
+# Cliente DynamoDB de bajo nivel con serializador propio
 table_name = os.environ.get('TABLE_NAME', 'Notes')
-table = dynamodb.Table(table_name)
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+indexes = NoteIndexes(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
 
 
+@instrument('create_note')
 def lambda_handler(event, context):
     """
     Handler para crear una nueva nota
     """
     try:
-        # Parsear body
-        body = parse_json_body(event)
+        # Validar con Pydantic directamente desde el body JSON
+        with phase('Validation'):
+            note_data = NoteCreate.model_validate_json(raw_body(event))
         
-        # Validar con Pydantic
-        note_data = NoteCreate(**body)
-        
-        # Generar ID y timestamps
-        note_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().isoformat() + 'Z'
-        
-        # Crear item
-        note_dict = note_data.dict()
-        item = {
-            'note_id': note_id,
-            'title': note_dict['title'],
-            'content': note_dict['content'],
-            'tags': note_dict['tags'],
-            'created_at': timestamp,
-            'updated_at': timestamp
-        }
+        # Crear item (ID y timestamps)
+        item = new_note_item(note_data.model_dump())
         
         # Guardar en DynamoDB
-        table.put_item(Item=item)
+        notes.put(item)
+        indexes.update(None, item)
         
         # Retornar respuesta
-        return create_response(201, item)
+        return create_response(201, public_note(item))
         
     except ValidationError as e:
         return create_response(400, {
             'error': 'Datos inválidos',
-            'details': e.errors()
+            'details': validation_errors(e)
         })
     
     except Exception as e:
@@ -3,17 +3,20 @@ Lambda function: Delete Note
 DELETE /notes/{id}
 """
 import os
-import boto3
-import sys
 
-from shared.utils import create_response, parse_json_body
+from shared.emf import instrument
+from shared.utils import create_response
+from shared.cache import note_cache
+from shared.storage import notes_table, index_table
+from shared.indexes import NoteIndexes
 
-# Cliente DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'us-east-1'))
+# Cliente DynamoDB de bajo nivel con serializador propio
 table_name = os.environ.get('TABLE_NAME', 'Notes')
-table = dynamodb.Table(table_name)
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+indexes = NoteIndexes(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
 
 
+@instrument('delete_note')
 def lambda_handler(event, context):
     """
     Handler para eliminar una nota
@@ -27,15 +30,15 @@ def lambda_handler(event, context):
                 'error': 'ID de nota requerido'
             })
         
-        # Verificar que existe
-        response = table.get_item(Key={'note_id': note_id})
-        if 'Item' not in response:
+        # Eliminar de DynamoDB solo si existe (una única escritura condicional)
+        note_cache.invalidate(note_id)
+        item = notes.delete(note_id)
+        if item is None:
             return create_response(404, {
                 'error': 'Nota no encontrada'
             })
         
-        # Eliminar de DynamoDB
-        table.delete_item(Key={'note_id': note_id})
+        indexes.update(item, None)
         
         # Retornar 204 No Content
         return create_response(204, None)
@@ -3,26 +3,25 @@ Lambda function: Get Note
 GET /notes/{id}
 """
 import os
-import boto3
-from decimal import Decimal
-import sys
 
-from shared.models import NoteCreate
-from shared.utils import create_response, parse_json_body
+from shared.emf import instrument
+from shared.utils import create_response, public_note, note_etag, http_date, validator_headers
+from shared.cache import note_cache, MISSING
+from shared.storage import notes_table
 
-# Cliente DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'us-east-1'))
+# Cliente DynamoDB de bajo nivel con serializador propio
 table_name = os.environ.get('TABLE_NAME', 'Notes')
-table = dynamodb.Table(table_name)
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
 
 
-def decimal_to_float(obj):
-    """Convertir Decimal a float para JSON"""
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
+def note_response(event, note, cache_status):
+    """200 con ETag/Last-Modified, o 304 si el cliente ya tiene esta versión"""
+    headers = validator_headers(note_etag(note), http_date(note.get('updated_at')))
+    headers['X-Cache'] = cache_status
+    return create_response(200, note, headers, request_headers=event.get('headers'))
 
 
+@instrument('get_note')
 def lambda_handler(event, context):
     """
     Handler para obtener una nota por ID
@@ -36,16 +35,23 @@ def lambda_handler(event, context):
                 'error': 'ID de nota requerido'
             })
         
+        # Caché de la instancia caliente
+        note = note_cache.get(note_id)
+        if note is not MISSING:
+            return note_response(event, note, 'HIT')
+        
         # Obtener de DynamoDB
-        response = table.get_item(Key={'note_id': note_id})
+        item = notes.get(note_id)
         
-        if 'Item' not in response:
+        if item is None:
             return create_response(404, {
                 'error': 'Nota no encontrada'
             })
         
         # Retornar nota
-        return create_response(200, response['Item'])
+        note = public_note(item)
+        note_cache.set(note_id, note)
+        return note_response(event, note, 'MISS')
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -0,0 +1,49 @@
+"""
+Lambda function: List Changes
+GET /notes/changes?since=<token o fecha ISO>&limit=20
+"""
+import os
+
+from shared.emf import instrument
+from shared.utils import create_response, public_note, parse_limit
+from shared.storage import notes_table, index_table
+from shared.changes import parse_since, is_expired, list_changes
+
+# Cliente DynamoDB de bajo nivel con serializador propio
+table_name = os.environ.get('TABLE_NAME', 'Notes')
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+index = index_table(region_name=os.environ.get('REGION', 'us-east-1'))
+
+
+@instrument('list_changes')
+def lambda_handler(event, context):
+    """
+    Handler para la sincronización incremental: notas creadas o modificadas
+    y notas borradas desde since, en orden de modificación. El cliente
+    guarda next_since y lo envía en la siguiente petición; con has_more
+    debe pedir la página siguiente enseguida.
+    """
+    try:
+        params = event.get('queryStringParameters') or {}
+
+        try:
+            since = parse_since(params.get('since'))
+            limit = parse_limit(params.get('limit'))
+        except ValueError as e:
+            return create_response(400, {'error': str(e)})
+
+        if is_expired(since):
+            return create_response(410, {
+                'error': 'since es anterior a los borrados que se conservan: recarga todas las notas'
+            })
+
+        result = list_changes(notes, index, since, limit)
+        result['items'] = [public_note(item) for item in result['items']]
+        return create_response(200, result, request_headers=event.get('headers'))
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return create_response(500, {
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        })
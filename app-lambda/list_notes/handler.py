@@ -1,61 +1,97 @@
 """
 Lambda function: List Notes
 GET /notes
+GET /notes?limit=20&cursor=<token>
+GET /notes?tag=a&tag=b&match=all|any&limit=20&cursor=<token>
+GET /notes?view=summary | GET /notes?fields=title,tags (con cualquiera de los anteriores)
 """
 import os
-import boto3
-from decimal import Decimal
-import json
-import sys
 
-from shared.models import NoteCreate
-from shared.utils import create_response, parse_json_body
+from shared.emf import instrument
+from shared.utils import (
+    create_response, project_note, encode_cursor, decode_cursor, parse_limit, parse_fields,
+    collection_etag, http_date, validator_headers, is_not_modified
+)
+from shared.storage import notes_table, index_table
+from shared.indexes import NoteIndexes
+from shared.tags import parse_tag_filter, list_by_tags
 
-# Cliente DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'us-east-1'))
+# Almacenamiento según DB_TYPE (shared/storage.py)
 table_name = os.environ.get('TABLE_NAME', 'Notes')
-table = dynamodb.Table(table_name)
-
-
-class DecimalEncoder(json.JSONEncoder):
-    """Encoder personalizado para Decimal"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+indexes = NoteIndexes(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
 
 
+@instrument('list_notes')
 def lambda_handler(event, context):
     """
-    Handler para listar todas las notas
+    Handler para listar las notas, de la más reciente a la más antigua.
+    Sin parámetros devuelve todas las notas; con limit/cursor devuelve
+    una página y el token para pedir la siguiente. Con tag filtra por uno
+    o varios tags (siempre paginado) usando el índice de tags.
+    view=summary o fields limitan los atributos que se leen de DynamoDB
+    (ProjectionExpression); el resumen sale de un índice con solo esos
+    atributos, así que también consume menos capacidad de lectura.
+    El ETag es la versión de la colección: si el cliente ya tiene el
+    listado se responde 304 sin consultar las notas.
     """
     try:
-        # Hacer scan de la tabla
-        response = table.scan()
-        items = response.get('Items', [])
-        
-        # Manejar paginación si hay más items
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
-        
-        # Convertir a JSON con encoder personalizado
-        body = json.dumps(items, cls=DecimalEncoder)
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Api-Key'
-            },
-            'body': body
-        }
-        
+        params = event.get('queryStringParameters') or {}
+        multi_params = event.get('multiValueQueryStringParameters') or {}
+        paginated = 'limit' in params or 'cursor' in params
+
+        version, modified_at = indexes.collection_version()
+        validators = validator_headers(collection_etag(version, multi_params or params), http_date(modified_at))
+        if is_not_modified(event.get('headers'), validators['ETag'], validators.get('Last-Modified')):
+            return create_response(304, None, validators)
+
+        try:
+            fields = parse_fields(params.get('fields'), params.get('view'))
+        except ValueError as e:
+            return create_response(400, {'error': str(e)})
+
+        if 'tag' in params:
+            try:
+                tags, match = parse_tag_filter(multi_params.get('tag') or [params['tag']], params.get('match'))
+                limit = parse_limit(params.get('limit'))
+                cursor_key = decode_cursor(params['cursor']) if params.get('cursor') else None
+                items, next_key = list_by_tags(indexes.tags, notes, tags, match, limit, cursor_key, fields)
+            except ValueError as e:
+                return create_response(400, {'error': str(e)})
+
+            result = {
+                'items': [project_note(item, fields) for item in items],
+                'next_cursor': encode_cursor(next_key)
+            }
+        elif paginated:
+            try:
+                limit = parse_limit(params.get('limit'))
+                start_key = decode_cursor(params['cursor']) if params.get('cursor') else None
+            except ValueError as e:
+                return create_response(400, {'error': str(e)})
+
+            items, last_key = notes.query_by_date(limit, start_key, fields)
+            result = {
+                'items': [project_note(item, fields) for item in items],
+                'next_cursor': encode_cursor(last_key)
+            }
+        else:
+            # Listado completo: páginas del índice por fecha hasta el final,
+            # ya ordenadas de la más reciente a la más antigua
+            result = []
+            start_key = None
+            while True:
+                items, start_key = notes.query_by_date(start_key=start_key, fields=fields)
+                result.extend(project_note(item, fields) for item in items)
+                if not start_key:
+                    break
+
+        # create_response serializa con shared/serializer (Decimal incluido)
+        return create_response(200, result, validators, request_headers=event.get('headers'))
+
     except Exception as e:
         print(f"Error: {str(e)}")
         return create_response(500, {
             'error': 'Error interno del servidor',
             'message': str(e)
-        })
\ No newline at end of file
+        })
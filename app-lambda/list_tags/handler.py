@@ -0,0 +1,30 @@
+"""
+Lambda function: List Tags
+GET /tags
+"""
+import os
+
+from shared.emf import instrument
+from shared.utils import create_response
+from shared.storage import index_table
+from shared.tags import TagIndex
+
+# Índice de tags (tabla de índices)
+tag_index = TagIndex(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
+
+
+@instrument('list_tags')
+def lambda_handler(event, context):
+    """
+    Handler para listar los tags en uso con su número de notas,
+    de más a menos usados
+    """
+    try:
+        return create_response(200, {'tags': tag_index.counts()})
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return create_response(500, {
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        })
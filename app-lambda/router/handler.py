@@ -0,0 +1,63 @@
+"""
+Lambda function: Router (despliegue consolidado)
+Todas las rutas de la API en una sola función
+
+Cada ruta sigue siendo el handler de su función (app-lambda/<función>/handler.py),
+que scripts/package-lambdas.py --consolidated copia como routes/<función>.py.
+Los módulos se importan la primera vez que se usa su ruta, así que un
+contenedor solo carga lo que sirve, y comparte con el resto de rutas el
+cliente DynamoDB y la caché de notas (una actualización invalida la caché
+que usa GET /notes/{id} en el mismo contenedor).
+"""
+import importlib
+
+from shared.emf import instrument
+from shared.utils import create_response
+
+# (método, recurso de API Gateway) -> función
+ROUTES = {
+    ('POST', '/notes'): 'create_note',
+    ('GET', '/notes'): 'list_notes',
+    ('GET', '/notes/search'): 'search_notes',
+    ('GET', '/notes/changes'): 'list_changes',
+    ('GET', '/tags'): 'list_tags',
+    ('GET', '/notes/{id}'): 'get_note',
+    ('PUT', '/notes/{id}'): 'update_note',
+    ('DELETE', '/notes/{id}'): 'delete_note',
+    ('POST', '/notes:batch'): 'batch_create',
+    ('POST', '/notes:batchGet'): 'batch_get',
+    ('POST', '/notes:batchDelete'): 'batch_delete'
+}
+
+_handlers = {}
+
+
+def get_handler(function_name):
+    handler = _handlers.get(function_name)
+    if handler is None:
+        module = importlib.import_module(f'routes.{function_name}')
+        handler = _handlers[function_name] = module.lambda_handler
+    return handler
+
+
+@instrument('router')
+def lambda_handler(event, context):
+    """
+    Handler que despacha por httpMethod y resource al handler de cada ruta
+    """
+    function_name = ROUTES.get((event.get('httpMethod'), event.get('resource')))
+    if function_name is None:
+        return create_response(404, {
+            'error': 'Ruta no encontrada'
+        })
+    
+    try:
+        handler = get_handler(function_name)
+    except ImportError as e:
+        print(f"Error: {str(e)}")
+        return create_response(500, {
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        })
+    
+    return handler(event, context)
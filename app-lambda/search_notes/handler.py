@@ -0,0 +1,46 @@
+"""
+Lambda function: Search Notes
+GET /notes/search?q=<texto>&limit=20
+"""
+import os
+
+from shared.emf import instrument
+from shared.utils import create_response, public_note, parse_limit
+from shared.storage import notes_table, index_table
+from shared.search import SearchIndex, parse_query, find_notes
+
+# Cliente DynamoDB de bajo nivel con serializador propio
+table_name = os.environ.get('TABLE_NAME', 'Notes')
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+search_index = SearchIndex(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
+
+
+@instrument('search_notes')
+def lambda_handler(event, context):
+    """
+    Handler para buscar notas por texto en title, content y tags.
+    Cada término coincide como palabra o prefijo; deben estar todos y los
+    resultados vienen ordenados por relevancia. truncated indica que algún
+    término tenía más entradas de las que se leen (SEARCH_MAX_POSTINGS).
+    """
+    try:
+        params = event.get('queryStringParameters') or {}
+        
+        try:
+            terms = parse_query(params.get('q'))
+            limit = parse_limit(params.get('limit'))
+        except ValueError as e:
+            return create_response(400, {'error': str(e)})
+        
+        items, truncated = find_notes(search_index, notes, terms, limit)
+        return create_response(200, {
+            'items': [public_note(item) for item in items],
+            'truncated': truncated
+        }, request_headers=event.get('headers'))
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return create_response(500, {
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        })
@@ -0,0 +1,220 @@
+"""
+Operaciones por lotes sobre DynamoDB (BatchWriteItem / BatchGetItem)
+
+Las peticiones se trocean en grupos de 25 (escritura) o 100 (lectura), los
+trozos se envían en paralelo y los UnprocessedItems/UnprocessedKeys se
+reintentan con backoff exponencial. Cada trozo es una secuencia de pasos
+sin E/S (shared/steps.py) que también ejecuta la API asíncrona.
+"""
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from shared.steps import Steps, run
+from shared.utils import new_note_item, public_note
+
+WRITE_CHUNK_SIZE = 25
+GET_CHUNK_SIZE = 100
+
+# Máximo de notas por petición HTTP
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', '500'))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '4'))
+BATCH_MAX_RETRIES = int(os.environ.get('BATCH_MAX_RETRIES', '5'))
+BATCH_BACKOFF_BASE = 0.05
+BATCH_BACKOFF_MAX = 2.0
+
+
+def chunked(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def backoff_delay(attempt: int) -> float:
+    """Segundos de espera antes del reintento: backoff exponencial con jitter completo"""
+    delay = min(BATCH_BACKOFF_MAX, BATCH_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, delay)
+
+
+def _dispatch(func, chunks: List) -> List:
+    """Ejecutar func sobre cada trozo, en paralelo si hay más de uno"""
+    if len(chunks) <= 1:
+        return [func(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(len(chunks), BATCH_WORKERS)) as pool:
+        return list(pool.map(func, chunks))
+
+
+def write_chunk(table_name: str, requests: List[Dict]) -> Steps:
+    """Escribir un trozo de hasta 25 peticiones. Devuelve las no procesadas."""
+    pending = {table_name: requests}
+    for attempt in range(BATCH_MAX_RETRIES + 1):
+        response = yield 'batch_write_item', {'RequestItems': pending}
+        pending = response.get('UnprocessedItems') or {}
+        if not pending.get(table_name):
+            return []
+        if attempt < BATCH_MAX_RETRIES:
+            yield 'sleep', backoff_delay(attempt)
+    return pending[table_name]
+
+
+def write_requests(client, table_name: str, requests: List[Dict]) -> List[Dict]:
+    """
+    PutRequest/DeleteRequest en lotes de 25 sobre cualquier tabla, con el
+    formato de items del cliente usado. Devuelve las peticiones no procesadas.
+    """
+    chunks = chunked(requests, WRITE_CHUNK_SIZE)
+    unprocessed = []
+    for pending in _dispatch(lambda chunk: run(write_chunk(table_name, chunk), client), chunks):
+        unprocessed.extend(pending)
+    return unprocessed
+
+
+def get_chunk(table_name: str, keys: List[Dict], projection: Optional[Dict]) -> Steps:
+    """Leer un trozo de hasta 100 claves. Devuelve (items, claves no procesadas)."""
+    keys_and_attrs = dict(projection or {}, Keys=keys)
+    pending = {table_name: keys_and_attrs}
+    items = []
+    for attempt in range(BATCH_MAX_RETRIES + 1):
+        response = yield 'batch_get_item', {'RequestItems': pending}
+        items.extend(response.get('Responses', {}).get(table_name, []))
+        pending = response.get('UnprocessedKeys') or {}
+        if not pending.get(table_name):
+            return items, []
+        if attempt < BATCH_MAX_RETRIES:
+            yield 'sleep', backoff_delay(attempt)
+    return items, pending[table_name]['Keys']
+
+
+def get_items(client, table_name: str, keys: List[Dict],
+              projection: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Leer claves en lotes de 100 sobre cualquier tabla, con el formato de
+    items del cliente usado. projection son ProjectionExpression y
+    ExpressionAttributeNames (shared.dynamo.projection). Devuelve (items que
+    existen, sin orden; claves no procesadas tras los reintentos).
+    """
+    chunks = chunked(keys, GET_CHUNK_SIZE)
+    found = []
+    unprocessed = []
+    for items, pending in _dispatch(lambda chunk: run(get_chunk(table_name, chunk, projection), client), chunks):
+        found.extend(items)
+        unprocessed.extend(pending)
+    return found, unprocessed
+
+
+def parse_id_list(body: Dict) -> List[str]:
+    """
+    Validar el body {"ids": [...]} de batchGet / batchDelete
+    """
+    ids = body.get('ids') if isinstance(body, dict) else None
+    if not isinstance(ids, list) or not ids:
+        raise ValueError('Se requiere una lista "ids" no vacía')
+    if len(ids) > MAX_BATCH_SIZE:
+        raise ValueError(f'Máximo {MAX_BATCH_SIZE} elementos por petición')
+    if not all(isinstance(note_id, str) and note_id for note_id in ids):
+        raise ValueError('Cada id debe ser un texto no vacío')
+    return list(dict.fromkeys(ids))
+
+
+def parse_note_list(body: Dict) -> List:
+    """
+    Validar el body {"notes": [...]} de batch create
+    """
+    notes = body.get('notes') if isinstance(body, dict) else None
+    if not isinstance(notes, list) or not notes:
+        raise ValueError('Se requiere una lista "notes" no vacía')
+    if len(notes) > MAX_BATCH_SIZE:
+        raise ValueError(f'Máximo {MAX_BATCH_SIZE} elementos por petición')
+    return notes
+
+
+def prepare_notes(raw_notes: List, validate: Callable[[Dict], Dict]) -> Tuple[List[Optional[Dict]], Dict[int, Dict]]:
+    """
+    Validar las notas de un batch create. Devuelve (resultados, con los 400
+    ya puestos; {posición: item a guardar})
+    """
+    results = [None] * len(raw_notes)
+    items = {}
+    for index, raw in enumerate(raw_notes):
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError('Cada nota debe ser un objeto JSON')
+            item = new_note_item(validate(raw))
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 400, 'error': str(e)}
+            continue
+        items[index] = item
+    return results, items
+
+
+def create_results(results: List[Optional[Dict]], items: Dict[int, Dict], failed: List[str]) -> List[Dict]:
+    """Completar los resultados de prepare_notes con los note_id que no se pudieron escribir"""
+    failed = set(failed)
+    for index, item in items.items():
+        if item['note_id'] in failed:
+            results[index] = {'index': index, 'status': 503, 'error': 'No procesada, reintentar'}
+        else:
+            results[index] = {'index': index, 'status': 201, 'note': public_note(item)}
+    return results
+
+
+def get_results(note_ids: List[str], found: Dict[str, Dict], unprocessed: List[str]) -> List[Dict]:
+    """Un resultado por id, en orden, de un batch_get_with_unprocessed"""
+    unprocessed = set(unprocessed)
+    results = []
+    for note_id in note_ids:
+        if note_id in found:
+            results.append({'note_id': note_id, 'status': 200, 'note': public_note(found[note_id])})
+        elif note_id in unprocessed:
+            results.append({'note_id': note_id, 'status': 503, 'error': 'No procesada, reintentar'})
+        else:
+            results.append({'note_id': note_id, 'status': 404, 'error': 'Nota no encontrada'})
+    return results
+
+
+def delete_results(note_ids: List[str], existing: Dict[str, Dict],
+                   failed: List[str]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Un resultado por id, en orden, e items borrados, a partir de las notas
+    que existían y los ids no leídos o no borrados
+    """
+    failed = set(failed)
+    results = []
+    deleted = []
+    for note_id in note_ids:
+        if note_id in failed:
+            results.append({'note_id': note_id, 'status': 503, 'error': 'No procesada, reintentar'})
+        elif note_id not in existing:
+            results.append({'note_id': note_id, 'status': 404, 'error': 'Nota no encontrada'})
+        else:
+            results.append({'note_id': note_id, 'status': 204})
+            deleted.append(existing[note_id])
+    return results, deleted
+
+
+def create_many(notes, raw_notes: List, validate: Callable[[Dict], Dict]) -> List[Dict]:
+    """
+    Validar y crear varias notas en la tabla de notas (shared/storage.py).
+    Devuelve un resultado por nota, en orden.
+    """
+    results, items = prepare_notes(raw_notes, validate)
+    return create_results(results, items, notes.put_many(list(items.values())))
+
+
+def get_many(notes, note_ids: List[str]) -> List[Dict]:
+    """
+    Leer varias notas. Devuelve un resultado por id, en orden.
+    """
+    found, unprocessed = notes.batch_get_with_unprocessed(note_ids)
+    return get_results(note_ids, found, unprocessed)
+
+
+def delete_many(notes, note_ids: List[str]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Borrar varias notas. BatchWriteItem no admite condiciones, así que antes
+    se comprueba con BatchGetItem cuáles existen para poder devolver 404.
+    Devuelve (un resultado por id en orden, items borrados) para que quien
+    mantiene índices pueda limpiar sus entradas.
+    """
+    existing, unread = notes.batch_get_with_unprocessed(note_ids)
+    failed = notes.delete_many([note_id for note_id in note_ids if note_id in existing])
+    return delete_results(note_ids, existing, unread + failed)
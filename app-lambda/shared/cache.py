@@ -0,0 +1,136 @@
+"""
+Caché en memoria LRU + TTL para lecturas de notas
+
+Vive en el proceso: el contenedor Flask o la instancia caliente de la Lambda.
+Las escrituras del mismo proceso invalidan la entrada; las de otros procesos
+solo se ven cuando expira el TTL. Por eso está desactivada por defecto
+(NOTE_CACHE_TTL=0): con una Lambda por ruta, update_note y delete_note
+invalidan su propia caché y no la de get_note, que seguiría devolviendo la
+nota anterior (o borrada). Solo se activa en la Lambda router del modo
+consolidated, donde lecturas y escrituras pasan por las mismas instancias
+(entre instancias concurrentes del router sigue valiendo el TTL).
+
+Cada escritura o invalidación de una clave le asigna una generación nueva.
+Una lectura lenta toma generation(clave) antes de ir a la base de datos y la
+pasa a set(): si la clave se escribió mientras tanto, el valor leído es
+anterior a esa escritura y no se guarda.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+NOTE_CACHE_SIZE = int(os.environ.get('NOTE_CACHE_SIZE', '1024'))
+NOTE_CACHE_TTL = float(os.environ.get('NOTE_CACHE_TTL', '0'))
+
+MISSING = object()
+
+
+class TTLCache:
+    """Caché LRU acotada con expiración por entrada y contadores"""
+
+    def __init__(self, maxsize: int = NOTE_CACHE_SIZE, ttl: float = NOTE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Generación de las últimas claves escritas (acotado a maxsize). Una
+        # clave olvidada toma la mayor generación olvidada: solo puede dar
+        # de más un descarte, nunca aceptar un valor antiguo.
+        self._generations = OrderedDict()
+        self._last_generation = 0
+        self._forgotten_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Any:
+        """Valor en caché o MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _generation(self, key: Hashable) -> int:
+        return self._generations.get(key, self._forgotten_generation)
+
+    def _bump(self, key: Hashable) -> None:
+        self._last_generation += 1
+        self._generations[key] = self._last_generation
+        self._generations.move_to_end(key)
+        while len(self._generations) > max(self.maxsize, 1):
+            _, forgotten = self._generations.popitem(last=False)
+            self._forgotten_generation = max(self._forgotten_generation, forgotten)
+
+    def generation(self, key: Hashable) -> int:
+        """Marca a tomar antes de leer el valor de la base de datos (ver set)"""
+        with self._lock:
+            return self._generation(key)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Guardar value. Sin generation es una escritura (value es el valor
+        nuevo); con la generation tomada antes de leerlo, no se guarda si la
+        clave se escribió o invalidó mientras tanto.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is None:
+                self._bump(key)
+            elif generation != self._generation(key):
+                self.stale_sets += 1
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._bump(key)
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'stale_sets': self.stale_sets
+            }
+
+
+# Instancia compartida por todos los handlers del mismo proceso
+note_cache = TTLCache()
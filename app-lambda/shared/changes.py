@@ -0,0 +1,109 @@
+"""
+Sincronización incremental: notas creadas, modificadas o borradas desde un
+punto dado (GET /notes/changes?since=...)
+
+Las notas cambiadas salen del índice por fecha de modificación
+(updated_at-index). Las borradas dejan una lápida en la tabla de índices:
+
+    pk = 'deleted', sk = deleted_at + '#' + note_id, expires_at (TTL)
+
+que se escribe con el resto de índices (shared/indexes.py) y DynamoDB
+elimina pasados TOMBSTONE_TTL_DAYS días. Un cliente cuyo since es más
+antiguo que eso no puede saber qué se borró y debe recargar todo (410).
+
+La posición de sincronización es 'timestamp#note_id' y el cliente la
+recibe como token opaco (next_since); since también acepta una fecha ISO.
+Las notas se leen a partir de esa posición (no de su timestamp), así que
+la sincronización avanza aunque más de una página de notas compartan
+updated_at.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from shared.utils import encode_cursor, decode_cursor
+
+TOMBSTONE_PK = 'deleted'
+TOMBSTONE_TTL_DAYS = int(os.environ.get('TOMBSTONE_TTL_DAYS', '30'))
+
+
+def position(timestamp: str, note_id: str) -> str:
+    return f'{timestamp}#{note_id}'
+
+
+def tombstones(previous: Optional[Dict], current: Optional[Dict]) -> List[Dict]:
+    """Lápida a escribir si el cambio es el borrado de una nota"""
+    if not previous or current:
+        return []
+    deleted_at = datetime.utcnow().isoformat() + 'Z'
+    return [{
+        'pk': TOMBSTONE_PK,
+        'sk': position(deleted_at, previous['note_id']),
+        'note_id': previous['note_id'],
+        'deleted_at': deleted_at,
+        # Segundos epoch, el formato del TTL de DynamoDB
+        'expires_at': int(time.time()) + TOMBSTONE_TTL_DAYS * 86400
+    }]
+
+
+def parse_since(value: Optional[str]) -> str:
+    """
+    Posición de sincronización a partir de since: un token next_since o una
+    fecha ISO 8601. Lanza ValueError si no es válido.
+    """
+    if not value:
+        raise ValueError('since es obligatorio')
+    try:
+        moment = datetime.fromisoformat(value.rstrip('Z'))
+    except ValueError:
+        key = decode_cursor(value)
+        if not isinstance(key.get('updated_at'), str):
+            raise ValueError('since inválido')
+        return position(key['updated_at'], key['note_id'])
+    if moment.tzinfo is not None:
+        moment = (moment - moment.utcoffset()).replace(tzinfo=None)
+    # Mismo formato que updated_at para que la comparación de strings funcione
+    return moment.isoformat(timespec='microseconds') + 'Z'
+
+
+def is_expired(since: str) -> bool:
+    """True si since es anterior a las lápidas más antiguas que se conservan"""
+    limit = datetime.utcnow() - timedelta(days=TOMBSTONE_TTL_DAYS)
+    return since.split('#', 1)[0] < limit.isoformat() + 'Z'
+
+
+def since_token(since: str) -> str:
+    timestamp, _, note_id = since.partition('#')
+    return encode_cursor({'note_id': note_id, 'updated_at': timestamp})
+
+
+def merge(items: List[Dict], deleted: List[Dict], since: str, limit: int,
+          more_available: bool) -> Dict:
+    """
+    Unir notas cambiadas y lápidas posteriores a since en orden de posición
+    y quedarse con las primeras limit. Cada lista debe traer hasta limit + 1
+    entradas; more_available indica que la lectura de notas se cortó.
+    """
+    entries = [(position(item['updated_at'], item['note_id']), 'item', item) for item in items]
+    entries += [(entry['sk'], 'deleted', entry) for entry in deleted]
+    entries = sorted((entry for entry in entries if entry[0] > since), key=lambda entry: entry[0])
+    page = entries[:limit]
+    next_since = page[-1][0] if page else since
+    return {
+        'items': [entry for _, kind, entry in page if kind == 'item'],
+        'deleted': [
+            {'note_id': entry['note_id'], 'deleted_at': entry['deleted_at']}
+            for _, kind, entry in page if kind == 'deleted'
+        ],
+        'next_since': since_token(next_since),
+        'has_more': len(entries) > limit or more_available
+    }
+
+
+def list_changes(notes_table, index_table, since: str, limit: int) -> Dict:
+    """Página de cambios (items de DynamoDB y lápidas) desde since"""
+    timestamp, _, note_id = since.partition('#')
+    items, items_more = notes_table.query_by_update(timestamp, limit + 1, note_id or None)
+    deleted = index_table.query_after(TOMBSTONE_PK, since, max_items=limit + 1)
+    return merge(items, deleted, since, limit, items_more)
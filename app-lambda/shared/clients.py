@@ -0,0 +1,92 @@
+"""
+Clientes de DynamoDB compartidos y configurados para carga
+
+Con la configuración por defecto de botocore cada cliente tiene 10
+conexiones, timeouts de 60 s y reintentos 'legacy'. Con más hilos que
+conexiones las peticiones esperan un socket libre, y una conexión colgada
+retiene el hilo un minuto. Todos los accesos a DynamoDB (shared/dynamo.py,
+main.py, main_async.py y los scripts) usan esta configuración:
+
+    DYNAMODB_MAX_POOL         conexiones por cliente. Por defecto, las
+                              peticiones que un proceso puede tener en vuelo:
+                              GUNICORN_THREADS x max(SCAN_SEGMENTS, BATCH_WORKERS),
+                              con un mínimo de 10
+    DYNAMODB_CONNECT_TIMEOUT  segundos para abrir la conexión (1)
+    DYNAMODB_READ_TIMEOUT     segundos esperando la respuesta (5)
+    DYNAMODB_RETRY_MODE       adaptive (por defecto): backoff con jitter y,
+                              tras un throttle, el cliente limita su ritmo
+    DYNAMODB_MAX_ATTEMPTS     intentos en total, el primero incluido (5)
+    DYNAMODB_ENDPOINT_URL     DynamoDB Local u otro sustituto (botocore
+                              también lee AWS_ENDPOINT_URL_DYNAMODB)
+
+Las conexiones usan TCP keep-alive para que el balanceador o un NAT no
+las cierren en silencio entre peticiones.
+
+Los clientes se crean con la sesión por defecto de boto3 (donde
+shared/prometheus.py y shared/emf.py registran sus eventos) y se
+comparten por región: son thread-safe.
+"""
+import os
+import threading
+from functools import lru_cache
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+from shared.batch import BATCH_WORKERS
+from shared.scan import SCAN_SEGMENTS
+
+
+def default_max_pool() -> int:
+    threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+    return max(10, threads * max(SCAN_SEGMENTS, BATCH_WORKERS))
+
+
+DYNAMODB_MAX_POOL = int(os.environ.get('DYNAMODB_MAX_POOL') or default_max_pool())
+DYNAMODB_CONNECT_TIMEOUT = float(os.environ.get('DYNAMODB_CONNECT_TIMEOUT', '1'))
+DYNAMODB_READ_TIMEOUT = float(os.environ.get('DYNAMODB_READ_TIMEOUT', '5'))
+DYNAMODB_RETRY_MODE = os.environ.get('DYNAMODB_RETRY_MODE', 'adaptive')
+DYNAMODB_MAX_ATTEMPTS = int(os.environ.get('DYNAMODB_MAX_ATTEMPTS', '5'))
+
+# Crear clientes con la sesión por defecto no es thread-safe
+_lock = threading.Lock()
+
+
+def endpoint_url() -> Optional[str]:
+    return os.environ.get('DYNAMODB_ENDPOINT_URL') or None
+
+
+def client_config(config_class=Config, **overrides):
+    """
+    Config de botocore para DynamoDB. config_class permite pasar AioConfig
+    (aiobotocore) con los mismos valores.
+    """
+    options = {
+        'max_pool_connections': DYNAMODB_MAX_POOL,
+        'connect_timeout': DYNAMODB_CONNECT_TIMEOUT,
+        'read_timeout': DYNAMODB_READ_TIMEOUT,
+        'retries': {'mode': DYNAMODB_RETRY_MODE, 'total_max_attempts': DYNAMODB_MAX_ATTEMPTS},
+        'tcp_keepalive': True,
+    }
+    options.update(overrides)
+    return config_class(**options)
+
+
+@lru_cache(maxsize=None)
+def get_client(region_name: str):
+    """Cliente DynamoDB de bajo nivel compartido por región"""
+    with _lock:
+        return boto3.client('dynamodb', region_name=region_name, endpoint_url=endpoint_url(),
+                            config=client_config())
+
+
+@lru_cache(maxsize=None)
+def get_resource(region_name: str):
+    """
+    boto3.resource de DynamoDB compartido por región (scan paralelo y
+    scripts); usa un cliente con la misma configuración
+    """
+    with _lock:
+        return boto3.resource('dynamodb', region_name=region_name, endpoint_url=endpoint_url(),
+                              config=client_config())
@@ -0,0 +1,105 @@
+"""
+Compresión negociada de las respuestas (Accept-Encoding)
+
+Se usa brotli si el cliente lo acepta y el paquete está instalado (es
+opcional) y gzip en otro caso. Las respuestas pequeñas no se comprimen: por
+debajo de COMPRESSION_MIN_SIZE bytes la cabecera gzip y el coste de CPU no
+compensan.
+
+En la Lambda el body comprimido se devuelve en base64 con
+isBase64Encoded; API Gateway lo decodifica porque la API declara
+BinaryMediaTypes '*/*' (cloudformation/04-lambda-option-b.yml).
+"""
+import gzip
+import importlib.util
+import os
+import zlib
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+
+# Niveles intermedios: casi toda la reducción de tamaño con poca CPU
+GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+
+# brotli se importa solo al usarlo (no penaliza el arranque en frío)
+BROTLI_AVAILABLE = importlib.util.find_spec('brotli') is not None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+def _accepted_encodings(accept_encoding: str) -> dict:
+    """{codificación: q} de una cabecera Accept-Encoding"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """'br', 'gzip' o None según lo que acepta el cliente"""
+    if not accept_encoding:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+    candidates = ('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def stream_compressor(encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """(comprimir trozo, terminar) para comprimir una respuesta en streaming"""
+    if encoding == 'br':
+        import brotli
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # wbits 31 = formato gzip
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def iter_compress(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """Comprimir los trozos de una respuesta a medida que se generan"""
+    compress_chunk, finish = stream_compressor(encoding)
+    for chunk in chunks:
+        data = compress_chunk(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def weak_etag(etag: Optional[str]) -> Optional[str]:
+    """
+    ETag débil para la versión comprimida: los bytes ya no son los del ETag
+    fuerte, pero el contenido es equivalente (If-None-Match usa comparación
+    débil en GET)
+    """
+    if not etag or etag.startswith('W/'):
+        return etag
+    return 'W/' + etag
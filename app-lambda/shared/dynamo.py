@@ -0,0 +1,470 @@
+"""
+Acceso a DynamoDB con el cliente de bajo nivel y un serializador propio
+
+boto3.resource convierte cada atributo con TypeSerializer/TypeDeserializer
+(inspección de tipos, Decimal, sets...). El esquema de una nota es fijo
+(strings y una lista de strings), así que aquí se usa una tabla de
+conversiones precalculada por atributo y solo se recurre al serializador
+genérico para atributos desconocidos.
+
+Cada operación es una secuencia de pasos sin E/S (shared/steps.py):
+NotesTable e IndexTable la ejecutan con el cliente de boto3 y
+shared/dynamo_async.py con el de aiobotocore.
+"""
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from shared.utils import (
+    NOTES_BY_DATE_INDEX, NOTES_BY_UPDATE_INDEX, NOTES_SUMMARY_INDEX, SUMMARY_FIELDS, ENTITY_TYPE, with_preview,
+    is_conditional_check_failure
+)
+from shared.batch import get_items, write_requests
+from shared.steps import Steps, run
+from shared.scan import iter_parallel_scan
+from shared.clients import get_client, get_resource
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _to_string(value: str) -> Dict:
+    return {'S': value}
+
+
+def _to_string_list(values: List[str]) -> Dict:
+    return {'L': [{'S': value} for value in values]}
+
+
+class NoteMarshaller:
+    """Conversión item <-> AttributeValue para el esquema fijo de Note"""
+
+    STRING_FIELDS = ('note_id', 'title', 'content', 'preview', 'created_at', 'updated_at', 'entity_type')
+    STRING_LIST_FIELDS = ('tags',)
+
+    def __init__(self):
+        self._marshallers: Dict[str, Callable] = {}
+        for field in self.STRING_FIELDS:
+            self._marshallers[field] = _to_string
+        for field in self.STRING_LIST_FIELDS:
+            self._marshallers[field] = _to_string_list
+
+    def marshal_value(self, field: str, value) -> Dict:
+        marshaller = self._marshallers.get(field)
+        if marshaller is not None and value is not None:
+            return marshaller(value)
+        return _serializer.serialize(value)
+
+    def marshal(self, item: Dict) -> Dict:
+        marshallers = self._marshallers
+        result = {}
+        for field, value in item.items():
+            marshaller = marshallers.get(field)
+            if marshaller is not None and value is not None:
+                result[field] = marshaller(value)
+            else:
+                result[field] = _serializer.serialize(value)
+        return result
+
+    def unmarshal(self, attributes: Dict) -> Dict:
+        result = {}
+        for field, value in attributes.items():
+            if 'S' in value:
+                result[field] = value['S']
+            elif 'L' in value and field in self.STRING_LIST_FIELDS:
+                result[field] = [element['S'] for element in value['L']]
+            else:
+                result[field] = _deserializer.deserialize(value)
+        return result
+
+
+marshaller = NoteMarshaller()
+
+
+def projection(fields: List[str]) -> Dict:
+    """ProjectionExpression (con nombres de atributo) para leer solo fields"""
+    return {
+        'ProjectionExpression': ', '.join(f'#{field}' for field in fields),
+        'ExpressionAttributeNames': {f'#{field}': field for field in fields}
+    }
+
+
+def date_index(fields: Optional[List[str]] = None) -> str:
+    """
+    Índice por fecha de creación a usar: el de resumen si basta para los
+    campos pedidos (items más pequeños, menos capacidad de lectura)
+    """
+    if fields and set(fields) <= set(SUMMARY_FIELDS):
+        return NOTES_SUMMARY_INDEX
+    return NOTES_BY_DATE_INDEX
+
+
+def scan_options(fields: Optional[List[str]] = None) -> Dict:
+    """
+    Argumentos de Scan para leer solo fields y, si caben en el resumen, del
+    índice created_at-summary-index
+    """
+    if not fields:
+        return {}
+    options = projection(fields)
+    if date_index(fields) == NOTES_SUMMARY_INDEX:
+        options['IndexName'] = NOTES_SUMMARY_INDEX
+    return options
+
+
+# ============= PETICIONES =============
+
+def note_key(note_id: str) -> Dict:
+    return {'note_id': {'S': note_id}}
+
+
+def index_key(pk: str, sk: str) -> Dict:
+    return {'pk': {'S': pk}, 'sk': {'S': sk}}
+
+
+def put_requests(items: List[Dict]) -> List[Dict]:
+    return [{'PutRequest': {'Item': marshaller.marshal(item)}} for item in items]
+
+
+def note_delete_requests(note_ids: List[str]) -> List[Dict]:
+    return [{'DeleteRequest': {'Key': note_key(note_id)}} for note_id in note_ids]
+
+
+def index_write_requests(puts: List[Dict], deletes: List[Dict]) -> List[Dict]:
+    """PutRequest de las entradas puts y DeleteRequest de las claves (pk/sk) deletes"""
+    return put_requests(puts) + [
+        {'DeleteRequest': {'Key': index_key(key['pk'], key['sk'])}} for key in deletes
+    ]
+
+
+def request_note_id(request: Dict) -> str:
+    """note_id de una PutRequest/DeleteRequest de la tabla de notas"""
+    if 'PutRequest' in request:
+        return request['PutRequest']['Item']['note_id']['S']
+    return request['DeleteRequest']['Key']['note_id']['S']
+
+
+def batch_get_keys(note_ids: List[str], fields: Optional[List[str]]) -> Tuple[List[Dict], Optional[Dict]]:
+    """(claves sin repetir, proyección con note_id) de una lectura por lotes"""
+    keys = [note_key(note_id) for note_id in dict.fromkeys(note_ids)]
+    fields = list(dict.fromkeys(['note_id'] + fields)) if fields else None
+    return keys, projection(fields) if fields else None
+
+
+def batch_get_result(items: List[Dict], unprocessed: List[Dict]) -> Tuple[Dict[str, Dict], List[str]]:
+    """({note_id: item}, note_id no leídos) de la respuesta de una lectura por lotes"""
+    found = {item['note_id']: item for item in map(marshaller.unmarshal, items)}
+    return found, [key['note_id']['S'] for key in unprocessed]
+
+
+def get_item(table_name: str, key: Dict) -> Steps:
+    response = yield 'get_item', {'TableName': table_name, 'Key': key}
+    item = response.get('Item')
+    return marshaller.unmarshal(item) if item else None
+
+
+def put_item(table_name: str, item: Dict) -> Steps:
+    yield 'put_item', {'TableName': table_name, 'Item': marshaller.marshal(item)}
+
+
+def update_note(table_name: str, note_id: str, values: Dict) -> Steps:
+    """
+    SET condicional de values. Devuelve (nota anterior, nota actualizada) o
+    None si la nota no existe (ver NotesTable.update_with_previous).
+    """
+    values = with_preview(values)
+    try:
+        response = yield 'update_item', {
+            'TableName': table_name,
+            'Key': note_key(note_id),
+            'UpdateExpression': 'SET ' + ', '.join(f'#{field} = :{field}' for field in values),
+            'ConditionExpression': 'attribute_exists(note_id)',
+            'ExpressionAttributeNames': {f'#{field}': field for field in values},
+            'ExpressionAttributeValues': {
+                f':{field}': marshaller.marshal_value(field, value)
+                for field, value in values.items()
+            },
+            'ReturnValues': 'ALL_OLD'
+        }
+    except Exception as e:
+        if is_conditional_check_failure(e):
+            return None
+        raise
+    previous = marshaller.unmarshal(response['Attributes'])
+    return previous, dict(previous, **values)
+
+
+def delete_note(table_name: str, note_id: str) -> Steps:
+    """Borrado condicional. Devuelve la nota borrada o None si no existía."""
+    try:
+        response = yield 'delete_item', {
+            'TableName': table_name,
+            'Key': note_key(note_id),
+            'ConditionExpression': 'attribute_exists(note_id)',
+            'ReturnValues': 'ALL_OLD'
+        }
+    except Exception as e:
+        if is_conditional_check_failure(e):
+            return None
+        raise
+    return marshaller.unmarshal(response['Attributes'])
+
+
+def query(kwargs: Dict, max_items: Optional[int] = None) -> Steps:
+    """
+    Query paginado hasta max_items (o hasta el final). Devuelve (items, si
+    hay más).
+    """
+    items = []
+    while True:
+        if max_items:
+            kwargs['Limit'] = max_items - len(items)
+        response = yield 'query', dict(kwargs)
+        items.extend(marshaller.unmarshal(item) for item in response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key or (max_items and len(items) >= max_items):
+            return items, bool(last_key)
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def query_by_date(table_name: str, limit: Optional[int] = None, start_key: Optional[Dict] = None,
+                  fields: Optional[List[str]] = None) -> Steps:
+    """Una página del índice por fecha. Devuelve (items, LastEvaluatedKey)."""
+    kwargs = {
+        'TableName': table_name,
+        'IndexName': date_index(fields),
+        'KeyConditionExpression': 'entity_type = :entity_type',
+        'ExpressionAttributeValues': {':entity_type': {'S': ENTITY_TYPE}},
+        'ScanIndexForward': False
+    }
+    if fields:
+        kwargs.update(projection(fields))
+    if limit:
+        kwargs['Limit'] = limit
+    if start_key:
+        kwargs['ExclusiveStartKey'] = marshaller.marshal(start_key)
+    response = yield 'query', kwargs
+    last_key = response.get('LastEvaluatedKey')
+    return (
+        [marshaller.unmarshal(item) for item in response.get('Items', [])],
+        marshaller.unmarshal(last_key) if last_key else None
+    )
+
+
+def query_by_update(table_name: str, since: str, max_items: int,
+                    after_note_id: Optional[str] = None) -> Steps:
+    """
+    Notas con updated_at >= since o, con after_note_id, posteriores a la
+    posición (since, after_note_id). Devuelve (items, si hay más).
+    """
+    kwargs = {
+        'TableName': table_name,
+        'IndexName': NOTES_BY_UPDATE_INDEX,
+        'KeyConditionExpression': 'entity_type = :entity_type AND updated_at >= :since',
+        'ExpressionAttributeValues': {':entity_type': {'S': ENTITY_TYPE}, ':since': {'S': since}}
+    }
+    if after_note_id:
+        # Clave del índice más la de la tabla: los empates de updated_at se
+        # retoman tras esa nota aunque sean más de una página
+        kwargs['ExclusiveStartKey'] = marshaller.marshal(
+            {'entity_type': ENTITY_TYPE, 'updated_at': since, 'note_id': after_note_id}
+        )
+    return (yield from query(kwargs, max_items))
+
+
+def query_partition(table_name: str, pk: str, max_items: Optional[int] = None,
+                    before: Optional[str] = None) -> Steps:
+    kwargs = {
+        'TableName': table_name,
+        'KeyConditionExpression': 'pk = :pk',
+        'ExpressionAttributeValues': {':pk': {'S': pk}},
+        'ScanIndexForward': False
+    }
+    if before:
+        kwargs['KeyConditionExpression'] += ' AND sk < :before'
+        kwargs['ExpressionAttributeValues'][':before'] = {'S': before}
+    items, _ = yield from query(kwargs, max_items)
+    return items
+
+
+def query_after(table_name: str, pk: str, after: str, max_items: Optional[int] = None) -> Steps:
+    items, _ = yield from query({
+        'TableName': table_name,
+        'KeyConditionExpression': 'pk = :pk AND sk > :after',
+        'ExpressionAttributeValues': {':pk': {'S': pk}, ':after': {'S': after}}
+    }, max_items)
+    return items
+
+
+def query_prefix(table_name: str, pk: str, sk_prefix: str, max_items: Optional[int] = None) -> Steps:
+    items, _ = yield from query({
+        'TableName': table_name,
+        'KeyConditionExpression': 'pk = :pk AND begins_with(sk, :prefix)',
+        'ExpressionAttributeValues': {':pk': {'S': pk}, ':prefix': {'S': sk_prefix}}
+    }, max_items)
+    return items
+
+
+def add(table_name: str, pk: str, sk: str, field: str, amount: int) -> Steps:
+    yield 'update_item', {
+        'TableName': table_name,
+        'Key': index_key(pk, sk),
+        'UpdateExpression': 'ADD #field :amount',
+        'ExpressionAttributeNames': {'#field': field},
+        'ExpressionAttributeValues': {':amount': {'N': str(amount)}}
+    }
+
+
+def touch(table_name: str, pk: str, sk: str, modified_at: str) -> Steps:
+    yield 'update_item', {
+        'TableName': table_name,
+        'Key': index_key(pk, sk),
+        'UpdateExpression': 'ADD version :one SET modified_at = :modified_at',
+        'ExpressionAttributeValues': {':one': {'N': '1'}, ':modified_at': {'S': modified_at}}
+    }
+
+
+# ============= TABLAS =============
+
+class NotesTable:
+    """Operaciones sobre la tabla de notas con el cliente de bajo nivel"""
+
+    def __init__(self, table_name: Optional[str] = None, region_name: Optional[str] = None, client=None):
+        self.name = table_name or os.environ.get('TABLE_NAME', 'Notes')
+        self.region_name = region_name or os.environ.get('REGION', 'us-east-1')
+        self.client = client or get_client(self.region_name)
+        self._table = None
+
+    def get(self, note_id: str) -> Optional[Dict]:
+        return run(get_item(self.name, note_key(note_id)), self.client)
+
+    def put(self, item: Dict) -> None:
+        run(put_item(self.name, item), self.client)
+
+    def update(self, note_id: str, values: Dict) -> Optional[Dict]:
+        """
+        SET de los atributos indicados si la nota existe.
+        Devuelve la nota actualizada o None si no existe.
+        """
+        result = self.update_with_previous(note_id, values)
+        return result[1] if result else None
+
+    def update_with_previous(self, note_id: str, values: Dict) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Como update, pero devuelve (nota anterior, nota actualizada) para
+        quien necesita saber qué ha cambiado (índices). Con ALL_OLD la
+        escritura devuelve la versión anterior y, como solo hay SET, la
+        nueva es esa misma con los valores aplicados.
+        """
+        return run(update_note(self.name, note_id, values), self.client)
+
+    def delete(self, note_id: str) -> Optional[Dict]:
+        """Borrar la nota si existe. Devuelve la nota borrada o None si no existía."""
+        return run(delete_note(self.name, note_id), self.client)
+
+    def put_many(self, items: List[Dict]) -> List[str]:
+        """Guardar items en lotes. Devuelve los note_id que no se pudieron escribir."""
+        unprocessed = write_requests(self.client, self.name, put_requests(items))
+        return [request_note_id(request) for request in unprocessed]
+
+    def delete_many(self, note_ids: List[str]) -> List[str]:
+        """Borrar notas en lotes. Devuelve los note_id que no se pudieron borrar."""
+        unprocessed = write_requests(self.client, self.name, note_delete_requests(note_ids))
+        return [request_note_id(request) for request in unprocessed]
+
+    def batch_get(self, note_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Leer varias notas (solo fields, si se indican).
+        Devuelve {note_id: item} de las que existen.
+        """
+        found, unprocessed = self.batch_get_with_unprocessed(note_ids, fields)
+        if unprocessed:
+            raise RuntimeError(f'BatchGetItem: {len(unprocessed)} claves sin procesar tras los reintentos')
+        return found
+
+    def batch_get_with_unprocessed(self, note_ids: List[str],
+                                   fields: Optional[List[str]] = None) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Como batch_get, pero sin fallar si quedan claves sin procesar tras
+        los reintentos: devuelve ({note_id: item}, note_id no leídos)
+        """
+        keys, options = batch_get_keys(note_ids, fields)
+        return batch_get_result(*get_items(self.client, self.name, keys, options))
+
+    def query_by_date(self, limit: Optional[int] = None, start_key: Optional[Dict] = None,
+                      fields: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Una página del índice por fecha (más recientes primero), con solo
+        fields si se indican. Devuelve (items, LastEvaluatedKey) ya
+        deserializados.
+        """
+        return run(query_by_date(self.name, limit, start_key, fields), self.client)
+
+    def scan_pages(self, total_segments: Optional[int] = None,
+                   fields: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """
+        Tabla completa sin orden, página a página, con scan paralelo por
+        segmentos (shared/scan.py). Con fields se leen solo esos atributos
+        y, si caben en el resumen, del índice created_at-summary-index.
+        """
+        if self._table is None:
+            self._table = get_resource(self.region_name).Table(self.name)
+        return iter_parallel_scan(self._table, total_segments, **scan_options(fields))
+
+    def query_by_update(self, since: str, max_items: int,
+                        after_note_id: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        """
+        Notas con updated_at >= since (o posteriores a (since, after_note_id)),
+        de la modificada hace más tiempo a la más reciente. Devuelve (items,
+        si hay más).
+        """
+        return run(query_by_update(self.name, since, max_items, after_note_id), self.client)
+
+
+class IndexTable:
+    """
+    Tabla auxiliar de índices (INDEX_TABLE_NAME) con clave pk/sk.
+    Cada tipo de índice usa su propio prefijo de pk (p.ej. 'term#').
+    """
+
+    def __init__(self, table_name: Optional[str] = None, region_name: Optional[str] = None, client=None):
+        self.name = table_name or os.environ.get('INDEX_TABLE_NAME', 'NotesIndex')
+        self.client = client or get_client(region_name or os.environ.get('REGION', 'us-east-1'))
+
+    def write(self, puts: List[Dict], deletes: List[Dict]) -> int:
+        """
+        Escribir y borrar entradas (items con pk/sk) en lotes.
+        Devuelve cuántas peticiones quedaron sin procesar.
+        """
+        requests = index_write_requests(puts, deletes)
+        if not requests:
+            return 0
+        return len(write_requests(self.client, self.name, requests))
+
+    def add(self, pk: str, sk: str, field: str, amount: int) -> None:
+        """Sumar amount a un contador numérico (UpdateItem ADD, atómico)"""
+        run(add(self.name, pk, sk, field, amount), self.client)
+
+    def get(self, pk: str, sk: str) -> Optional[Dict]:
+        return run(get_item(self.name, index_key(pk, sk)), self.client)
+
+    def touch(self, pk: str, sk: str, modified_at: str) -> None:
+        """Incrementar la versión de una entrada y guardar cuándo cambió"""
+        run(touch(self.name, pk, sk, modified_at), self.client)
+
+    def query_partition(self, pk: str, max_items: Optional[int] = None,
+                        before: Optional[str] = None) -> List[Dict]:
+        """
+        Entradas de una partición en orden descendente de sk, opcionalmente
+        solo las anteriores a before
+        """
+        return run(query_partition(self.name, pk, max_items, before), self.client)
+
+    def query_after(self, pk: str, after: str, max_items: Optional[int] = None) -> List[Dict]:
+        """Entradas de una partición con sk > after, en orden ascendente de sk"""
+        return run(query_after(self.name, pk, after, max_items), self.client)
+
+    def query_prefix(self, pk: str, sk_prefix: str, max_items: Optional[int] = None) -> List[Dict]:
+        """Entradas de una partición cuyo sk empieza por sk_prefix, en orden de sk"""
+        return run(query_prefix(self.name, pk, sk_prefix, max_items), self.client)
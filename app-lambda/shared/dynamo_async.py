@@ -0,0 +1,169 @@
+"""
+NotesTable e IndexTable de DynamoDB con un cliente de aiobotocore
+
+Misma interfaz que shared/dynamo.py con métodos async, para
+app-ecs/main_async.py. Ejecutan con run_async los mismos pasos sin E/S
+(shared/steps.py), así que las peticiones, la paginación, los reintentos y
+la conversión de tipos son los de la versión síncrona; solo cambia que los
+lotes y los segmentos del scan se reparten con asyncio en lugar de hilos.
+"""
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from shared import dynamo
+from shared.batch import GET_CHUNK_SIZE, WRITE_CHUNK_SIZE, chunked, get_chunk, write_chunk
+from shared.dynamo import marshaller
+from shared.scan import resolve_segments
+from shared.steps import run_async
+
+_DONE = object()
+
+
+async def write_requests(client, table_name: str, requests: List[Dict]) -> List[Dict]:
+    """Como shared.batch.write_requests. Devuelve las peticiones no procesadas."""
+    results = await asyncio.gather(*(
+        run_async(write_chunk(table_name, chunk), client) for chunk in chunked(requests, WRITE_CHUNK_SIZE)
+    ))
+    return [request for pending in results for request in pending]
+
+
+async def get_items(client, table_name: str, keys: List[Dict],
+                    projection: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict]]:
+    """Como shared.batch.get_items. Devuelve (items que existen, claves no procesadas)."""
+    results = await asyncio.gather(*(
+        run_async(get_chunk(table_name, chunk, projection), client) for chunk in chunked(keys, GET_CHUNK_SIZE)
+    ))
+    return (
+        [item for items, _ in results for item in items],
+        [key for _, pending in results for key in pending]
+    )
+
+
+class AsyncNotesTable:
+    """Tabla de notas (ver shared.dynamo.NotesTable)"""
+
+    def __init__(self, client, table_name: str):
+        self.client = client
+        self.name = table_name
+
+    async def get(self, note_id: str) -> Optional[Dict]:
+        return await run_async(dynamo.get_item(self.name, dynamo.note_key(note_id)), self.client)
+
+    async def put(self, item: Dict) -> None:
+        await run_async(dynamo.put_item(self.name, item), self.client)
+
+    async def update(self, note_id: str, values: Dict) -> Optional[Dict]:
+        result = await self.update_with_previous(note_id, values)
+        return result[1] if result else None
+
+    async def update_with_previous(self, note_id: str, values: Dict) -> Optional[Tuple[Dict, Dict]]:
+        return await run_async(dynamo.update_note(self.name, note_id, values), self.client)
+
+    async def delete(self, note_id: str) -> Optional[Dict]:
+        return await run_async(dynamo.delete_note(self.name, note_id), self.client)
+
+    async def put_many(self, items: List[Dict]) -> List[str]:
+        unprocessed = await write_requests(self.client, self.name, dynamo.put_requests(items))
+        return [dynamo.request_note_id(request) for request in unprocessed]
+
+    async def delete_many(self, note_ids: List[str]) -> List[str]:
+        unprocessed = await write_requests(self.client, self.name, dynamo.note_delete_requests(note_ids))
+        return [dynamo.request_note_id(request) for request in unprocessed]
+
+    async def batch_get(self, note_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict]:
+        found, unprocessed = await self.batch_get_with_unprocessed(note_ids, fields)
+        if unprocessed:
+            raise RuntimeError(f'BatchGetItem: {len(unprocessed)} claves sin procesar tras los reintentos')
+        return found
+
+    async def batch_get_with_unprocessed(self, note_ids: List[str],
+                                         fields: Optional[List[str]] = None) -> Tuple[Dict[str, Dict], List[str]]:
+        keys, options = dynamo.batch_get_keys(note_ids, fields)
+        return dynamo.batch_get_result(*await get_items(self.client, self.name, keys, options))
+
+    async def query_by_date(self, limit: Optional[int] = None, start_key: Optional[Dict] = None,
+                            fields: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Dict]]:
+        return await run_async(dynamo.query_by_date(self.name, limit, start_key, fields), self.client)
+
+    async def query_by_update(self, since: str, max_items: int,
+                              after_note_id: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        return await run_async(dynamo.query_by_update(self.name, since, max_items, after_note_id), self.client)
+
+    async def _scan_segment(self, segment: int, total_segments: int,
+                            fields: Optional[List[str]]) -> AsyncIterator[List[Dict]]:
+        kwargs = dict(dynamo.scan_options(fields), TableName=self.name)
+        if total_segments > 1:
+            kwargs['Segment'] = segment
+            kwargs['TotalSegments'] = total_segments
+        while True:
+            response = await self.client.scan(**kwargs)
+            yield [marshaller.unmarshal(item) for item in response.get('Items', [])]
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    async def scan_pages(self, total_segments: Optional[int] = None,
+                         fields: Optional[List[str]] = None) -> AsyncIterator[List[Dict]]:
+        """
+        Tabla completa sin orden, con los segmentos leídos a la vez y las
+        páginas según llegan (como shared.scan.iter_parallel_scan)
+        """
+        total_segments = resolve_segments(total_segments)
+        pages = asyncio.Queue(maxsize=total_segments * 2)
+
+        async def worker(segment):
+            try:
+                async for page in self._scan_segment(segment, total_segments, fields):
+                    await pages.put(page)
+                await pages.put(_DONE)
+            except Exception as e:
+                await pages.put(e)
+
+        workers = [asyncio.ensure_future(worker(segment)) for segment in range(total_segments)]
+        try:
+            pending = total_segments
+            while pending:
+                value = await pages.get()
+                if value is _DONE:
+                    pending -= 1
+                elif isinstance(value, Exception):
+                    raise value
+                else:
+                    yield value
+        finally:
+            # Si el consumidor deja de leer, los segmentos se cancelan
+            for task in workers:
+                task.cancel()
+
+
+class AsyncIndexTable:
+    """Tabla de índices pk/sk (ver shared.dynamo.IndexTable)"""
+
+    def __init__(self, client, table_name: str):
+        self.client = client
+        self.name = table_name
+
+    async def write(self, puts: List[Dict], deletes: List[Dict]) -> int:
+        requests = dynamo.index_write_requests(puts, deletes)
+        if not requests:
+            return 0
+        return len(await write_requests(self.client, self.name, requests))
+
+    async def add(self, pk: str, sk: str, field: str, amount: int) -> None:
+        await run_async(dynamo.add(self.name, pk, sk, field, amount), self.client)
+
+    async def get(self, pk: str, sk: str) -> Optional[Dict]:
+        return await run_async(dynamo.get_item(self.name, dynamo.index_key(pk, sk)), self.client)
+
+    async def touch(self, pk: str, sk: str, modified_at: str) -> None:
+        await run_async(dynamo.touch(self.name, pk, sk, modified_at), self.client)
+
+    async def query_partition(self, pk: str, max_items: Optional[int] = None,
+                              before: Optional[str] = None) -> List[Dict]:
+        return await run_async(dynamo.query_partition(self.name, pk, max_items, before), self.client)
+
+    async def query_after(self, pk: str, after: str, max_items: Optional[int] = None) -> List[Dict]:
+        return await run_async(dynamo.query_after(self.name, pk, after, max_items), self.client)
+
+    async def query_prefix(self, pk: str, sk_prefix: str, max_items: Optional[int] = None) -> List[Dict]:
+        return await run_async(dynamo.query_prefix(self.name, pk, sk_prefix, max_items), self.client)
@@ -0,0 +1,190 @@
+"""
+Métricas de las Lambdas en CloudWatch Embedded Metric Format (EMF)
+
+Cada invocación de un handler decorado con @instrument('<función>') escribe
+en stdout una línea JSON que CloudWatch Logs convierte en métricas
+(namespace EMF_NAMESPACE, dimensión FunctionName), sin llamadas a
+PutMetricData:
+
+    ColdStart           1 en la primera invocación del contenedor, 0 después
+    InitDuration        ms desde que se importó este módulo hasta la primera
+                        invocación (solo en el arranque en frío)
+    Duration            ms del handler
+    ValidationTime      ms validando el body (bloques phase('Validation'))
+    DynamoDBTime        ms en llamadas a DynamoDB (suma de todas, también las
+                        de los lotes en paralelo)
+    DynamoDBCalls       llamadas a la API de DynamoDB
+    DynamoDBErrors      llamadas que terminaron en error
+    DynamoDBItems       items leídos (Item, Items y Responses)
+    SerializationTime   ms generando y comprimiendo el body (create_response)
+    RequestBytes        tamaño del body de la petición
+    ResponseBytes       tamaño del body de la respuesta
+
+Route (la ruta, también con el router consolidado), StatusCode y RequestId
+van como propiedades: se consultan con Logs Insights pero no crean métricas.
+
+Las llamadas a DynamoDB se miden con eventos de botocore registrados en la
+sesión por defecto de boto3, y los clientes copian esos eventos al crearse:
+el handler debe importar shared.emf antes que cualquier otro módulo de
+shared (también para que InitDuration incluya su carga).
+
+Activo por defecto solo dentro de Lambda; EMF_ENABLED=true|false lo fuerza
+(p. ej. para comprobar las líneas en local leyendo stdout).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+_LOADED_AT = time.perf_counter()
+
+EMF_ENABLED = os.environ.get(
+    'EMF_ENABLED', 'true' if 'AWS_LAMBDA_FUNCTION_NAME' in os.environ else 'false'
+).lower() == 'true'
+EMF_NAMESPACE = os.environ.get('EMF_NAMESPACE', 'NotesApi')
+
+# Invocación en curso: una Lambda atiende una petición a la vez, pero los
+# lotes llaman a DynamoDB desde varios hilos
+_current: Optional[Dict] = None
+_lock = threading.Lock()
+_cold_start = True
+
+
+def _unit(name: str) -> str:
+    if name.endswith(('Time', 'Duration')):
+        return 'Milliseconds'
+    if name.endswith('Bytes'):
+        return 'Bytes'
+    return 'Count'
+
+
+def add(name: str, value: float) -> None:
+    """Sumar value a la métrica name de la invocación en curso (si la hay)"""
+    if _current is None:
+        return
+    with _lock:
+        metrics = _current['metrics']
+        metrics[name] = metrics.get(name, 0) + value
+
+
+@contextmanager
+def phase(name: str):
+    """Medir un bloque como la métrica <name>Time, en ms"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(f'{name}Time', (time.perf_counter() - start) * 1000)
+
+
+# ============= DYNAMODB (eventos de botocore) =============
+
+def _before_call(context=None, **kwargs):
+    context['emf_start'] = time.perf_counter()
+
+
+def _after_call(http_response=None, parsed=None, context=None, **kwargs):
+    start = context.pop('emf_start', None)
+    if start is not None:
+        add('DynamoDBTime', (time.perf_counter() - start) * 1000)
+    add('DynamoDBCalls', 1)
+    if http_response is not None and http_response.status_code >= 300:
+        add('DynamoDBErrors', 1)
+    elif parsed:
+        items = 1 if 'Item' in parsed else len(parsed.get('Items', ()))
+        items += sum(len(table_items) for table_items in parsed.get('Responses', {}).values())
+        if items:
+            add('DynamoDBItems', items)
+
+
+def _after_call_error(context=None, **kwargs):
+    start = context.pop('emf_start', None)
+    if start is not None:
+        add('DynamoDBTime', (time.perf_counter() - start) * 1000)
+    add('DynamoDBCalls', 1)
+    add('DynamoDBErrors', 1)
+
+
+def _register_boto3_events() -> None:
+    import boto3
+    if boto3.DEFAULT_SESSION is None:
+        boto3.setup_default_session()
+    events = boto3.DEFAULT_SESSION.events
+    events.register('before-call.dynamodb', _before_call)
+    events.register('after-call.dynamodb', _after_call)
+    events.register('after-call-error.dynamodb', _after_call_error)
+
+
+if EMF_ENABLED:
+    _register_boto3_events()
+
+
+# ============= HANDLERS =============
+
+def _body_bytes(body) -> int:
+    return len(body.encode('utf-8')) if isinstance(body, str) else 0
+
+
+def _emit(function_name: str, record: Dict) -> None:
+    metrics = {name: round(value, 3) for name, value in record['metrics'].items()}
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': EMF_NAMESPACE,
+                'Dimensions': [['FunctionName']],
+                'Metrics': [{'Name': name, 'Unit': _unit(name)} for name in metrics]
+            }]
+        },
+        'FunctionName': function_name,
+        **record['properties'],
+        **metrics
+    }, separators=(',', ':')))
+
+
+def instrument(route: str):
+    """
+    Decorador de lambda_handler: mide la invocación y escribe su línea EMF.
+    Un handler decorado llamado desde otro (el router) no escribe otra
+    línea: solo fija Route en la del router.
+    """
+    def decorator(handler):
+        if not EMF_ENABLED:
+            return handler
+
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            global _current, _cold_start
+            if _current is not None:
+                _current['properties']['Route'] = route
+                return handler(event, context)
+
+            start = time.perf_counter()
+            metrics = {'ColdStart': 1 if _cold_start else 0}
+            if _cold_start:
+                metrics['InitDuration'] = (start - _LOADED_AT) * 1000
+                _cold_start = False
+            metrics['RequestBytes'] = _body_bytes((event or {}).get('body'))
+            record = _current = {
+                'metrics': metrics,
+                'properties': {'Route': route, 'RequestId': getattr(context, 'aws_request_id', None)}
+            }
+            response = None
+            try:
+                response = handler(event, context)
+                return response
+            finally:
+                _current = None
+                metrics['Duration'] = (time.perf_counter() - start) * 1000
+                if isinstance(response, dict):
+                    metrics['ResponseBytes'] = _body_bytes(response.get('body'))
+                    record['properties']['StatusCode'] = response.get('statusCode')
+                function_name = getattr(context, 'function_name', None) or \
+                    os.environ.get('AWS_LAMBDA_FUNCTION_NAME', route)
+                _emit(function_name, record)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,90 @@
+"""
+Índices de la tabla auxiliar (INDEX_TABLE_NAME) que se mantienen en cada
+escritura de notas: búsqueda de texto (shared/search.py), tags
+(shared/tags.py) y lápidas de notas borradas (shared/changes.py)
+
+Las escrituras de notas llaman a NoteIndexes.update con la versión anterior
+y la actual de cada nota; las entradas de todos los índices se escriben en
+un único BatchWriteItem y los contadores con UpdateItem ADD.
+
+Cada escritura incrementa además la versión de la colección de notas
+(pk = 'meta', sk = 'notes'), que da el ETag de los listados: un GET /notes
+condicional se responde con 304 leyendo un solo item, sin consultar notas.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from shared import search, tags
+from shared.changes import tombstones
+from shared.search import SearchIndex
+from shared.tags import TagIndex
+
+Change = Tuple[Optional[Dict], Optional[Dict]]
+
+COLLECTION_VERSION_KEY = ('meta', 'notes')
+
+
+def index_changes(changes: List[Change]) -> Tuple[List[Dict], List[Dict], Dict]:
+    """
+    Entradas a escribir, claves a borrar y variación de contadores
+    ({(pk, sk): delta}) de todos los índices para una lista de cambios
+    (anterior, actual) de notas
+    """
+    puts, deletes, counters = [], [], {}
+    for previous, current in changes:
+        search_puts, search_deletes = search.index_changes(previous, current)
+        tag_puts, tag_deletes, tag_counters = tags.index_changes(previous, current)
+        puts += search_puts + tag_puts + tombstones(previous, current)
+        deletes += search_deletes + tag_deletes
+        for key, delta in tag_counters.items():
+            counters[key] = counters.get(key, 0) + delta
+    return puts, deletes, {key: delta for key, delta in counters.items() if delta}
+
+
+def collection_version(item: Optional[Dict]) -> Tuple[int, Optional[str]]:
+    """(versión, fecha de la última escritura) a partir de la entrada COLLECTION_VERSION_KEY"""
+    item = item or {}
+    return int(item.get('version', 0)), item.get('modified_at')
+
+
+class NoteIndexes:
+    """Mantenimiento de todos los índices y acceso a sus consultas"""
+
+    def __init__(self, index_table):
+        self.table = index_table
+        self.search = SearchIndex(index_table)
+        self.tags = TagIndex(index_table)
+
+    def update(self, previous: Optional[Dict], current: Optional[Dict]) -> None:
+        """Aplicar a los índices el cambio de una nota (anterior, actual)"""
+        self.update_many([(previous, current)])
+
+    def update_many(self, changes: List[Change]) -> None:
+        """
+        Aplicar los cambios de varias notas. Un fallo no se propaga: las
+        notas ya están guardadas y las consultas verifican los resultados
+        contra ellas (scripts/rebuild-indexes.py reconstruye los índices).
+        """
+        if not changes:
+            return
+        try:
+            puts, deletes, counters = index_changes(changes)
+            unprocessed = self.table.write(puts, deletes)
+            if unprocessed:
+                print(f"Índices: {unprocessed} entradas sin procesar")
+            for (pk, sk), delta in counters.items():
+                self.table.add(pk, sk, 'count', delta)
+        except Exception as e:
+            print(f"Error actualizando los índices: {str(e)}")
+        self.touch_collection()
+
+    def touch_collection(self) -> None:
+        """Nueva versión de la colección (invalida los ETag de los listados)"""
+        try:
+            self.table.touch(*COLLECTION_VERSION_KEY, datetime.utcnow().isoformat() + 'Z')
+        except Exception as e:
+            print(f"Error actualizando la versión de la colección: {str(e)}")
+
+    def collection_version(self) -> Tuple[int, Optional[str]]:
+        """(versión, fecha de la última escritura) de la colección de notas"""
+        return collection_version(self.table.get(*COLLECTION_VERSION_KEY))
@@ -0,0 +1,259 @@
+"""
+Almacenamiento en memoria del proceso (DB_TYPE=memory)
+
+Mismas clases e interfaz que shared/dynamo.py. Cada tabla es un diccionario
+por clave más listas ordenadas (bisect) que hacen de índices:
+
+    notas    (created_at, note_id) y (updated_at, note_id) de las notas con
+             entity_type, como los GSI created_at-index y updated_at-index
+    índices  sk ordenados por partición pk
+
+Los datos se comparten entre todas las instancias con el mismo nombre de
+tabla en el proceso (p. ej. los handlers Lambda cargados juntos) y se
+pierden al terminar. Pensado para pruebas y benchmarks sin red.
+"""
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from shared.storage import PAGE_SIZE, select_fields, date_key, prefix_end
+from shared.utils import ENTITY_TYPE, with_preview
+
+_tables: Dict[Tuple[str, str], object] = {}
+_tables_lock = threading.Lock()
+
+
+def _shared_state(kind: str, name: str, factory):
+    with _tables_lock:
+        key = (kind, name)
+        if key not in _tables:
+            _tables[key] = factory()
+        return _tables[key]
+
+
+def _copy(item: Dict) -> Dict:
+    """Copia con sus propias listas, para que nadie modifique lo guardado"""
+    return {k: list(v) if isinstance(v, list) else v for k, v in item.items()}
+
+
+class _NotesState:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.items: Dict[str, Dict] = {}
+        self.by_date: List[Tuple[str, str]] = []
+        self.by_update: List[Tuple[str, str]] = []
+
+    @staticmethod
+    def _index_keys(item: Dict):
+        # Índices dispersos, como los GSI: solo notas con entity_type
+        if item.get('entity_type') != ENTITY_TYPE:
+            return None, None
+        note_id = item['note_id']
+        by_date = (item['created_at'], note_id) if 'created_at' in item else None
+        by_update = (item['updated_at'], note_id) if 'updated_at' in item else None
+        return by_date, by_update
+
+    def remove(self, note_id: str) -> Optional[Dict]:
+        item = self.items.pop(note_id, None)
+        if item is not None:
+            by_date, by_update = self._index_keys(item)
+            for keys, key in ((self.by_date, by_date), (self.by_update, by_update)):
+                if key is not None:
+                    del keys[bisect_left(keys, key)]
+        return item
+
+    def store(self, item: Dict) -> None:
+        self.remove(item['note_id'])
+        self.items[item['note_id']] = item
+        by_date, by_update = self._index_keys(item)
+        if by_date is not None:
+            insort(self.by_date, by_date)
+        if by_update is not None:
+            insort(self.by_update, by_update)
+
+
+class NotesTable:
+    """Tabla de notas en memoria"""
+
+    def __init__(self, table_name: Optional[str] = None, region_name: Optional[str] = None, **kwargs):
+        self.name = table_name or os.environ.get('TABLE_NAME', 'Notes')
+        self._state = _shared_state('notes', self.name, _NotesState)
+
+    def get(self, note_id: str) -> Optional[Dict]:
+        with self._state.lock:
+            item = self._state.items.get(note_id)
+            return _copy(item) if item else None
+
+    def put(self, item: Dict) -> None:
+        with self._state.lock:
+            self._state.store(_copy(item))
+
+    def update(self, note_id: str, values: Dict) -> Optional[Dict]:
+        result = self.update_with_previous(note_id, values)
+        return result[1] if result else None
+
+    def update_with_previous(self, note_id: str, values: Dict) -> Optional[Tuple[Dict, Dict]]:
+        values = with_preview(values)
+        with self._state.lock:
+            previous = self._state.items.get(note_id)
+            if previous is None:
+                return None
+            current = dict(previous, **_copy(values))
+            self._state.store(current)
+            return _copy(previous), _copy(current)
+
+    def delete(self, note_id: str) -> Optional[Dict]:
+        with self._state.lock:
+            return self._state.remove(note_id)
+
+    def put_many(self, items: List[Dict]) -> List[str]:
+        with self._state.lock:
+            for item in items:
+                self._state.store(_copy(item))
+        return []
+
+    def delete_many(self, note_ids: List[str]) -> List[str]:
+        with self._state.lock:
+            for note_id in note_ids:
+                self._state.remove(note_id)
+        return []
+
+    def batch_get(self, note_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict]:
+        fields = list(dict.fromkeys(['note_id'] + fields)) if fields else None
+        with self._state.lock:
+            items = self._state.items
+            return {
+                note_id: select_fields(_copy(items[note_id]), fields)
+                for note_id in dict.fromkeys(note_ids) if note_id in items
+            }
+
+    def batch_get_with_unprocessed(self, note_ids: List[str],
+                                   fields: Optional[List[str]] = None) -> Tuple[Dict[str, Dict], List[str]]:
+        return self.batch_get(note_ids, fields), []
+
+    def query_by_date(self, limit: Optional[int] = None, start_key: Optional[Dict] = None,
+                      fields: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Dict]]:
+        """Una página por fecha (más recientes primero) y la clave de la siguiente"""
+        limit = limit or PAGE_SIZE
+        with self._state.lock:
+            keys = self._state.by_date
+            end = bisect_left(keys, (start_key['created_at'], start_key['note_id'])) if start_key else len(keys)
+            start = max(0, end - limit)
+            page = [self._state.items[note_id] for _, note_id in reversed(keys[start:end])]
+            last_key = date_key(page[-1]) if page and start > 0 else None
+            return [select_fields(_copy(item), fields) for item in page], last_key
+
+    def query_by_update(self, since: str, max_items: int,
+                        after_note_id: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        with self._state.lock:
+            keys = self._state.by_update
+            if after_note_id:
+                start = bisect_right(keys, (since, after_note_id))
+            else:
+                start = bisect_left(keys, (since,))
+            page = keys[start:start + max_items]
+            return [_copy(self._state.items[note_id]) for _, note_id in page], start + max_items < len(keys)
+
+    def scan_pages(self, total_segments: Optional[int] = None,
+                   fields: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """Todas las notas sin orden, en páginas de PAGE_SIZE (sin segmentos)"""
+        with self._state.lock:
+            items = list(self._state.items.values())
+        for start in range(0, len(items), PAGE_SIZE):
+            yield [select_fields(_copy(item), fields) for item in items[start:start + PAGE_SIZE]]
+
+
+class _IndexState:
+    def __init__(self):
+        self.lock = threading.RLock()
+        # pk -> (sk ordenados, {sk: item})
+        self.partitions: Dict[str, Tuple[List[str], Dict[str, Dict]]] = {}
+
+    def partition(self, pk: str):
+        if pk not in self.partitions:
+            self.partitions[pk] = ([], {})
+        return self.partitions[pk]
+
+    def store(self, item: Dict) -> None:
+        sks, items = self.partition(item['pk'])
+        if item['sk'] not in items:
+            insort(sks, item['sk'])
+        items[item['sk']] = item
+
+    def remove(self, pk: str, sk: str) -> None:
+        partition = self.partitions.get(pk)
+        if partition and sk in partition[1]:
+            sks, items = partition
+            del items[sk]
+            del sks[bisect_left(sks, sk)]
+
+
+class IndexTable:
+    """Tabla de índices (pk/sk) en memoria"""
+
+    def __init__(self, table_name: Optional[str] = None, region_name: Optional[str] = None, **kwargs):
+        self.name = table_name or os.environ.get('INDEX_TABLE_NAME', 'NotesIndex')
+        self._state = _shared_state('index', self.name, _IndexState)
+
+    def write(self, puts: List[Dict], deletes: List[Dict]) -> int:
+        with self._state.lock:
+            for item in puts:
+                self._state.store(_copy(item))
+            for key in deletes:
+                self._state.remove(key['pk'], key['sk'])
+        return 0
+
+    def add(self, pk: str, sk: str, field: str, amount: int) -> None:
+        with self._state.lock:
+            item = dict(self._state.partition(pk)[1].get(sk) or {'pk': pk, 'sk': sk})
+            item[field] = item.get(field, 0) + amount
+            self._state.store(item)
+
+    def get(self, pk: str, sk: str) -> Optional[Dict]:
+        with self._state.lock:
+            partition = self._state.partitions.get(pk)
+            item = partition[1].get(sk) if partition else None
+            return _copy(item) if item else None
+
+    def touch(self, pk: str, sk: str, modified_at: str) -> None:
+        with self._state.lock:
+            item = dict(self._state.partition(pk)[1].get(sk) or {'pk': pk, 'sk': sk})
+            item['version'] = item.get('version', 0) + 1
+            item['modified_at'] = modified_at
+            self._state.store(item)
+
+    def _entries(self, pk: str, start: int, end: Optional[int], reverse: bool,
+                 max_items: Optional[int]) -> List[Dict]:
+        partition = self._state.partitions.get(pk)
+        if not partition:
+            return []
+        sks, items = partition
+        selected = sks[start:end]
+        if reverse:
+            selected.reverse()
+        if max_items:
+            selected = selected[:max_items]
+        return [_copy(items[sk]) for sk in selected]
+
+    def query_partition(self, pk: str, max_items: Optional[int] = None,
+                        before: Optional[str] = None) -> List[Dict]:
+        with self._state.lock:
+            partition = self._state.partitions.get(pk)
+            end = bisect_left(partition[0], before) if partition and before else None
+            return self._entries(pk, 0, end, True, max_items)
+
+    def query_after(self, pk: str, after: str, max_items: Optional[int] = None) -> List[Dict]:
+        with self._state.lock:
+            partition = self._state.partitions.get(pk)
+            start = bisect_right(partition[0], after) if partition else 0
+            return self._entries(pk, start, None, False, max_items)
+
+    def query_prefix(self, pk: str, sk_prefix: str, max_items: Optional[int] = None) -> List[Dict]:
+        with self._state.lock:
+            partition = self._state.partitions.get(pk)
+            if not partition:
+                return []
+            start = bisect_left(partition[0], sk_prefix)
+            end = bisect_left(partition[0], prefix_end(sk_prefix))
+            return self._entries(pk, start, end, False, max_items)
@@ -1,39 +1,44 @@
 """
-Modelos Pydantic compartidos entre todas las funciones Lambda
+Modelos Pydantic (v2) compartidos entre las funciones Lambda y la app ECS
+
+Las restricciones son declarativas (Field/Annotated) para que las aplique
+el validador compilado de pydantic-core sin recorrer los tags en Python.
+Con model_validate_json se valida directamente el body en bruto, sin
+construir antes el dict con json.loads.
 """
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from typing import Annotated, List, Optional
+
+from pydantic import AfterValidator, BaseModel, Field, ValidationError
+
+MAX_TAGS = 10
+MAX_TAG_LENGTH = 50
+
+
+def _unique(tags: List[str]) -> List[str]:
+    if len(tags) != len(set(tags)):
+        raise ValueError('No se permiten tags duplicados')
+    return tags
+
+
+Tag = Annotated[str, Field(max_length=MAX_TAG_LENGTH)]
+Tags = Annotated[List[Tag], Field(max_length=MAX_TAGS), AfterValidator(_unique)]
 
 
 class NoteCreate(BaseModel):
     """Modelo para crear una nota"""
     title: str = Field(..., min_length=1, max_length=200)
     content: str = Field(..., min_length=1, max_length=10000)
-    tags: Optional[List[str]] = Field(default_factory=list, max_items=10)
-
-    @validator('tags')
-    def validate_tags(cls, v):
-        if v:
-            for tag in v:
-                if len(tag) > 50:
-                    raise ValueError('Tag demasiado largo (máx 50 caracteres)')
-            if len(v) != len(set(v)):
-                raise ValueError('No se permiten tags duplicados')
-        return v
+    # tags: null equivale a no enviar tags
+    tags: Annotated[Optional[Tags], AfterValidator(lambda v: v or [])] = Field(default_factory=list)
 
 
 class NoteUpdate(BaseModel):
     """Modelo para actualizar una nota"""
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     content: Optional[str] = Field(None, min_length=1, max_length=10000)
-    tags: Optional[List[str]] = Field(None, max_items=10)
-
-    @validator('tags')
-    def validate_tags(cls, v):
-        if v is not None:
-            for tag in v:
-                if len(tag) > 50:
-                    raise ValueError('Tag demasiado largo (máx 50 caracteres)')
-            if len(v) != len(set(v)):
-                raise ValueError('No se permiten tags duplicados')
-        return v
\ No newline at end of file
+    tags: Optional[Tags] = None
+
+
+def validation_errors(error: ValidationError) -> List[dict]:
+    """Errores de validación serializables a JSON (sin ctx ni URLs)"""
+    return error.errors(include_url=False, include_context=False)
@@ -0,0 +1,177 @@
+"""
+Métricas Prometheus de la API en ECS (GET /metrics)
+
+    http_request_duration_seconds{method,route,status}   histograma por ruta
+    http_requests_in_progress{method,route}              peticiones en curso
+    notes_db_operation_duration_seconds{operation}       cada método de la BD
+    notes_db_operation_errors_total{operation,error}     excepciones por método
+    dynamodb_requests_total{operation,status}            cada intento a DynamoDB
+    notes_coalesced_requests_total{operation}            lecturas agrupadas (singleflight)
+
+route es la regla de la ruta (/notes/<note_id>), no la URL, para que el
+número de series no crezca con los ids. dynamodb_requests_total cuenta
+también los reintentos de boto3, así que los throttles
+(ProvisionedThroughputExceededException, ThrottlingException) se ven
+aunque la petición acabe bien.
+
+Con Gunicorn cada worker es un proceso: si PROMETHEUS_MULTIPROC_DIR está
+definido (gunicorn.conf.py lo define) los valores se guardan en ese
+directorio y /metrics agrega los de todos los workers.
+"""
+import functools
+import inspect
+import os
+import time
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+
+# Latencias de 1 ms a 10 s: las lecturas de una nota suelen estar por debajo de 25 ms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Peticiones HTTP en curso',
+    ['method', 'route'], multiprocess_mode='livesum'
+)
+DB_LATENCY = Histogram(
+    'notes_db_operation_duration_seconds', 'Latencia de las operaciones de base de datos',
+    ['operation'], buckets=LATENCY_BUCKETS
+)
+DB_ERRORS = Counter(
+    'notes_db_operation_errors_total', 'Operaciones de base de datos que lanzaron una excepción',
+    ['operation', 'error']
+)
+COALESCED_REQUESTS = Counter(
+    'notes_coalesced_requests_total', 'Lecturas servidas por una llamada idéntica que ya estaba en curso',
+    ['operation']
+)
+DYNAMODB_REQUESTS = Counter(
+    'dynamodb_requests_total', 'Intentos de llamada a la API de DynamoDB (reintentos incluidos)',
+    ['operation', 'status']
+)
+
+
+def error_name(error: Exception) -> str:
+    """Código de error de AWS (ClientError) o nombre de la excepción"""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code')
+        if code:
+            return code
+    return type(error).__name__
+
+
+# ============= BASE DE DATOS =============
+
+def _timed(name: str, method):
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def async_generator_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            items = method(*args, **kwargs)
+            try:
+                async for item in items:
+                    yield item
+            except Exception as e:
+                DB_ERRORS.labels(name, error_name(e)).inc()
+                raise
+            finally:
+                await items.aclose()
+                DB_LATENCY.labels(name).observe(time.perf_counter() - start)
+        return async_generator_wrapper
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def coroutine_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception as e:
+                DB_ERRORS.labels(name, error_name(e)).inc()
+                raise
+            finally:
+                DB_LATENCY.labels(name).observe(time.perf_counter() - start)
+        return coroutine_wrapper
+
+    if inspect.isgeneratorfunction(method):
+        # Los generadores se miden mientras se recorren, no al crearlos
+        @functools.wraps(method)
+        def generator_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                yield from method(*args, **kwargs)
+            except Exception as e:
+                DB_ERRORS.labels(name, error_name(e)).inc()
+                raise
+            finally:
+                DB_LATENCY.labels(name).observe(time.perf_counter() - start)
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            DB_ERRORS.labels(name, error_name(e)).inc()
+            raise
+        finally:
+            DB_LATENCY.labels(name).observe(time.perf_counter() - start)
+    return wrapper
+
+
+def instrument(cls):
+    """
+    Decorador de clase: mide latencia y errores de cada método público
+    (la operación es el nombre del método), también si es async
+    """
+    for name, method in list(vars(cls).items()):
+        if not name.startswith('_') and inspect.isfunction(method):
+            setattr(cls, name, _timed(name, method))
+    return cls
+
+
+def _count_dynamodb_attempt(response=None, operation=None, caught_exception=None, **kwargs):
+    if caught_exception is not None:
+        status = type(caught_exception).__name__
+    else:
+        error = (response[1].get('Error') or {}) if response else {}
+        status = error.get('Code') or 'OK'
+    DYNAMODB_REQUESTS.labels(operation.name, status).inc()
+    # None: no decide nada sobre el reintento
+
+
+def instrument_boto3() -> None:
+    """
+    Contar los intentos de todas las llamadas a DynamoDB de la sesión por
+    defecto de boto3. Los clientes copian los eventos de la sesión al
+    crearse, así que hay que llamarlo antes de crear ninguno.
+    """
+    import boto3
+    if boto3.DEFAULT_SESSION is None:
+        boto3.setup_default_session()
+    boto3.DEFAULT_SESSION.events.register('needs-retry.dynamodb', _count_dynamodb_attempt)
+
+
+def instrument_session(session) -> None:
+    """Como instrument_boto3, para una sesión de aiobotocore (main_async.py)"""
+    session.register('needs-retry.dynamodb', _count_dynamodb_attempt)
+
+
+# ============= EXPOSICIÓN =============
+
+def render() -> Tuple[bytes, str]:
+    """(cuerpo, Content-Type) de la respuesta de /metrics"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
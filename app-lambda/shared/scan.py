@@ -0,0 +1,121 @@
+"""
+Scan paralelo por segmentos (Segment/TotalSegments) de DynamoDB
+
+Usado por los listados completos, las exportaciones y la app ECS para que
+el tiempo de recorrer la tabla escale con el número de segmentos y no con
+un único cursor secuencial.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+# Número de segmentos por defecto (configurable por entorno)
+SCAN_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '4'))
+MAX_SCAN_SEGMENTS = 64
+
+_DONE = object()
+
+
+def resolve_segments(total_segments: Optional[int] = None) -> int:
+    """
+    Número de segmentos a usar (entre 1 y MAX_SCAN_SEGMENTS)
+    """
+    if total_segments is None:
+        total_segments = SCAN_SEGMENTS
+    return min(max(1, int(total_segments)), MAX_SCAN_SEGMENTS)
+
+
+def scan_segment(table, segment: int, total_segments: int, **scan_kwargs) -> Iterator[List[Dict]]:
+    """
+    Recorrer un segmento de la tabla página a página.
+
+    Se usa table.meta.client (thread-safe, con los tipos de alto nivel del
+    resource) en lugar del propio Table, que no debe compartirse entre hilos.
+    """
+    kwargs = dict(scan_kwargs, TableName=table.name)
+    if total_segments > 1:
+        kwargs['Segment'] = segment
+        kwargs['TotalSegments'] = total_segments
+
+    while True:
+        response = table.meta.client.scan(**kwargs)
+        yield response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def parallel_scan(table, total_segments: Optional[int] = None, **scan_kwargs) -> List[Dict]:
+    """
+    Leer la tabla completa con N segmentos en paralelo y unir los resultados
+    """
+    total_segments = resolve_segments(total_segments)
+
+    def read_segment(segment):
+        items = []
+        for page in scan_segment(table, segment, total_segments, **scan_kwargs):
+            items.extend(page)
+        return items
+
+    if total_segments == 1:
+        return read_segment(0)
+
+    items = []
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        for segment_items in pool.map(read_segment, range(total_segments)):
+            items.extend(segment_items)
+    return items
+
+
+def iter_parallel_scan(table, total_segments: Optional[int] = None, **scan_kwargs) -> Iterator[List[Dict]]:
+    """
+    Igual que parallel_scan pero devolviendo las páginas según llegan de
+    cualquier segmento, sin orden. Como mucho se mantienen en memoria dos
+    páginas por segmento.
+    """
+    total_segments = resolve_segments(total_segments)
+    if total_segments == 1:
+        yield from scan_segment(table, 0, 1, **scan_kwargs)
+        return
+
+    pages = queue.Queue(maxsize=total_segments * 2)
+    stop = threading.Event()
+
+    def put(value):
+        # Si el consumidor deja de leer, los hilos terminan en vez de bloquearse
+        while not stop.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker(segment):
+        try:
+            for page in scan_segment(table, segment, total_segments, **scan_kwargs):
+                if not put(page):
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(e)
+
+    pool = ThreadPoolExecutor(max_workers=total_segments)
+    try:
+        for segment in range(total_segments):
+            pool.submit(worker, segment)
+
+        pending = total_segments
+        while pending:
+            value = pages.get()
+            if value is _DONE:
+                pending -= 1
+            elif isinstance(value, Exception):
+                raise value
+            else:
+                yield value
+    finally:
+        stop.set()
+        pool.shutdown(wait=False)
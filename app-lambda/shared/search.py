@@ -0,0 +1,208 @@
+"""
+Índice invertido para la búsqueda de texto en title, content y tags
+
+Cada término de una nota es una entrada de la tabla de índices:
+
+    pk = 'term#' + dos primeras letras del término
+    sk = término + '#' + note_id
+
+Buscar 'prog' es un Query sobre pk 'term#pr' con begins_with(sk, 'prog'),
+que devuelve las notas con 'prog', 'programa', 'programación'... El coste
+depende de las entradas que coinciden, no del tamaño de la tabla de notas.
+
+Las funciones de este módulo no hacen E/S: calculan las entradas a escribir
+o borrar y ordenan los resultados. Las escrituras las aplica
+shared/indexes.py y las consultas SearchIndex, con IndexTable; así la
+variante asyncio de la API puede reutilizarlas con su propio cliente.
+"""
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TERM_PREFIX = 'term#'
+PARTITION_LENGTH = 2
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+
+# Peso de cada aparición según el campo
+FIELD_WEIGHTS = (('title', 3), ('tags', 2), ('content', 1))
+
+# Límites para acotar escrituras por nota y lecturas por búsqueda.
+# Las entradas de una nota se escriben al crearla o actualizarla: con 100
+# términos como mucho son 4 BatchWriteItem de 25 en paralelo (BATCH_WORKERS),
+# una sola ronda. Al cambiar el límite, scripts/rebuild-indexes.py rehace
+# el índice de las notas existentes.
+MAX_TERMS_PER_NOTE = int(os.environ.get('SEARCH_MAX_TERMS', '100'))
+MAX_QUERY_TERMS = 8
+# Las entradas de cada término se leen paginando hasta el final; este tope
+# solo protege de prefijos muy comunes y, si se alcanza, la respuesta lo
+# indica con truncated
+MAX_POSTINGS_PER_TERM = int(os.environ.get('SEARCH_MAX_POSTINGS', '10000'))
+
+# Una coincidencia exacta puntúa más que una por prefijo
+EXACT_MATCH_BOOST = 2
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Términos normalizados de un texto: minúsculas, sin acentos y de al
+    menos MIN_TERM_LENGTH caracteres
+    """
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    normalized = ''.join(c for c in normalized if not unicodedata.combining(c))
+    return [
+        word[:MAX_TERM_LENGTH]
+        for word in _WORD_RE.findall(normalized)
+        if len(word) >= MIN_TERM_LENGTH
+    ]
+
+
+def note_terms(note: Dict) -> Dict[str, int]:
+    """
+    Puntuación de cada término de una nota (apariciones por peso del campo).
+    Si hay más de MAX_TERMS_PER_NOTE se conservan los de mayor puntuación.
+    """
+    scores = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        value = note.get(field)
+        if not value:
+            continue
+        texts = value if isinstance(value, list) else [value]
+        for text in texts:
+            for term in tokenize(text):
+                scores[term] += weight
+    if len(scores) > MAX_TERMS_PER_NOTE:
+        return dict(scores.most_common(MAX_TERMS_PER_NOTE))
+    return dict(scores)
+
+
+def posting_key(term: str, note_id: str) -> Dict:
+    return {'pk': TERM_PREFIX + term[:PARTITION_LENGTH], 'sk': f'{term}#{note_id}'}
+
+
+def index_changes(previous: Optional[Dict], current: Optional[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Entradas a escribir y claves a borrar para pasar del índice de la
+    versión anterior de una nota (None si es nueva) al de la actual
+    (None si se ha borrado)
+    """
+    old_terms = note_terms(previous) if previous else {}
+    new_terms = note_terms(current) if current else {}
+    note_id = (current or previous)['note_id']
+
+    puts = [
+        dict(posting_key(term, note_id), note_id=note_id, score=score)
+        for term, score in new_terms.items()
+        if old_terms.get(term) != score
+    ]
+    deletes = [posting_key(term, note_id) for term in old_terms if term not in new_terms]
+    return puts, deletes
+
+
+def parse_query(query: Optional[str]) -> List[str]:
+    """Términos únicos de la búsqueda. Lanza ValueError si no hay ninguno."""
+    terms = list(dict.fromkeys(tokenize(query or '')))[:MAX_QUERY_TERMS]
+    if not terms:
+        raise ValueError(f'q debe contener al menos un término de {MIN_TERM_LENGTH} o más caracteres')
+    return terms
+
+
+def term_query(term: str) -> Tuple[str, str]:
+    """(pk, prefijo de sk) del Query de un término de búsqueda"""
+    return TERM_PREFIX + term[:PARTITION_LENGTH], term
+
+
+def postings_read_limit() -> int:
+    """max_items de cada Query: uno más del tope para saber si se ha cortado"""
+    return MAX_POSTINGS_PER_TERM + 1
+
+
+def trim_postings(postings: Dict[str, List[Dict]]) -> Tuple[Dict[str, List[Dict]], bool]:
+    """
+    Entradas leídas (con postings_read_limit) recortadas al tope, y si
+    algún término tenía más
+    """
+    truncated = any(len(entries) > MAX_POSTINGS_PER_TERM for entries in postings.values())
+    return {term: entries[:MAX_POSTINGS_PER_TERM] for term, entries in postings.items()}, truncated
+
+
+def rank(terms: List[str], postings: Dict[str, Iterable[Dict]], limit: int) -> List[Tuple[str, float]]:
+    """
+    Notas que contienen todos los términos (como palabra o prefijo),
+    ordenadas por la suma de la mejor puntuación de cada término
+    """
+    totals = None
+    for term in terms:
+        best = {}
+        for posting in postings.get(term, ()):
+            score = float(posting['score'])
+            if posting['sk'].startswith(term + '#'):
+                score *= EXACT_MATCH_BOOST
+            note_id = posting['note_id']
+            if score > best.get(note_id, 0):
+                best[note_id] = score
+        if totals is None:
+            totals = best
+        else:
+            totals = {note_id: total + best[note_id] for note_id, total in totals.items() if note_id in best}
+        if not totals:
+            return []
+    ranked = sorted(totals.items(), key=lambda entry: (-entry[1], entry[0]))
+    return ranked[:limit]
+
+
+def matches(note: Dict, terms: List[str]) -> bool:
+    """
+    Comprobar contra la nota actual que contiene todos los términos, por si
+    el índice tiene entradas antiguas (p.ej. una actualización del índice
+    que falló)
+    """
+    note_words = note_terms(note)
+    return all(any(word.startswith(term) for word in note_words) for term in terms)
+
+
+class SearchIndex:
+    """Consultas del índice invertido con IndexTable"""
+
+    def __init__(self, index_table):
+        self.index = index_table
+
+    def search(self, terms: List[str], limit: int) -> Tuple[List[Tuple[str, float]], bool]:
+        """
+        (note_id, puntuación) de las mejores notas para los términos, y si
+        las entradas de algún término superaban MAX_POSTINGS_PER_TERM
+        """
+        postings, truncated = trim_postings({
+            term: self.index.query_prefix(*term_query(term), max_items=postings_read_limit())
+            for term in terms
+        })
+        return rank(terms, postings, limit), truncated
+
+
+def find_notes(search_index: SearchIndex, notes_table, terms: List[str], limit: int) -> Tuple[List[Dict], bool]:
+    """
+    Notas completas (items de DynamoDB) que coinciden con la búsqueda, por
+    relevancia, y si la búsqueda se ha cortado (ver SearchIndex.search). Se
+    piden algunas candidatas de más para cubrir las que descarte la
+    verificación.
+    """
+    ranked, truncated = search_index.search(terms, limit * 2)
+    found = notes_table.batch_get([note_id for note_id, _ in ranked])
+    return select_matches(ranked, found, terms, limit), truncated
+
+
+def select_matches(ranked: List[Tuple[str, float]], found: Dict[str, Dict], terms: List[str],
+                   limit: int) -> List[Dict]:
+    """Las primeras limit notas leídas (found) del ranking que contienen los términos"""
+    results = []
+    for note_id, _ in ranked:
+        item = found.get(note_id)
+        if item and matches(item, terms):
+            results.append(item)
+            if len(results) == limit:
+                break
+    return results
@@ -0,0 +1,73 @@
+"""
+Serialización JSON común a las Lambdas y a la app ECS
+
+Todas las respuestas pasan por dumps/dumps_bytes: create_response en las
+Lambdas y el JSONProvider de Flask/Quart en ECS, así que la salida es la
+misma en todos los caminos (JSON compacto).
+
+Se usa orjson si está instalado (es opcional, bastante más rápido y genera
+bytes directamente) y el módulo json estándar en otro caso. JSON_BACKEND
+permite forzar uno u otro ('orjson' o 'json').
+
+Decimal (números leídos con boto3.resource, p. ej. los contadores de tags)
+se convierte a int si es entero y a float si no, en lugar de fallar o
+devolver siempre float.
+"""
+import json
+import os
+from decimal import Decimal
+from typing import Any, Callable, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Tipos que no son JSON nativo"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Tipo no serializable a JSON: {type(obj).__name__}')
+
+
+_json_encoder = json.JSONEncoder(default=_default, separators=(',', ':'))
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return _json_encoder.encode(obj).encode('utf-8')
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {'json': _json_dumps}
+if orjson is not None:
+    ENCODERS['orjson'] = _orjson_dumps
+
+
+def resolve_backend(name: str = None) -> str:
+    """Backend a usar: el pedido si está disponible, si no el más rápido"""
+    name = name or os.environ.get('JSON_BACKEND', 'auto')
+    if name in ENCODERS:
+        return name
+    return 'orjson' if 'orjson' in ENCODERS else 'json'
+
+
+BACKEND = resolve_backend()
+dumps_bytes: Callable[[Any], bytes] = ENCODERS[BACKEND]
+
+
+def dumps(obj: Any) -> str:
+    """Serializar a str (body de la Lambda, respuestas de Flask/Quart)"""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def loads(data) -> Any:
+    """Parsear JSON desde str o bytes"""
+    if orjson is not None and BACKEND == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,151 @@
+"""
+Agrupación de lecturas idénticas concurrentes (single-flight)
+
+Si varios hilos del mismo proceso piden a la vez la misma clave (p. ej.
+GET /notes/{id} de una nota muy visitada con la caché vacía o expirada),
+solo el primero llama a DynamoDB; el resto espera y recibe el mismo
+resultado, o la misma excepción. Así un pico de lecturas de una clave cuesta
+una lectura en vez de decenas, y nadie espera más que esa única llamada.
+
+No es una caché: cuando la llamada termina la clave se olvida y la
+siguiente petición vuelve a leer. Una escritura debe llamar a forget() (o a
+forget_reads) para que las lecturas que empiecen después no se unan a una
+llamada anterior a ella.
+
+SingleFlight es para hilos (main.py) y AsyncSingleFlight para corrutinas de
+un mismo event loop (main_async.py). Las dos APIs usan las mismas claves:
+(operación, argumentos).
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+# Lecturas agrupadas que dependen de toda la colección: cualquier escritura
+# las deja anticuadas, sea cual sea la nota
+COLLECTION_READS = ('collection_version', 'list_notes_page')
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Una llamada en curso por clave, compartida por quien la pida mientras dura"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Resultado de func() para key y si se compartió con una llamada que
+        ya estaba en curso
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def forget(self, key: Hashable) -> None:
+        """Las próximas peticiones de key no se unen a la llamada en curso"""
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def forget_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Como forget, para todas las claves en curso que cumplan predicate"""
+        with self._lock:
+            for key in [key for key in self._calls if predicate(key)]:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self.executions,
+                'coalesced': self.coalesced
+            }
+
+
+class AsyncSingleFlight:
+    """SingleFlight para corrutinas: la llamada es una tarea que comparten quienes la esperan"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """
+        Resultado de await func() para key y si se compartió con una llamada
+        que ya estaba en curso. Cancelar a quien espera no cancela la llamada.
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            call = self._calls[key] = asyncio.ensure_future(func())
+            self.executions += 1
+
+            def done(_):
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                if not call.cancelled():
+                    # Marcar la excepción como recogida aunque nadie espere ya
+                    call.exception()
+
+            call.add_done_callback(done)
+        return await asyncio.shield(call), shared
+
+    def forget(self, key: Hashable) -> None:
+        self._calls.pop(key, None)
+
+    def forget_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [key for key in self._calls if predicate(key)]:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'in_flight': len(self._calls),
+            'executions': self.executions,
+            'coalesced': self.coalesced
+        }
+
+
+def forget_reads(flights, note_ids: List[str]) -> None:
+    """
+    Tras escribir note_ids, las lecturas que empiecen no se unen a las de
+    antes: las de la colección y las de esas notas
+    """
+    flights.forget_matching(lambda key: key[0] in COLLECTION_READS)
+    for note_id in note_ids:
+        flights.forget(('get_note', note_id))
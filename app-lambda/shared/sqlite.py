@@ -0,0 +1,289 @@
+"""
+Almacenamiento en un fichero SQLite (DB_TYPE=sqlite)
+
+Mismas clases e interfaz que shared/dynamo.py, para despliegues de un solo
+nodo y benchmarks locales sin la latencia de red de DynamoDB. El fichero es
+SQLITE_PATH y cada tabla lógica (TABLE_NAME, INDEX_TABLE_NAME) es una tabla
+SQL con el item completo en JSON y columnas aparte para las claves:
+
+    notas    note_id (PK), entity_type, created_at, updated_at, item
+             + índices (entity_type, created_at, note_id) y
+               (entity_type, updated_at, note_id), como los GSI
+    índices  pk, sk (PK, WITHOUT ROWID), item
+
+La base se abre en modo WAL: las lecturas no bloquean a la escritura (y
+viceversa) y los commits solo hacen fsync en los checkpoints
+(synchronous=NORMAL). Cada hilo usa su propia conexión; las operaciones de
+lectura-modificación-escritura van en una transacción BEGIN IMMEDIATE.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from shared.storage import PAGE_SIZE, select_fields, date_key, prefix_end
+from shared.utils import ENTITY_TYPE, with_preview
+
+SQLITE_PATH = os.environ.get('SQLITE_PATH', 'notes.db')
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '30'))
+
+# Máximo de parámetros por IN (...) en batch_get
+IN_CHUNK_SIZE = 500
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schemas = set()
+
+
+def connect(path: str = SQLITE_PATH) -> sqlite3.Connection:
+    """Conexión del hilo actual al fichero (se crea la primera vez)"""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        # isolation_level=None: autocommit salvo en las transacciones explícitas
+        conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        connections[path] = conn
+    return conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _ensure_schema(path: str, name: str, statements: List[str]) -> None:
+    with _schema_lock:
+        if (path, name) in _schemas:
+            return
+        conn = connect(path)
+        for statement in statements:
+            conn.execute(statement)
+        _schemas.add((path, name))
+
+
+def _dumps(item: Dict) -> str:
+    return json.dumps(item, separators=(',', ':'), ensure_ascii=False)
+
+
+class NotesTable:
+    """Tabla de notas en SQLite"""
+
+    def __init__(self, table_name: Optional[str] = None, region_name: Optional[str] = None,
+                 path: Optional[str] = None, **kwargs):
+        self.name = table_name or os.environ.get('TABLE_NAME', 'Notes')
+        self.path = path or SQLITE_PATH
+        self._table = _quote(self.name)
+        _ensure_schema(self.path, self.name, [
+            f'CREATE TABLE IF NOT EXISTS {self._table} ('
+            'note_id TEXT PRIMARY KEY, entity_type TEXT, created_at TEXT, updated_at TEXT, item TEXT NOT NULL)',
+            f'CREATE INDEX IF NOT EXISTS {_quote(self.name + "_by_date")} '
+            f'ON {self._table} (entity_type, created_at, note_id)',
+            f'CREATE INDEX IF NOT EXISTS {_quote(self.name + "_by_update")} '
+            f'ON {self._table} (entity_type, updated_at, note_id)',
+        ])
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return connect(self.path)
+
+    @staticmethod
+    def _row(item: Dict) -> Tuple:
+        return item['note_id'], item.get('entity_type'), item.get('created_at'), item.get('updated_at'), _dumps(item)
+
+    def _write(self, conn: sqlite3.Connection, items: List[Dict]) -> None:
+        conn.executemany(
+            f'INSERT OR REPLACE INTO {self._table} (note_id, entity_type, created_at, updated_at, item) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [self._row(item) for item in items]
+        )
+
+    def _select_one(self, conn: sqlite3.Connection, note_id: str) -> Optional[Dict]:
+        row = conn.execute(f'SELECT item FROM {self._table} WHERE note_id = ?', (note_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get(self, note_id: str) -> Optional[Dict]:
+        return self._select_one(self._conn, note_id)
+
+    def put(self, item: Dict) -> None:
+        self._write(self._conn, [item])
+
+    def update(self, note_id: str, values: Dict) -> Optional[Dict]:
+        result = self.update_with_previous(note_id, values)
+        return result[1] if result else None
+
+    def update_with_previous(self, note_id: str, values: Dict) -> Optional[Tuple[Dict, Dict]]:
+        values = with_preview(values)
+        with transaction(self._conn) as conn:
+            previous = self._select_one(conn, note_id)
+            if previous is None:
+                return None
+            current = dict(previous, **values)
+            self._write(conn, [current])
+        return previous, current
+
+    def delete(self, note_id: str) -> Optional[Dict]:
+        with transaction(self._conn) as conn:
+            item = self._select_one(conn, note_id)
+            if item is not None:
+                conn.execute(f'DELETE FROM {self._table} WHERE note_id = ?', (note_id,))
+        return item
+
+    def put_many(self, items: List[Dict]) -> List[str]:
+        with transaction(self._conn) as conn:
+            self._write(conn, items)
+        return []
+
+    def delete_many(self, note_ids: List[str]) -> List[str]:
+        with transaction(self._conn) as conn:
+            conn.executemany(f'DELETE FROM {self._table} WHERE note_id = ?', [(note_id,) for note_id in note_ids])
+        return []
+
+    def batch_get(self, note_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict]:
+        fields = list(dict.fromkeys(['note_id'] + fields)) if fields else None
+        note_ids = list(dict.fromkeys(note_ids))
+        found = {}
+        for start in range(0, len(note_ids), IN_CHUNK_SIZE):
+            chunk = note_ids[start:start + IN_CHUNK_SIZE]
+            rows = self._conn.execute(
+                f"SELECT item FROM {self._table} WHERE note_id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for (data,) in rows:
+                item = json.loads(data)
+                found[item['note_id']] = select_fields(item, fields)
+        return found
+
+    def batch_get_with_unprocessed(self, note_ids: List[str],
+                                   fields: Optional[List[str]] = None) -> Tuple[Dict[str, Dict], List[str]]:
+        return self.batch_get(note_ids, fields), []
+
+    def query_by_date(self, limit: Optional[int] = None, start_key: Optional[Dict] = None,
+                      fields: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Dict]]:
+        """Una página por fecha (más recientes primero) y la clave de la siguiente"""
+        limit = limit or PAGE_SIZE
+        sql = f'SELECT item FROM {self._table} WHERE entity_type = ? AND created_at IS NOT NULL'
+        params = [ENTITY_TYPE]
+        if start_key:
+            sql += ' AND (created_at, note_id) < (?, ?)'
+            params += [start_key['created_at'], start_key['note_id']]
+        sql += ' ORDER BY created_at DESC, note_id DESC LIMIT ?'
+        rows = self._conn.execute(sql, params + [limit + 1]).fetchall()
+        items = [json.loads(data) for (data,) in rows[:limit]]
+        last_key = date_key(items[-1]) if len(rows) > limit else None
+        return [select_fields(item, fields) for item in items], last_key
+
+    def query_by_update(self, since: str, max_items: int,
+                        after_note_id: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        rows = self._conn.execute(
+            f'SELECT item FROM {self._table} WHERE entity_type = ? '
+            'AND (updated_at > ? OR (updated_at = ? AND note_id > ?)) '
+            'ORDER BY updated_at, note_id LIMIT ?',
+            (ENTITY_TYPE, since, since, after_note_id or '', max_items + 1)
+        ).fetchall()
+        return [json.loads(data) for (data,) in rows[:max_items]], len(rows) > max_items
+
+    def scan_pages(self, total_segments: Optional[int] = None,
+                   fields: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """Todas las notas por orden de note_id, en páginas de PAGE_SIZE (sin segmentos)"""
+        after = ''
+        while True:
+            rows = self._conn.execute(
+                f'SELECT note_id, item FROM {self._table} WHERE note_id > ? ORDER BY note_id LIMIT ?',
+                (after, PAGE_SIZE)
+            ).fetchall()
+            if not rows:
+                return
+            yield [select_fields(json.loads(data), fields) for _, data in rows]
+            if len(rows) < PAGE_SIZE:
+                return
+            after = rows[-1][0]
+
+
+class IndexTable:
+    """Tabla de índices (pk/sk) en SQLite"""
+
+    def __init__(self, table_name: Optional[str] = None, region_name: Optional[str] = None,
+                 path: Optional[str] = None, **kwargs):
+        self.name = table_name or os.environ.get('INDEX_TABLE_NAME', 'NotesIndex')
+        self.path = path or SQLITE_PATH
+        self._table = _quote(self.name)
+        _ensure_schema(self.path, self.name, [
+            f'CREATE TABLE IF NOT EXISTS {self._table} ('
+            'pk TEXT NOT NULL, sk TEXT NOT NULL, item TEXT NOT NULL, PRIMARY KEY (pk, sk)) WITHOUT ROWID',
+        ])
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return connect(self.path)
+
+    def _put(self, conn: sqlite3.Connection, items: List[Dict]) -> None:
+        conn.executemany(
+            f'INSERT OR REPLACE INTO {self._table} (pk, sk, item) VALUES (?, ?, ?)',
+            [(item['pk'], item['sk'], _dumps(item)) for item in items]
+        )
+
+    def _get(self, conn: sqlite3.Connection, pk: str, sk: str) -> Optional[Dict]:
+        row = conn.execute(f'SELECT item FROM {self._table} WHERE pk = ? AND sk = ?', (pk, sk)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write(self, puts: List[Dict], deletes: List[Dict]) -> int:
+        if not puts and not deletes:
+            return 0
+        with transaction(self._conn) as conn:
+            self._put(conn, puts)
+            conn.executemany(
+                f'DELETE FROM {self._table} WHERE pk = ? AND sk = ?',
+                [(key['pk'], key['sk']) for key in deletes]
+            )
+        return 0
+
+    def add(self, pk: str, sk: str, field: str, amount: int) -> None:
+        with transaction(self._conn) as conn:
+            item = self._get(conn, pk, sk) or {'pk': pk, 'sk': sk}
+            item[field] = item.get(field, 0) + amount
+            self._put(conn, [item])
+
+    def get(self, pk: str, sk: str) -> Optional[Dict]:
+        return self._get(self._conn, pk, sk)
+
+    def touch(self, pk: str, sk: str, modified_at: str) -> None:
+        with transaction(self._conn) as conn:
+            item = self._get(conn, pk, sk) or {'pk': pk, 'sk': sk}
+            item['version'] = item.get('version', 0) + 1
+            item['modified_at'] = modified_at
+            self._put(conn, [item])
+
+    def _query(self, condition: str, params: List, descending: bool, max_items: Optional[int]) -> List[Dict]:
+        order = 'DESC' if descending else 'ASC'
+        rows = self._conn.execute(
+            f'SELECT item FROM {self._table} WHERE pk = ? {condition} ORDER BY sk {order} LIMIT ?',
+            params + [max_items or -1]
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def query_partition(self, pk: str, max_items: Optional[int] = None,
+                        before: Optional[str] = None) -> List[Dict]:
+        if before:
+            return self._query('AND sk < ?', [pk, before], True, max_items)
+        return self._query('', [pk], True, max_items)
+
+    def query_after(self, pk: str, after: str, max_items: Optional[int] = None) -> List[Dict]:
+        return self._query('AND sk > ?', [pk, after], False, max_items)
+
+    def query_prefix(self, pk: str, sk_prefix: str, max_items: Optional[int] = None) -> List[Dict]:
+        return self._query('AND sk >= ? AND sk < ?', [pk, sk_prefix, prefix_end(sk_prefix)], False, max_items)
@@ -0,0 +1,56 @@
+"""
+Operaciones de DynamoDB como pasos sin E/S
+
+Cada operación (un GetItem, un Query paginado, un BatchWriteItem con
+reintentos...) se escribe una sola vez como generador: produce pasos
+(método del cliente, argumentos), recibe la respuesta de cada llamada y
+termina devolviendo el resultado ya deserializado. El paso ('sleep',
+segundos) es una espera de backoff.
+
+run los ejecuta con un cliente de boto3 y run_async con uno de aiobotocore
+(app-ecs/main_async.py), así las dos APIs construyen las mismas peticiones
+y aplican la misma paginación, reintentos y conversión de tipos. Las
+excepciones del cliente se lanzan dentro del generador, que puede
+capturarlas (p. ej. ConditionalCheckFailedException).
+"""
+import time
+from typing import Any, Generator, Tuple
+
+Steps = Generator[Tuple[str, Any], Any, Any]
+
+
+def run(steps: Steps, client) -> Any:
+    """Ejecutar los pasos con un cliente síncrono. Devuelve su resultado."""
+    result, error = None, None
+    while True:
+        try:
+            operation, argument = steps.throw(error) if error else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        result, error = None, None
+        try:
+            if operation == 'sleep':
+                time.sleep(argument)
+            else:
+                result = getattr(client, operation)(**argument)
+        except Exception as e:
+            error = e
+
+
+async def run_async(steps: Steps, client) -> Any:
+    """Como run, con un cliente asíncrono (aiobotocore)"""
+    import asyncio
+    result, error = None, None
+    while True:
+        try:
+            operation, argument = steps.throw(error) if error else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        result, error = None, None
+        try:
+            if operation == 'sleep':
+                await asyncio.sleep(argument)
+            else:
+                result = await getattr(client, operation)(**argument)
+        except Exception as e:
+            error = e
@@ -0,0 +1,77 @@
+"""
+Selección del almacenamiento de notas según DB_TYPE
+
+Todo el acceso a datos pasa por dos clases con la misma interfaz en cada
+backend:
+
+    NotesTable  -> get, put, update, update_with_previous, delete,
+                   put_many, delete_many, batch_get,
+                   batch_get_with_unprocessed, query_by_date,
+                   query_by_update, scan_pages
+    IndexTable  -> write, add, get, touch, query_partition, query_after,
+                   query_prefix
+
+Backends (DB_TYPE):
+    dynamodb  shared/dynamo.py (por defecto)
+    memory    shared/memory.py, diccionarios con índices ordenados en el
+              proceso (pruebas y benchmarks locales; no persiste)
+    sqlite    shared/sqlite.py, un fichero SQLite en modo WAL (SQLITE_PATH)
+              para despliegues de un solo nodo
+
+Los índices de búsqueda y tags, la versión de la colección y las lápidas
+se construyen encima (shared/indexes.py), así que funcionan igual con
+cualquier backend.
+"""
+import importlib
+import os
+from typing import Dict, List, Optional
+
+DB_TYPE = os.environ.get('DB_TYPE', 'dynamodb')
+
+STORAGE_BACKENDS = {
+    'dynamodb': 'shared.dynamo',
+    'memory': 'shared.memory',
+    'sqlite': 'shared.sqlite',
+}
+
+# Items por página de los listados y scans completos en memory/sqlite
+PAGE_SIZE = int(os.environ.get('STORAGE_PAGE_SIZE', '1000'))
+
+
+def backend(db_type: Optional[str] = None):
+    """Módulo del backend (se importa solo el que se usa)"""
+    db_type = db_type or DB_TYPE
+    if db_type not in STORAGE_BACKENDS:
+        raise ValueError(f"DB_TYPE desconocido: {db_type} (válidos: {', '.join(STORAGE_BACKENDS)})")
+    return importlib.import_module(STORAGE_BACKENDS[db_type])
+
+
+def notes_table(table_name: Optional[str] = None, region_name: Optional[str] = None,
+                db_type: Optional[str] = None):
+    """Tabla de notas del backend configurado"""
+    return backend(db_type).NotesTable(table_name, region_name=region_name)
+
+
+def index_table(table_name: Optional[str] = None, region_name: Optional[str] = None,
+                db_type: Optional[str] = None):
+    """Tabla de índices (pk/sk) del backend configurado"""
+    return backend(db_type).IndexTable(table_name, region_name=region_name)
+
+
+# ============= UTILIDADES PARA LOS BACKENDS LOCALES =============
+
+def select_fields(item: Dict, fields: Optional[List[str]]) -> Dict:
+    """Como una ProjectionExpression: solo los atributos pedidos"""
+    if not fields:
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+
+def date_key(item: Dict) -> Dict:
+    """Clave de paginación del listado por fecha (como la LastEvaluatedKey del GSI)"""
+    return {'note_id': item['note_id'], 'created_at': item['created_at'], 'entity_type': item['entity_type']}
+
+
+def prefix_end(prefix: str) -> str:
+    """Cota superior de los sk que empiezan por prefix"""
+    return prefix + '\U0010ffff'
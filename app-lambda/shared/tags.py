@@ -0,0 +1,251 @@
+"""
+Índice de tags en la tabla de índices
+
+Cada tag de una nota es una entrada ordenada por fecha de creación:
+
+    pk = 'tag#' + tag, sk = created_at + '#' + note_id
+
+y el número de notas por tag es un contador en la partición 'tags':
+
+    pk = 'tags', sk = tag, count = N
+
+Listar por tag es un Query (más recientes primero) en lugar de un Scan, y
+GET /tags es un Query sobre una sola partición. Los tags se indexan en
+minúsculas, así que el filtro no distingue mayúsculas.
+
+Como en shared/search.py, las funciones no hacen E/S y TagIndex las aplica
+con IndexTable.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TAG_PREFIX = 'tag#'
+TAG_COUNTS_PK = 'tags'
+
+MAX_FILTER_TAGS = 10
+MATCH_MODES = ('all', 'any')
+
+# Entradas leídas por tag en cada consulta del filtro match=all
+# (intersección); se leen más mientras no llenen la página
+MAX_TAG_ENTRIES = 1000
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lower()
+
+
+def note_tags(note: Dict) -> set:
+    return {normalize_tag(tag) for tag in note.get('tags') or [] if tag.strip()}
+
+
+def entry_sk(created_at: str, note_id: str) -> str:
+    return f'{created_at}#{note_id}'
+
+
+def index_changes(previous: Optional[Dict], current: Optional[Dict]) -> Tuple[List[Dict], List[Dict], Dict]:
+    """
+    Entradas a escribir, claves a borrar y variación de los contadores
+    ({(pk, sk): delta}) al pasar de la versión anterior de una nota a la actual
+    """
+    old_tags = note_tags(previous) if previous else set()
+    new_tags = note_tags(current) if current else set()
+    note = current or previous
+    sk = entry_sk(note['created_at'], note['note_id'])
+
+    puts = [
+        {'pk': TAG_PREFIX + tag, 'sk': sk, 'note_id': note['note_id'], 'created_at': note['created_at']}
+        for tag in new_tags - old_tags
+    ]
+    deletes = [{'pk': TAG_PREFIX + tag, 'sk': sk} for tag in old_tags - new_tags]
+    counters = {(TAG_COUNTS_PK, tag): 1 for tag in new_tags - old_tags}
+    counters.update({(TAG_COUNTS_PK, tag): -1 for tag in old_tags - new_tags})
+    return puts, deletes, counters
+
+
+def parse_tag_filter(values: Iterable[str], match: Optional[str]) -> Tuple[List[str], str]:
+    """
+    Tags de ?tag=a&tag=b o ?tag=a,b y el modo (all = todas, any = alguna).
+    Lanza ValueError si no son válidos.
+    """
+    tags = []
+    for value in values:
+        tags.extend(normalize_tag(tag) for tag in value.split(',') if tag.strip())
+    tags = list(dict.fromkeys(tags))
+    if not tags:
+        raise ValueError('tag no puede estar vacío')
+    if len(tags) > MAX_FILTER_TAGS:
+        raise ValueError(f'Máximo {MAX_FILTER_TAGS} tags por filtro')
+    match = match or 'all'
+    if match not in MATCH_MODES:
+        raise ValueError('match debe ser all o any')
+    return tags, match
+
+
+def cursor_sk(cursor_key: Optional[Dict]) -> Optional[str]:
+    """sk de la última entrada devuelta, a partir del cursor decodificado"""
+    if not cursor_key:
+        return None
+    if not isinstance(cursor_key.get('created_at'), str):
+        raise ValueError('Cursor inválido')
+    return entry_sk(cursor_key['created_at'], cursor_key['note_id'])
+
+
+def entries_to_read(tags: List[str], match: str, limit: int) -> int:
+    """
+    Entradas a leer por tag en cada consulta: con un tag o match=any bastan
+    limit + 1 (las primeras de la unión salen de las primeras de cada tag);
+    la intersección puede necesitar muchas más
+    """
+    if len(tags) > 1 and match == 'all':
+        return MAX_TAG_ENTRIES
+    return limit + 1
+
+
+def read_before(tag_entries: List[Dict], before: Optional[str]) -> Optional[str]:
+    """sk desde el que seguir leyendo un tag (la última entrada leída o el cursor)"""
+    return tag_entries[-1]['sk'] if tag_entries else before
+
+
+def combine(entries: Dict[str, List[Dict]], exhausted: Set[str], match: str,
+            limit: int) -> Tuple[List[Dict], bool, List[str]]:
+    """
+    Unir (any) o intersecar (all) las entradas leídas de cada tag, de la más
+    reciente a la más antigua. exhausted son los tags de los que ya se ha
+    leído todo. Devuelve (las primeras limit, si hay más, tags de los que
+    hay que leer más entradas); si la última lista no está vacía, la página
+    aún no es definitiva.
+
+    De un tag con más entradas solo se conocen las posteriores a la última
+    leída, así que la intersección solo es segura hasta la más reciente de
+    esas últimas entradas. Si hasta ahí no llena la página, hay que seguir
+    leyendo los tags que la fijan.
+    """
+    by_tag = [{entry['sk']: entry for entry in tag_entries} for tag_entries in entries.values()]
+    if match != 'all':
+        selected = {}
+        for other in by_tag:
+            selected.update(other)
+        ordered = [selected[sk] for sk in sorted(selected, reverse=True)]
+        return ordered[:limit], len(ordered) > limit, []
+
+    selected = by_tag[0]
+    for other in by_tag[1:]:
+        selected = {sk: entry for sk, entry in selected.items() if sk in other}
+    frontier = max((tag_entries[-1]['sk'] for tag, tag_entries in entries.items()
+                    if tag not in exhausted), default=None)
+    if frontier is not None:
+        selected = {sk: entry for sk, entry in selected.items() if sk >= frontier}
+    ordered = [selected[sk] for sk in sorted(selected, reverse=True)]
+    if frontier is None or len(ordered) > limit:
+        return ordered[:limit], len(ordered) > limit, []
+    pending = [
+        tag for tag, tag_entries in entries.items()
+        if tag not in exhausted and tag_entries[-1]['sk'] == frontier
+    ]
+    return ordered[:limit], True, pending
+
+
+def has_tags(note: Dict, tags: List[str], match: str) -> bool:
+    """
+    Comprobar contra la nota actual, por si el índice tiene entradas
+    antiguas (p.ej. una actualización del índice que falló)
+    """
+    current = note_tags(note)
+    if match == 'all':
+        return all(tag in current for tag in tags)
+    return any(tag in current for tag in tags)
+
+
+def next_cursor_key(page: List[Dict], has_more: bool) -> Optional[Dict]:
+    if not has_more or not page:
+        return None
+    last = page[-1]
+    return {'note_id': last['note_id'], 'created_at': last['created_at']}
+
+
+def tag_counts(items: Iterable[Dict]) -> List[Dict]:
+    """Contadores de la partición 'tags', de más a menos usados"""
+    counts = [
+        {'tag': item['sk'], 'count': int(item['count'])}
+        for item in items
+        if int(item.get('count', 0)) > 0
+    ]
+    counts.sort(key=lambda entry: (-entry['count'], entry['tag']))
+    return counts
+
+
+def select_tagged(page: List[Dict], found: Dict[str, Dict], tags: List[str], match: str) -> List[Dict]:
+    """Notas leídas (found) de las entradas de la página que siguen teniendo los tags"""
+    return [
+        found[entry['note_id']] for entry in page
+        if entry['note_id'] in found and has_tags(found[entry['note_id']], tags, match)
+    ]
+
+
+class TagPage:
+    """
+    Estado de la lectura de una página del filtro: reads() da las consultas
+    (pk, before) que faltan, una por tag, y add() recibe sus entradas. La
+    página está completa cuando no queda ningún tag pendiente.
+    """
+
+    def __init__(self, tags: List[str], match: str, limit: int, cursor_key: Optional[Dict] = None):
+        self.match = match
+        self.limit = limit
+        self.before = cursor_sk(cursor_key)
+        self.max_items = entries_to_read(tags, match, limit)
+        self.entries = {tag: [] for tag in tags}
+        self.exhausted = set()
+        self.pending = list(tags)
+        self.page: List[Dict] = []
+        self.has_more = False
+
+    def reads(self) -> List[Tuple[str, Optional[str]]]:
+        return [(TAG_PREFIX + tag, read_before(self.entries[tag], self.before)) for tag in self.pending]
+
+    def add(self, reads: List[List[Dict]]) -> None:
+        """Entradas de cada consulta de reads(), en el mismo orden"""
+        for tag, read in zip(self.pending, reads):
+            self.entries[tag].extend(read)
+            if len(read) < self.max_items:
+                self.exhausted.add(tag)
+        self.page, self.has_more, self.pending = combine(self.entries, self.exhausted, self.match, self.limit)
+
+
+class TagIndex:
+    """Consultas del índice de tags con IndexTable"""
+
+    def __init__(self, index_table):
+        self.index = index_table
+
+    def page(self, tags: List[str], match: str, limit: int,
+             cursor_key: Optional[Dict] = None) -> Tuple[List[Dict], bool]:
+        """
+        Entradas (note_id, created_at) de una página del filtro y si hay más.
+        Con match=all sigue leyendo los tags hasta que la intersección llena
+        la página o se acaban las entradas.
+        """
+        state = TagPage(tags, match, limit, cursor_key)
+        while state.pending:
+            state.add([
+                self.index.query_partition(pk, max_items=state.max_items, before=before)
+                for pk, before in state.reads()
+            ])
+        return state.page, state.has_more
+
+    def counts(self) -> List[Dict]:
+        return tag_counts(self.index.query_partition(TAG_COUNTS_PK))
+
+
+def list_by_tags(tag_index: TagIndex, notes_table, tags: List[str], match: str, limit: int,
+                 cursor_key: Optional[Dict] = None,
+                 fields: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Dict]]:
+    """
+    Notas (items de DynamoDB, completos o con fields y tags) con los tags,
+    más recientes primero, y la clave para el cursor de la página siguiente
+    """
+    page, has_more = tag_index.page(tags, match, limit, cursor_key)
+    found = notes_table.batch_get(
+        [entry['note_id'] for entry in page],
+        fields + ['tags'] if fields else None
+    )
+    return select_tagged(page, found, tags, match), next_cursor_key(page, has_more)
@@ -1,45 +1,314 @@
 """
 Utilidades compartidas para las funciones Lambda
 """
+import base64
+import hashlib
 import json
-from typing import Dict, Any
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Any, List, Optional
 
+from shared import serializer
+from shared.emf import phase
+from shared.compression import COMPRESSION_MIN_SIZE, choose_encoding, compress, is_compressible, weak_etag
 
-def create_response(status_code: int, body: Any, headers: Dict = None) -> Dict:
+# Índice secundario global para listar notas ordenadas por fecha de creación.
+# Todas las notas comparten la misma partición (entity_type = 'note') y se
+# ordenan por created_at, de modo que el listado es un Query y no un Scan.
+NOTES_BY_DATE_INDEX = 'created_at-index'
+ENTITY_TYPE = 'note'
+
+# Mismo esquema ordenado por updated_at, para la sincronización incremental
+NOTES_BY_UPDATE_INDEX = 'updated_at-index'
+
+# Mismo orden que created_at-index pero solo con los atributos del resumen:
+# un listado view=summary lee (y consume capacidad por) items pequeños
+NOTES_SUMMARY_INDEX = 'created_at-summary-index'
+
+# Campos que se pueden pedir con fields= y los de view=summary
+NOTE_FIELDS = ('note_id', 'title', 'content', 'preview', 'tags', 'created_at', 'updated_at')
+SUMMARY_FIELDS = ('note_id', 'title', 'preview', 'tags', 'created_at', 'updated_at')
+
+# Longitud del extracto de content que se guarda en preview
+PREVIEW_LENGTH = 200
+
+# Atributos internos que no se devuelven al cliente
+INTERNAL_ATTRIBUTES = ('entity_type',)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def create_response(status_code: int, body: Any, headers: Dict = None,
+                    request_headers: Dict = None) -> Dict:
     """
-    Crear respuesta HTTP para Lambda Proxy Integration
+    Crear respuesta HTTP para Lambda Proxy Integration.
+    Si se pasan las cabeceras de la petición:
+    - un 200 con ETag/Last-Modified cuyo contenido ya tiene el cliente se
+      convierte en 304 sin body (y sin serializarlo)
+    - un body de COMPRESSION_MIN_SIZE bytes o más se comprime según
+      Accept-Encoding y se devuelve en base64 (isBase64Encoded)
     """
     default_headers = {
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Api-Key'
+        'Access-Control-Allow-Headers': 'Content-Type,X-Api-Key,If-None-Match,If-Modified-Since',
+        'Access-Control-Expose-Headers': 'ETag,Last-Modified'
     }
     
     if headers:
         default_headers.update(headers)
     
+    if status_code == 200 and request_headers and is_not_modified(
+            request_headers, default_headers.get('ETag'), default_headers.get('Last-Modified')):
+        status_code, body = 304, None
+    
     response = {
         'statusCode': status_code,
         'headers': default_headers
     }
     
-    if body is not None:
-        if isinstance(body, str):
-            response['body'] = body
+    # Serialización y compresión del body (SerializationTime en shared/emf.py)
+    with phase('Serialization'):
+        if body is not None:
+            if isinstance(body, str):
+                response['body'] = body
+            else:
+                response['body'] = serializer.dumps(body)
         else:
-            response['body'] = json.dumps(body)
-    else:
-        response['body'] = ''
+            response['body'] = ''
+    
+        if request_headers:
+            default_headers['Vary'] = 'Accept-Encoding'
+            encoding = choose_encoding(get_header(request_headers, 'Accept-Encoding'))
+            data = response['body'].encode('utf-8')
+            if encoding and len(data) >= COMPRESSION_MIN_SIZE and is_compressible(default_headers.get('Content-Type')):
+                response['body'] = base64.b64encode(compress(data, encoding)).decode('ascii')
+                response['isBase64Encoded'] = True
+                default_headers['Content-Encoding'] = encoding
+                if 'ETag' in default_headers:
+                    default_headers['ETag'] = weak_etag(default_headers['ETag'])
     
     return response
 
 
+def raw_body(event: Dict):
+    """
+    Body del evento Lambda sin parsear (para Model.model_validate_json)
+    """
+    body = event.get('body', '{}')
+    # Con BinaryMediaTypes '*/*' API Gateway entrega el body en base64
+    if event.get('isBase64Encoded') and isinstance(body, str):
+        return base64.b64decode(body)
+    return body if body is not None else ''
+
+
 def parse_json_body(event: Dict) -> Dict:
     """
     Parsear body JSON del evento Lambda
     """
-    body = event.get('body', '{}')
-    if isinstance(body, str):
-        return json.loads(body)
-    return body
\ No newline at end of file
+    body = raw_body(event)
+    if isinstance(body, (str, bytes)):
+        return serializer.loads(body)
+    return body
+
+
+def public_note(item: Dict) -> Dict:
+    """
+    Eliminar atributos internos de un item de DynamoDB antes de devolverlo
+    """
+    return {k: v for k, v in item.items() if k not in INTERNAL_ATTRIBUTES}
+
+
+def note_preview(content: str) -> str:
+    """
+    Extracto de content para los listados: espacios normalizados y como
+    mucho PREVIEW_LENGTH caracteres, cortando en una palabra
+    """
+    text = ' '.join(content.split())
+    if len(text) <= PREVIEW_LENGTH:
+        return text
+    cut = text[:PREVIEW_LENGTH].rsplit(' ', 1)[0] or text[:PREVIEW_LENGTH]
+    return cut + '…'
+
+
+def with_preview(values: Dict) -> Dict:
+    """Añadir preview a los valores de una escritura que cambian content"""
+    if 'content' not in values:
+        return values
+    return dict(values, preview=note_preview(values['content']))
+
+
+def parse_fields(fields: Optional[str], view: Optional[str]) -> Optional[List[str]]:
+    """
+    Campos a devolver según fields=a,b y view=summary|full (None = todos).
+    note_id se incluye siempre. Lanza ValueError si no son válidos.
+    """
+    if view not in (None, '', 'full', 'summary'):
+        raise ValueError('view debe ser full o summary')
+    if fields:
+        if view == 'summary':
+            raise ValueError('fields y view=summary no se pueden combinar')
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in NOTE_FIELDS]
+        if unknown:
+            raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+        return list(dict.fromkeys(['note_id'] + requested))
+    if view == 'summary':
+        return list(SUMMARY_FIELDS)
+    return None
+
+
+def project_note(item: Dict, fields: Optional[List[str]] = None) -> Dict:
+    """public_note limitado a fields (si se indican)"""
+    if fields is None:
+        return public_note(item)
+    return {field: item[field] for field in fields if field in item}
+
+
+def new_note_item(note_data: Dict) -> Dict:
+    """
+    Construir el item de DynamoDB de una nota nueva a partir de datos validados
+    """
+    timestamp = datetime.utcnow().isoformat() + 'Z'
+    return {
+        'note_id': str(uuid.uuid4()),
+        'title': note_data['title'],
+        'content': note_data['content'],
+        'preview': note_preview(note_data['content']),
+        'tags': note_data.get('tags') or [],
+        'created_at': timestamp,
+        'updated_at': timestamp,
+        'entity_type': ENTITY_TYPE
+    }
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict]) -> Optional[str]:
+    """
+    Codificar LastEvaluatedKey como token opaco para el cliente
+    """
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """
+    Decodificar un token de continuación a ExclusiveStartKey
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Cursor inválido')
+    if not isinstance(key, dict) or 'note_id' not in key:
+        raise ValueError('Cursor inválido')
+    return key
+
+
+def parse_limit(value: Optional[str]) -> int:
+    """
+    Validar el parámetro limit de paginación
+    """
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit debe ser un número entero')
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f'limit debe estar entre 1 y {MAX_PAGE_SIZE}')
+    return limit
+
+
+def is_conditional_check_failure(error: Exception) -> bool:
+    """
+    True si el error es un ConditionalCheckFailedException de DynamoDB
+    """
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+
+def get_header(headers: Optional[Dict], name: str) -> Optional[str]:
+    """
+    Valor de una cabecera sin distinguir mayúsculas (API Gateway las pasa
+    tal como las envía el cliente)
+    """
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def http_date(timestamp: Optional[str]) -> Optional[str]:
+    """
+    Fecha ISO 8601 de las notas ('2024-01-01T10:00:00.000000Z') en el
+    formato de Last-Modified
+    """
+    if not timestamp:
+        return None
+    try:
+        moment = datetime.fromisoformat(timestamp.rstrip('Z'))
+    except ValueError:
+        return None
+    return format_datetime(moment.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _etag(parts: Any) -> str:
+    raw = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+def _opaque_tag(etag: str) -> str:
+    """ETag sin el prefijo W/ (comparación débil de RFC 7232, válida para GET)"""
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def note_etag(note: Dict) -> str:
+    """ETag fuerte de una nota: hash de su contenido"""
+    return _etag(note)
+
+
+def collection_etag(version: int, params: Optional[Dict] = None) -> str:
+    """
+    ETag de un listado: versión de la colección (cambia con cada escritura
+    de notas) y parámetros de la consulta
+    """
+    return _etag([version, params or {}])
+
+
+def validator_headers(etag: str, last_modified: Optional[str] = None) -> Dict:
+    """
+    Cabeceras ETag/Last-Modified. Cache-Control: no-cache hace que el
+    navegador guarde la respuesta pero la revalide en cada petición.
+    """
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if last_modified:
+        headers['Last-Modified'] = last_modified
+    return headers
+
+
+def is_not_modified(request_headers: Optional[Dict], etag: Optional[str],
+                    last_modified: Optional[str] = None) -> bool:
+    """
+    True si la petición condicional (If-None-Match o, si no viene,
+    If-Modified-Since) indica que el cliente ya tiene esta versión
+    """
+    if_none_match = get_header(request_headers, 'If-None-Match')
+    if if_none_match is not None:
+        if not etag:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in candidates or _opaque_tag(etag) in {_opaque_tag(tag) for tag in candidates}
+
+    if_modified_since = get_header(request_headers, 'If-Modified-Since')
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
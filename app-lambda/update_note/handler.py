@@ -4,19 +4,22 @@ PUT /notes/{id}
 """
 import os
 from datetime import datetime
-import boto3
 from pydantic import ValidationError
-import sys
 
-from shared.models import NoteUpdate
-from shared.utils import create_response, parse_json_body
+from shared.emf import instrument, phase
+from shared.models import NoteUpdate, validation_errors
+from shared.utils import create_response, raw_body, public_note
+from shared.cache import note_cache
+from shared.storage import notes_table, index_table
+from shared.indexes import NoteIndexes
 
-# Cliente DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'us-east-1'))
+# Cliente DynamoDB de bajo nivel con serializador propio
 table_name = os.environ.get('TABLE_NAME', 'Notes')
-table = dynamodb.Table(table_name)
+notes = notes_table(table_name, region_name=os.environ.get('REGION', 'us-east-1'))
+indexes = NoteIndexes(index_table(region_name=os.environ.get('REGION', 'us-east-1')))
 
 
+@instrument('update_note')
 def lambda_handler(event, context):
     """
     Handler para actualizar una nota existente
@@ -30,50 +33,34 @@ def lambda_handler(event, context):
                 'error': 'ID de nota requerido'
             })
         
-        # Verificar que la nota existe
-        response = table.get_item(Key={'note_id': note_id})
-        if 'Item' not in response:
-            return create_response(404, {
-                'error': 'Nota no encontrada'
-            })
-        
-        # Parsear y validar body
-        body = parse_json_body(event)
-        note_data = NoteUpdate(**body)
+        # Validar directamente desde el body JSON
+        with phase('Validation'):
+            note_data = NoteUpdate.model_validate_json(raw_body(event))
         
-        # Construir expresión de actualización
-        timestamp = datetime.utcnow().isoformat() + 'Z'
-        update_dict = note_data.dict(exclude_unset=True)  # Solo campos enviados
+        # Solo campos enviados + updated_at
+        values = note_data.model_dump(exclude_unset=True)
+        values['updated_at'] = datetime.utcnow().isoformat() + 'Z'
         
-        update_expression = "SET updated_at = :updated_at"
-        expression_values = {':updated_at': timestamp}
+        # Actualizar en DynamoDB con una escritura condicional (sin lectura previa)
+        result = notes.update_with_previous(note_id, values)
         
-        if 'title' in update_dict:
-            update_expression += ", title = :title"
-            expression_values[':title'] = update_dict['title']
+        # Invalidar la caché de lecturas del proceso
+        note_cache.invalidate(note_id)
         
-        if 'content' in update_dict:
-            update_expression += ", content = :content"
-            expression_values[':content'] = update_dict['content']
-        
-        if 'tags' in update_dict:
-            update_expression += ", tags = :tags"
-            expression_values[':tags'] = update_dict['tags']
+        if result is None:
+            return create_response(404, {
+                'error': 'Nota no encontrada'
+            })
         
-        # Actualizar en DynamoDB
-        response = table.update_item(
-            Key={'note_id': note_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values,
-            ReturnValues='ALL_NEW'
-        )
+        previous, item = result
+        indexes.update(previous, item)
         
-        return create_response(200, response['Attributes'])
+        return create_response(200, public_note(item))
         
     except ValidationError as e:
         return create_response(400, {
             'error': 'Datos inválidos',
-            'details': e.errors()
+            'details': validation_errors(e)
         })
     
     except Exception as e:
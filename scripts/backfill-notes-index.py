@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Script para añadir entity_type a las notas creadas antes del índice created_at-index
+Uso: python scripts/backfill-notes-index.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared.clients import get_resource
+
+TABLE_NAME = "Notes"
+REGION = "us-east-1"
+ENTITY_TYPE = "note"
+
+
+def main():
+    print(f"Actualizando notas de la tabla {TABLE_NAME}...")
+
+    dynamodb = get_resource(REGION)
+    table = dynamodb.Table(TABLE_NAME)
+
+    updated = 0
+    try:
+        scan_kwargs = {
+            'FilterExpression': 'attribute_not_exists(entity_type)',
+            'ProjectionExpression': 'note_id'
+        }
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                table.update_item(
+                    Key={'note_id': item['note_id']},
+                    UpdateExpression='SET entity_type = :entity_type',
+                    ExpressionAttributeValues={':entity_type': ENTITY_TYPE}
+                )
+                updated += 1
+
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Notas actualizadas: {updated}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script para añadir preview a las notas creadas antes de los listados con
+view=summary (el índice created_at-summary-index sólo proyecta preview)
+Uso: python scripts/backfill-previews.py [segmentos]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared.scan import iter_parallel_scan, resolve_segments
+from shared.clients import get_resource
+from shared.utils import note_preview
+
+TABLE_NAME = "Notes"
+REGION = "us-east-1"
+
+
+def main():
+    segments = resolve_segments(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+
+    print(f"Añadiendo preview a las notas de {TABLE_NAME} con {segments} segmentos...")
+
+    dynamodb = get_resource(REGION)
+    table = dynamodb.Table(TABLE_NAME)
+
+    start = time.time()
+    updated = 0
+    try:
+        pages = iter_parallel_scan(
+            table, segments,
+            FilterExpression='attribute_not_exists(preview) AND attribute_exists(content)',
+            ProjectionExpression='note_id, content'
+        )
+        for page in pages:
+            for item in page:
+                # Condición: si la nota se borró entretanto no se recrea
+                try:
+                    table.update_item(
+                        Key={'note_id': item['note_id']},
+                        UpdateExpression='SET preview = :preview',
+                        ConditionExpression='attribute_exists(note_id)',
+                        ExpressionAttributeValues={':preview': note_preview(item['content'])}
+                    )
+                except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+                    continue
+                updated += 1
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"✓ {updated} notas actualizadas en {time.time() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
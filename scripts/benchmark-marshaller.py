@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script para comparar el serializador propio de shared/dynamo.py con el
+TypeSerializer/TypeDeserializer que usa boto3.resource
+Uso: python scripts/benchmark-marshaller.py [numero_de_notas] [repeticiones]
+"""
+
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from shared.dynamo import NoteMarshaller
+
+NUM_NOTES = 1000
+REPEAT = 20
+
+
+def sample_notes(count):
+    """Notas con tamaños parecidos a los reales"""
+    timestamp = '2025-01-01T00:00:00.000000Z'
+    return [
+        {
+            'note_id': str(uuid.uuid4()),
+            'title': f'Nota de prueba {i}',
+            'content': 'Lorem ipsum dolor sit amet. ' * (i % 50 + 1),
+            'tags': [f'tag{j}' for j in range(i % 5)],
+            'created_at': timestamp,
+            'updated_at': timestamp,
+            'entity_type': 'note'
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(func, items, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    num_notes = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_NOTES
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else REPEAT
+
+    notes = sample_notes(num_notes)
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+    marshaller = NoteMarshaller()
+
+    def resource_marshal(item):
+        return {k: serializer.serialize(v) for k, v in item.items()}
+
+    def resource_unmarshal(item):
+        return {k: deserializer.deserialize(v) for k, v in item.items()}
+
+    wire = [marshaller.marshal(note) for note in notes]
+    assert wire == [resource_marshal(note) for note in notes]
+    assert [marshaller.unmarshal(item) for item in wire] == [resource_unmarshal(item) for item in wire]
+
+    print("=" * 60)
+    print(f"SERIALIZACIÓN DE {num_notes} NOTAS (mejor de {repeat})")
+    print("=" * 60)
+
+    rows = [
+        ('marshal', best_of(resource_marshal, notes, repeat), best_of(marshaller.marshal, notes, repeat)),
+        ('unmarshal', best_of(resource_unmarshal, wire, repeat), best_of(marshaller.unmarshal, wire, repeat)),
+    ]
+
+    print(f"{'operación':<12}{'boto3 (ms)':>14}{'propio (ms)':>14}{'mejora':>10}")
+    for name, baseline, custom in rows:
+        print(f"{name:<12}{baseline * 1000:>14.2f}{custom * 1000:>14.2f}{baseline / custom:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Script para medir el rendimiento de validación de NoteCreate/NoteUpdate
+(shared/models.py) según el tamaño del body
+Uso: python scripts/benchmark-models.py [repeticiones]
+
+Compara json.loads + Model(**data), lo que hacían los handlers, con
+Model.model_validate_json sobre el body en bruto.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared.models import NoteCreate, NoteUpdate, MAX_TAGS
+
+REPEAT = 2000
+
+# (nombre, longitud de content, número de tags)
+PAYLOADS = [
+    ('pequeño', 100, 1),
+    ('mediano', 2000, 5),
+    ('grande', 10000, MAX_TAGS),
+]
+
+
+def sample_body(content_length, num_tags):
+    return json.dumps({
+        'title': 'Nota de prueba',
+        'content': ('Lorem ipsum dolor sit amet, programación asíncrona. ' * 200)[:content_length],
+        'tags': [f'etiqueta-{i}' for i in range(num_tags)]
+    })
+
+
+def per_second(func, body, repeat):
+    """Validaciones por segundo (mejor de 3 rondas)"""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(body)
+        best = min(best, time.perf_counter() - start)
+    return repeat / best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT
+
+    print("=" * 72)
+    print(f"VALIDACIÓN DE NOTAS ({repeat} por ronda, mejor de 3)")
+    print("=" * 72)
+    print(f"{'modelo':<12}{'body':<10}{'bytes':>8}{'loads+Model':>16}{'validate_json':>16}{'mejora':>10}")
+
+    for model in (NoteCreate, NoteUpdate):
+        def from_dict(body):
+            return model(**json.loads(body))
+
+        def from_json(body):
+            return model.model_validate_json(body)
+
+        for name, content_length, num_tags in PAYLOADS:
+            body = sample_body(content_length, num_tags)
+            assert from_dict(body) == from_json(body)
+            baseline = per_second(from_dict, body, repeat)
+            direct = per_second(from_json, body, repeat)
+            print(f"{model.__name__:<12}{name:<10}{len(body.encode('utf-8')):>8}"
+                  f"{baseline:>14.0f}/s{direct:>14.0f}/s{direct / baseline:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Script para comparar el serializador JSON compartido (shared/serializer.py)
+con el json.dumps + DecimalEncoder que usaba list_notes
+Uso: python scripts/benchmark-serializer.py [numero_de_notas ...] [--repeat N]
+
+Mide el tiempo de codificar un listado completo (mejor de N) y la memoria
+asignada durante una codificación (pico de tracemalloc). El backend orjson
+solo aparece si el paquete está instalado.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared.serializer import ENCODERS
+
+SIZES = [1000, 10000]
+REPEAT = 10
+
+
+class DecimalEncoder(json.JSONEncoder):
+    """El encoder que usaba list_notes/handler.py"""
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+
+def legacy_dumps(obj):
+    return json.dumps(obj, cls=DecimalEncoder).encode('utf-8')
+
+
+def sample_notes(count):
+    """Notas con tamaños parecidos a los reales (y un número como Decimal)"""
+    timestamp = '2025-01-01T00:00:00.000000Z'
+    return [
+        {
+            'note_id': str(uuid.uuid4()),
+            'title': f'Nota de prueba {i}',
+            'content': 'Lorem ipsum dolor sit amet, programación asíncrona. ' * (i % 50 + 1),
+            'tags': [f'tag{j}' for j in range(i % 5)],
+            'created_at': timestamp,
+            'updated_at': timestamp,
+            'version': Decimal(i)
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(func, payload, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def allocated(func, payload):
+    """Pico de memoria (bytes) durante una codificación"""
+    tracemalloc.start()
+    try:
+        func(payload)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = REPEAT
+    if '--repeat' in args:
+        position = args.index('--repeat')
+        repeat = int(args[position + 1])
+        del args[position:position + 2]
+    sizes = [int(arg) for arg in args] or SIZES
+
+    encoders = [('json+DecimalEncoder', legacy_dumps)]
+    encoders += [(f'serializer[{name}]', func) for name, func in ENCODERS.items()]
+
+    for size in sizes:
+        notes = sample_notes(size)
+        baseline = json.loads(legacy_dumps(notes))
+        for name, func in encoders:
+            # Mismo contenido (Decimal entero -> int en lugar de float)
+            assert json.loads(func(notes)) == baseline, name
+
+        print("=" * 72)
+        print(f"LISTADO DE {size} NOTAS, {len(legacy_dumps(notes)) / 1024 / 1024:.1f} MB (mejor de {repeat})")
+        print("=" * 72)
+        print(f"{'serializador':<24}{'tiempo (ms)':>14}{'memoria (MB)':>16}{'mejora':>10}")
+
+        reference = best_of(legacy_dumps, notes, repeat)
+        for name, func in encoders:
+            elapsed = best_of(func, notes, repeat)
+            peak = allocated(func, notes)
+            print(f"{name:<24}{elapsed * 1000:>14.2f}{peak / 1024 / 1024:>16.2f}{reference / elapsed:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
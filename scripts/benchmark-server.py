@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Script para comparar peticiones/segundo del servidor de desarrollo de Flask
+frente a Gunicorn (configuración de producción de app-ecs/gunicorn.conf.py),
+tanto con la app WSGI (main.py) como con la variante asyncio (main_async.py)
+Uso: python scripts/benchmark-server.py [--path /health] [--concurrency 32] [--duration 10]
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+
+APP_DIR = "app-ecs"
+HOST = "127.0.0.1"
+
+GUNICORN = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py']
+
+# nombre -> (comando, variables de entorno adicionales)
+SERVERS = {
+    'flask-dev': ([sys.executable, 'main.py'], {}),
+    'gunicorn': (GUNICORN, {}),
+    'async': (GUNICORN, {
+        'APP_MODULE': 'main_async:app',
+        'GUNICORN_WORKER_CLASS': 'uvicorn.workers.UvicornWorker'
+    })
+}
+
+
+def wait_until_ready(port, timeout=20):
+    """Esperar a que el servidor responda en /health"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def run_load(port, path, concurrency, duration):
+    """Lanzar N clientes keep-alive durante duration segundos"""
+    counts = [0] * concurrency
+    errors = [0] * concurrency
+    stop_at = time.time() + duration
+
+    def client(i):
+        conn = http.client.HTTPConnection(HOST, port, timeout=10)
+        while time.time() < stop_at:
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status < 500:
+                    counts[i] += 1
+                else:
+                    errors[i] += 1
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(HOST, port, timeout=10)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+    return sum(counts) / elapsed, sum(errors)
+
+
+def benchmark(name, port, args):
+    command, extra_env = SERVERS[name]
+    env = dict(os.environ, PORT=str(port), **extra_env)
+    process = subprocess.Popen(
+        command,
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_until_ready(port):
+            print(f"  ✗ {name} no arrancó")
+            return None
+        run_load(port, args.path, args.concurrency, 1)  # calentamiento
+        rps, errors = run_load(port, args.path, args.concurrency, args.duration)
+        print(f"  {name:<10} {rps:>10.1f} req/s   errores: {errors}")
+        return rps
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--path', default='/health')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=int, default=10)
+    parser.add_argument('--port', type=int, default=18080)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"BENCHMARK GET {args.path} ({args.concurrency} clientes, {args.duration}s)")
+    print("=" * 60)
+
+    results = {}
+    for i, name in enumerate(SERVERS):
+        results[name] = benchmark(name, args.port + i, args)
+
+    if results.get('flask-dev') and results.get('gunicorn'):
+        print(f"\nGunicorn / Flask dev: x{results['gunicorn'] / results['flask-dev']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,16 +2,135 @@
 """
 Script para desplegar la tabla DynamoDB
 Uso: python scripts/deploy-dynamodb.py
+
+CloudFormation solo puede crear un índice secundario global (GSI) por tabla
+en cada actualización. Si el stack ya existe y el template añade varios GSI
+a la vez (p. ej. al actualizar desde una versión sin created_at-index,
+updated_at-index ni created_at-summary-index), el script aplica antes
+versiones intermedias del template con un GSI nuevo cada una, esperando a
+que cada índice esté creado. Necesita PyYAML en ese caso (pip install pyyaml).
+Los GSI que ya no están en el template no se cuentan: quitar índices y
+añadir otros en el mismo despliegue requiere hacerlo en dos pasos.
 """
 
 import boto3
+import json
+import os
 import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared.clients import get_client
+
 STACK_NAME = "notes-dynamodb"
 TEMPLATE_FILE = "cloudformation/01-dynamodb.yml"
 REGION = "us-east-1"
 
+
+def load_template(template_body):
+    """Template YAML como dict, con las funciones abreviadas (!Ref, !Sub...) en su forma JSON"""
+    import yaml
+
+    class TemplateLoader(yaml.SafeLoader):
+        pass
+
+    def intrinsic(loader, suffix, node):
+        if isinstance(node, yaml.ScalarNode):
+            value = loader.construct_scalar(node)
+        elif isinstance(node, yaml.SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_mapping(node, deep=True)
+        if suffix == 'Ref':
+            return {'Ref': value}
+        if suffix == 'GetAtt' and isinstance(value, str):
+            value = value.split('.', 1)
+        return {f'Fn::{suffix}': value}
+
+    TemplateLoader.add_multi_constructor('!', intrinsic)
+    return yaml.load(template_body, Loader=TemplateLoader)
+
+
+def deployed_indexes(cf_client, logical_id):
+    """
+    Nombres de los GSI que tiene ahora la tabla del recurso logical_id, o
+    None si el stack aún no la tiene (una tabla nueva se crea con todos)
+    """
+    try:
+        resource = cf_client.describe_stack_resource(StackName=STACK_NAME, LogicalResourceId=logical_id)
+    except cf_client.exceptions.ClientError:
+        return None
+    table_name = resource['StackResourceDetail']['PhysicalResourceId']
+    table = get_client(REGION).describe_table(TableName=table_name)['Table']
+    return {index['IndexName'] for index in table.get('GlobalSecondaryIndexes', [])}
+
+
+def with_indexes(properties, index_names):
+    """Propiedades de la tabla con solo los GSI index_names (y sus atributos)"""
+    properties = dict(properties)
+    indexes = [index for index in properties.get('GlobalSecondaryIndexes', [])
+               if index['IndexName'] in index_names]
+    if indexes:
+        properties['GlobalSecondaryIndexes'] = indexes
+    else:
+        properties.pop('GlobalSecondaryIndexes', None)
+    # DynamoDB rechaza atributos definidos que ninguna clave usa
+    used = {key['AttributeName'] for key in properties['KeySchema']}
+    used.update(key['AttributeName'] for index in indexes for key in index['KeySchema'])
+    properties['AttributeDefinitions'] = [
+        attribute for attribute in properties['AttributeDefinitions'] if attribute['AttributeName'] in used
+    ]
+    return properties
+
+
+def index_stages(cf_client, template_body):
+    """
+    Templates intermedios (JSON) que añaden de uno en uno los GSI que faltan,
+    salvo el último, que añade el template completo
+    """
+    try:
+        template = load_template(template_body)
+    except ImportError:
+        print("⚠ Sin PyYAML no se pueden escalonar los índices: se aplica el template completo")
+        return []
+    tables = {
+        logical_id: resource['Properties']
+        for logical_id, resource in template['Resources'].items()
+        if resource['Type'] == 'AWS::DynamoDB::Table'
+    }
+    present, pending = {}, {}
+    for logical_id, properties in tables.items():
+        names = [index['IndexName'] for index in properties.get('GlobalSecondaryIndexes', [])]
+        deployed = deployed_indexes(cf_client, logical_id)
+        if deployed is None:
+            deployed = set(names)
+        present[logical_id] = {name for name in names if name in deployed}
+        pending[logical_id] = [name for name in names if name not in deployed]
+
+    stages = []
+    while sum(len(names) for names in pending.values()) > 1:
+        for logical_id, names in pending.items():
+            if names and sum(len(other) for other in pending.values()) > 1:
+                present[logical_id].add(names.pop(0))
+        stage = json.loads(json.dumps(template))
+        for logical_id, properties in tables.items():
+            stage['Resources'][logical_id]['Properties'] = with_indexes(properties, present[logical_id])
+        stages.append(json.dumps(stage))
+    return stages
+
+
+def update_stack(cf_client, template_body):
+    cf_client.update_stack(
+        StackName=STACK_NAME,
+        TemplateBody=template_body
+    )
+    
+    print("Esperando actualización...")
+    waiter = cf_client.get_waiter('stack_update_complete')
+    # La creación de un GSI rellena el índice con toda la tabla: puede tardar
+    waiter.wait(StackName=STACK_NAME, WaiterConfig={'Delay': 30, 'MaxAttempts': 240})
+
+
 def main():
     print("Desplegando tabla DynamoDB...")
     print(f"Stack: {STACK_NAME}")
@@ -61,14 +180,14 @@ def main():
             # Actualizar stack
             print("Stack existe, actualizando...")
             try:
-                cf_client.update_stack(
-                    StackName=STACK_NAME,
-                    TemplateBody=template_body
-                )
-                
-                print("Esperando actualización...")
-                waiter = cf_client.get_waiter('stack_update_complete')
-                waiter.wait(StackName=STACK_NAME)
+                stages = index_stages(cf_client, template_body)
+                for number, stage in enumerate(stages, 1):
+                    # Un GSI nuevo por actualización (límite de CloudFormation)
+                    print(f"Etapa {number}/{len(stages) + 1}: un índice secundario nuevo...")
+                    update_stack(cf_client, stage)
+                if stages:
+                    print(f"Etapa {len(stages) + 1}/{len(stages) + 1}: template completo...")
+                update_stack(cf_client, template_body)
                 print("Stack actualizado!\n")
             except cf_client.exceptions.ClientError as e:
                 if 'No updates are to be performed' in str(e):
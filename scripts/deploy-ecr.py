@@ -83,7 +83,7 @@ def main():
             print(f"  {output['OutputKey']}: {output['OutputValue']}")
         
         print("\nPróximo paso:")
-        print("  1. Construir imagen Docker: cd app-ecs && docker build -t notes-app .")
+        print("  1. Construir imagen Docker: docker build -t notes-app -f app-ecs/DockerFile .")
         print("  2. Subir imagen: python scripts/push-image.py")
         
     except Exception as e:
@@ -2,6 +2,9 @@
 """
 Script para desplegar funciones Lambda (Opcion B)
 Uso: python scripts/deploy-lambda.py
+
+Si existe lambda-packages/router.zip (package-lambdas.py --consolidated) el
+stack se despliega en modo consolidated: todas las rutas en NotesRouterFunction.
 """
 
 import boto3
@@ -13,11 +16,19 @@ STACK_NAME = "notes-lambda-option-b"
 TEMPLATE_FILE = "cloudformation/04-lambda-option-b.yml"
 REGION = "us-east-1"
 LAMBDA_PACKAGES_DIR = "lambda-packages"
+# Generada por package-lambdas.py --slim
+LAYER_ZIP = os.path.join(LAMBDA_PACKAGES_DIR, "layer.zip")
+LAYER_NAME = "notes-dependencies"
+ROUTER_ZIP = os.path.join(LAMBDA_PACKAGES_DIR, "router.zip")
 
 
 def check_packages_exist():
     """Verificar que existen los paquetes Lambda"""
-    functions = ["create_note", "get_note", "list_notes", "update_note", "delete_note"]
+    functions = [
+        "create_note", "get_note", "list_notes", "update_note", "delete_note",
+        "batch_create", "batch_get", "batch_delete", "search_notes", "list_tags",
+        "list_changes"
+    ]
     
     if not os.path.exists(LAMBDA_PACKAGES_DIR):
         print(f"Error: Directorio {LAMBDA_PACKAGES_DIR}/ no existe")
@@ -49,7 +60,14 @@ def upload_lambda_packages(bucket_name):
     """Subir paquetes Lambda a S3"""
     s3_client = boto3.client('s3', region_name=REGION)
     
-    functions = ["create_note", "get_note", "list_notes", "update_note", "delete_note"]
+    functions = [
+        "create_note", "get_note", "list_notes", "update_note", "delete_note",
+        "batch_create", "batch_get", "batch_delete", "search_notes", "list_tags",
+        "list_changes"
+    ]
+    
+    if os.path.exists(ROUTER_ZIP):
+        functions.append("router")
     
     print("Subiendo paquetes Lambda a S3...")
     for func in functions:
@@ -63,6 +81,48 @@ def upload_lambda_packages(bucket_name):
     print("\n✓ Todos los paquetes subidos\n")
 
 
+def publish_layer(bucket_name):
+    """Publicar la layer común (dependencias + shared/) si existe"""
+    if not os.path.exists(LAYER_ZIP):
+        return None
+
+    print("Publicando layer común...")
+    s3_client = boto3.client('s3', region_name=REGION)
+    s3_key = "layers/layer.zip"
+    s3_client.upload_file(LAYER_ZIP, bucket_name, s3_key)
+
+    lambda_client = boto3.client('lambda', region_name=REGION)
+    response = lambda_client.publish_layer_version(
+        LayerName=LAYER_NAME,
+        Content={'S3Bucket': bucket_name, 'S3Key': s3_key},
+        CompatibleRuntimes=['python3.11']
+    )
+    print(f"  ✓ {response['LayerVersionArn']}\n")
+    return response['LayerVersionArn']
+
+
+def attach_layer(cf_client, parameters, layer_arn):
+    """
+    Asociar la versión de la layer a las funciones a través del stack
+    (parámetro LayerArn), para que la configuración no se desvíe del template
+    """
+    print("Asociando la layer a las funciones (parámetro LayerArn)...")
+    parameters = [p for p in parameters if p['ParameterKey'] != 'LayerArn']
+    parameters.append({'ParameterKey': 'LayerArn', 'ParameterValue': layer_arn})
+    try:
+        cf_client.update_stack(
+            StackName=STACK_NAME,
+            UsePreviousTemplate=True,
+            Parameters=parameters,
+            Capabilities=['CAPABILITY_NAMED_IAM']
+        )
+        cf_client.get_waiter('stack_update_complete').wait(StackName=STACK_NAME)
+    except Exception as e:
+        if 'No updates are to be performed' not in str(e):
+            raise
+    print("  ✓ Layer asociada\n")
+
+
 def deploy_stack():
     """Desplegar stack de CloudFormation"""
     print("Desplegando funciones Lambda (Opción B)...")
@@ -104,16 +164,27 @@ def deploy_stack():
 
     # Verificar si stack existe
     stack_exists = False
+    previous_parameters = set()
     try:
-        cf_client.describe_stacks(StackName=STACK_NAME)
+        stack = cf_client.describe_stacks(StackName=STACK_NAME)['Stacks'][0]
+        previous_parameters = {p['ParameterKey'] for p in stack.get('Parameters', [])}
         stack_exists = True
     except:
         pass
     
     # Parámetros
+    consolidated = os.path.exists(ROUTER_ZIP)
     parameters = [
-        {'ParameterKey': 'TableName', 'ParameterValue': 'Notes'}
+        {'ParameterKey': 'TableName', 'ParameterValue': 'Notes'},
+        {'ParameterKey': 'DeploymentMode', 'ParameterValue': 'consolidated' if consolidated else 'functions'}
     ]
+    if os.path.exists(LAYER_ZIP) and 'LayerArn' in previous_parameters:
+        # La versión nueva de la layer se publica después (el bucket es del
+        # stack); mientras tanto las funciones conservan la que tienen
+        parameters.append({'ParameterKey': 'LayerArn', 'UsePreviousValue': True})
+    else:
+        parameters.append({'ParameterKey': 'LayerArn', 'ParameterValue': ''})
+    print(f"Modo de despliegue: {'consolidated' if consolidated else 'functions'}\n")
     
     try:
         if not stack_exists:
@@ -144,6 +215,14 @@ def deploy_stack():
                 print("Esperando actualización...")
                 waiter = cf_client.get_waiter('stack_update_complete')
                 waiter.wait(StackName=STACK_NAME)
+                
+                # El Deployment de API Gateway no cambia al cambiar las
+                # integraciones (p.ej. al cambiar de modo): redesplegar el stage
+                outputs = cf_client.describe_stacks(StackName=STACK_NAME)['Stacks'][0].get('Outputs', [])
+                rest_api_id = next((o['OutputValue'] for o in outputs if o['OutputKey'] == 'RestApiId'), None)
+                if rest_api_id:
+                    apigw = boto3.client('apigateway', region_name=REGION)
+                    apigw.create_deployment(restApiId=rest_api_id, stageName='prod')
                 print("✓ Stack actualizado!\n")
             except Exception as e:
                 if 'No updates are to be performed' in str(e):
@@ -177,6 +256,9 @@ def deploy_stack():
             print("SUBIENDO CÓDIGO LAMBDA")
             print("=" * 60)
             upload_lambda_packages(bucket_name)
+            layer_arn = publish_layer(bucket_name)
+            if layer_arn:
+                attach_layer(cf_client, parameters, layer_arn)
             
             # Actualizar código de las funciones
             print("Actualizando código de las funciones Lambda...")
@@ -187,8 +269,16 @@ def deploy_stack():
                 'GetNoteFunction': 'get_note',
                 'ListNotesFunction': 'list_notes',
                 'UpdateNoteFunction': 'update_note',
-                'DeleteNoteFunction': 'delete_note'
+                'DeleteNoteFunction': 'delete_note',
+                'BatchCreateNotesFunction': 'batch_create',
+                'BatchGetNotesFunction': 'batch_get',
+                'BatchDeleteNotesFunction': 'batch_delete',
+                'SearchNotesFunction': 'search_notes',
+                'ListTagsFunction': 'list_tags',
+                'ListChangesFunction': 'list_changes'
             }
+            if consolidated:
+                functions['NotesRouterFunction'] = 'router'
             
             for func_name, zip_name in functions.items():
                 print(f"  Actualizando {func_name}...")
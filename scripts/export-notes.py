@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Script para exportar todas las notas a un fichero JSON Lines con scan paralelo
+Uso: python scripts/export-notes.py [fichero_salida] [segmentos]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared.scan import iter_parallel_scan, resolve_segments
+from shared.clients import get_resource
+
+TABLE_NAME = "Notes"
+REGION = "us-east-1"
+OUTPUT_FILE = "notes-export.jsonl"
+
+
+def main():
+    output_file = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_FILE
+    segments = resolve_segments(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+
+    print(f"Exportando tabla {TABLE_NAME} con {segments} segmentos...")
+
+    dynamodb = get_resource(REGION)
+    table = dynamodb.Table(TABLE_NAME)
+
+    start = time.time()
+    count = 0
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for page in iter_parallel_scan(table, segments):
+                for item in page:
+                    f.write(json.dumps(item, default=str, ensure_ascii=False) + '\n')
+                count += len(page)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"✓ {count} notas exportadas a {output_file} en {time.time() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Pruebas de carga de la API contra un DynamoDB local
+Uso: python scripts/load-test.py [--target flask|lambda|all] [--notes 1000]
+                                 [--concurrency 16] [--duration 20]
+                                 [--mix get=50,list=20,...] [--endpoint URL]
+                                 [--storage dynamodb|memory|sqlite]
+                                 [--save resultados.json] [--baseline anterior.json]
+
+Arranca la app Flask de app-ecs/main.py (cliente de pruebas WSGI, sin
+servidor HTTP) y/o invoca los handlers Lambda en el mismo proceso con
+eventos de API Gateway, contra un sustituto local de DynamoDB:
+
+  - DynamoDB Local (--endpoint http://localhost:8000), p. ej.
+    docker run -p 8000:8000 amazon/dynamodb-local
+  - Sin --endpoint, el servidor en memoria de moto (pip install moto[server])
+
+El endpoint se pasa con AWS_ENDPOINT_URL_DYNAMODB y DYNAMODB_ENDPOINT_URL
+(shared/clients.py), así que el código de la app no cambia. Las tablas
+(con sus GSI) se crean a partir de cloudformation/01-dynamodb.yml
+(necesita PyYAML) con el prefijo --table-prefix y se borran al terminar
+salvo con --keep-tables.
+
+Con --storage memory o sqlite la app usa ese backend (DB_TYPE, ver
+app-lambda/shared/storage.py) en lugar de DynamoDB: sin sustituto ni
+tablas que crear, útil para separar el coste de la app del de la base de
+datos. La base SQLite es un fichero temporal que se borra al terminar.
+
+Cada cliente elige operaciones según --mix sobre un conjunto de notas
+precargado (--notes) y se informa, por endpoint, de p50/p95/p99 y
+peticiones/segundo. Con --baseline se compara el p95 con una ejecución
+guardada con --save y se termina con código 1 si empeora más de
+--max-regression.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LAMBDA_DIR = os.path.join(ROOT, 'app-lambda')
+ECS_DIR = os.path.join(ROOT, 'app-ecs')
+TEMPLATE_FILE = os.path.join(ROOT, 'cloudformation', '01-dynamodb.yml')
+REGION = "us-east-1"
+
+# operación -> endpoint con el que se agrupan los resultados
+ENDPOINTS = {
+    'get': 'GET /notes/{id}',
+    'list': 'GET /notes?limit=20',
+    'summary': 'GET /notes?view=summary&limit=20',
+    'search': 'GET /notes/search',
+    'create': 'POST /notes',
+    'update': 'PUT /notes/{id}',
+    'delete': 'DELETE /notes/{id}',
+}
+DEFAULT_MIX = 'get=45,list=15,summary=5,search=5,create=15,update=10,delete=5'
+
+WORDS = (
+    'python dynamodb lambda fargate notas api rendimiento caché índice '
+    'búsqueda etiqueta consulta latencia carga servidor despliegue'
+).split()
+TAGS = ['trabajo', 'personal', 'ideas', 'python', 'aws', 'ops']
+
+PRELOAD_BATCH = 500
+
+
+# ============= SUSTITUTO DE DYNAMODB =============
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_stand_in(endpoint):
+    """Endpoint de DynamoDB a usar y, si se arranca aquí, el servidor moto"""
+    if endpoint:
+        return endpoint, None
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        print("Error: sin --endpoint hace falta moto (pip install 'moto[server]') o DynamoDB Local")
+        sys.exit(1)
+    # El log de cada petición de werkzeug taparía los resultados
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    port = free_port()
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+    server.start()
+    return f'http://127.0.0.1:{port}', server
+
+
+def configure_environment(endpoint, table_name, index_table_name, storage='dynamodb', sqlite_path=None):
+    """Variables que leen boto3, los handlers Lambda y la app Flask al importarse"""
+    os.environ['DB_TYPE'] = storage
+    if endpoint:
+        os.environ['AWS_ENDPOINT_URL_DYNAMODB'] = endpoint
+        os.environ['DYNAMODB_ENDPOINT_URL'] = endpoint
+    if sqlite_path:
+        os.environ['SQLITE_PATH'] = sqlite_path
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+    os.environ['AWS_DEFAULT_REGION'] = REGION
+    os.environ['REGION'] = REGION
+    os.environ['AWS_REGION'] = REGION
+    os.environ['TABLE_NAME'] = table_name
+    os.environ['DB_DYNAMONAME'] = table_name
+    os.environ['INDEX_TABLE_NAME'] = index_table_name
+    os.environ['DB_DYNAMOINDEXNAME'] = index_table_name
+
+
+def table_definitions():
+    """Propiedades de las tablas del template (sin resolver !Ref/!Sub)"""
+    try:
+        import yaml
+    except ImportError:
+        print("Error: hace falta PyYAML para leer el template (pip install pyyaml)")
+        sys.exit(1)
+
+    class TemplateLoader(yaml.SafeLoader):
+        pass
+
+    TemplateLoader.add_multi_constructor('!', lambda loader, suffix, node: None)
+    with open(TEMPLATE_FILE) as f:
+        resources = yaml.load(f, Loader=TemplateLoader)['Resources']
+    return {
+        name: resource['Properties']
+        for name, resource in resources.items()
+        if resource['Type'] == 'AWS::DynamoDB::Table'
+    }
+
+
+def dynamodb_client():
+    """Cliente compartido de shared/clients.py (lee el endpoint del entorno)"""
+    if LAMBDA_DIR not in sys.path:
+        sys.path.insert(0, LAMBDA_DIR)
+    from shared.clients import get_client
+    return get_client(REGION)
+
+
+def create_tables(table_name, index_table_name):
+    client = dynamodb_client()
+    names = {'NotesTable': table_name, 'NotesIndexTable': index_table_name}
+    for resource, properties in table_definitions().items():
+        kwargs = {
+            'TableName': names[resource],
+            'BillingMode': 'PAY_PER_REQUEST',
+            'AttributeDefinitions': properties['AttributeDefinitions'],
+            'KeySchema': properties['KeySchema'],
+        }
+        if properties.get('GlobalSecondaryIndexes'):
+            kwargs['GlobalSecondaryIndexes'] = properties['GlobalSecondaryIndexes']
+        try:
+            client.create_table(**kwargs)
+        except client.exceptions.ResourceInUseException:
+            print(f"  La tabla {names[resource]} ya existe, se reutiliza")
+        client.get_waiter('table_exists').wait(TableName=names[resource])
+
+
+def delete_tables(*table_names):
+    client = dynamodb_client()
+    for name in table_names:
+        try:
+            client.delete_table(TableName=name)
+        except client.exceptions.ResourceNotFoundException:
+            pass
+
+
+# ============= CARGA DE LA APP =============
+
+def load_handler(function_name):
+    """Módulo handler.py de una Lambda (cada uno con su nombre de módulo)"""
+    if LAMBDA_DIR not in sys.path:
+        sys.path.insert(0, LAMBDA_DIR)
+    path = os.path.join(LAMBDA_DIR, function_name, 'handler.py')
+    spec = importlib.util.spec_from_file_location(f'{function_name}_handler', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sample_note(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(20, 200))]
+    return {
+        'title': ' '.join(rng.choice(WORDS) for _ in range(3)).capitalize(),
+        'content': ' '.join(words),
+        'tags': rng.sample(TAGS, rng.randint(0, 3))
+    }
+
+
+def request_args(op, rng, note_id):
+    """(método, ruta, query, body) de una operación"""
+    if op == 'get':
+        return 'GET', f'/notes/{note_id}', None, None
+    if op == 'list':
+        return 'GET', '/notes', {'limit': '20'}, None
+    if op == 'summary':
+        return 'GET', '/notes', {'view': 'summary', 'limit': '20'}, None
+    if op == 'search':
+        return 'GET', '/notes/search', {'q': rng.choice(WORDS), 'limit': '20'}, None
+    if op == 'create':
+        return 'POST', '/notes', None, sample_note(rng)
+    if op == 'update':
+        return 'PUT', f'/notes/{note_id}', None, {'title': f'Editada {rng.random():.6f}'}
+    return 'DELETE', f'/notes/{note_id}', None, None
+
+
+class FlaskTarget:
+    """app-ecs/main.py con el cliente de pruebas de Flask (uno por hilo)"""
+    name = 'flask'
+
+    def __init__(self):
+        if ECS_DIR not in sys.path:
+            sys.path.insert(0, ECS_DIR)
+        import main
+        self.app = main.app
+
+    def client(self):
+        return self.app.test_client()
+
+    def call(self, client, method, path, query, body):
+        response = client.open(path, method=method, query_string=query, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+
+class LambdaTarget:
+    """Handlers de app-lambda invocados en proceso con eventos de API Gateway"""
+    name = 'lambda'
+
+    ROUTES = {
+        ('GET', '/notes'): 'list_notes',
+        ('GET', '/notes/search'): 'search_notes',
+        ('POST', '/notes'): 'create_note',
+        ('GET', '/notes/{id}'): 'get_note',
+        ('PUT', '/notes/{id}'): 'update_note',
+        ('DELETE', '/notes/{id}'): 'delete_note',
+    }
+
+    def __init__(self):
+        self.handlers = {name: load_handler(name) for name in set(self.ROUTES.values())}
+
+    def client(self):
+        return None
+
+    def call(self, client, method, path, query, body):
+        path_parameters = None
+        resource = path
+        if path.startswith('/notes/') and path != '/notes/search':
+            path_parameters = {'id': path.rsplit('/', 1)[1]}
+            resource = '/notes/{id}'
+        event = {
+            'httpMethod': method,
+            'resource': resource,
+            'path': path,
+            'pathParameters': path_parameters,
+            'queryStringParameters': query,
+            'multiValueQueryStringParameters': {k: [v] for k, v in query.items()} if query else None,
+            'headers': {},
+            'body': json.dumps(body) if body is not None else None,
+            'isBase64Encoded': False
+        }
+        handler = self.handlers[self.ROUTES[(method, resource)]]
+        response = handler.lambda_handler(event, None)
+        payload = json.loads(response['body']) if response.get('body') else None
+        return response['statusCode'], payload
+
+
+TARGETS = {'flask': FlaskTarget, 'lambda': LambdaTarget}
+
+
+def preload(num_notes, seed):
+    """Crear num_notes notas (con sus índices) usando el handler batch_create"""
+    rng = random.Random(seed)
+    batch_create = load_handler('batch_create')
+    note_ids = []
+    for start in range(0, num_notes, PRELOAD_BATCH):
+        notes = [sample_note(rng) for _ in range(min(PRELOAD_BATCH, num_notes - start))]
+        response = batch_create.lambda_handler({'body': json.dumps({'notes': notes})}, None)
+        results = json.loads(response['body'])['results']
+        note_ids += [r['note']['note_id'] for r in results if r['status'] == 201]
+    return note_ids
+
+
+# ============= CARGA =============
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        op, _, weight = part.partition('=')
+        op = op.strip()
+        if op not in ENDPOINTS:
+            raise ValueError(f"Operación desconocida en --mix: {op} (válidas: {', '.join(ENDPOINTS)})")
+        weights[op] = float(weight or 1)
+    return weights
+
+
+class NotePool:
+    """Ids de notas existentes compartidos por los clientes"""
+
+    def __init__(self, note_ids):
+        self.ids = list(note_ids)
+        self.lock = threading.Lock()
+
+    def pick(self, rng, remove=False):
+        with self.lock:
+            if not self.ids:
+                return None
+            index = rng.randrange(len(self.ids))
+            if remove:
+                self.ids[index], self.ids[-1] = self.ids[-1], self.ids[index]
+                return self.ids.pop()
+            return self.ids[index]
+
+    def add(self, note_id):
+        with self.lock:
+            self.ids.append(note_id)
+
+
+def run_load(target, pool, weights, concurrency, duration, seed):
+    """
+    Lanzar concurrency clientes durante duration segundos.
+    Devuelve {endpoint: [latencias]}, {endpoint: errores} y el tiempo total.
+    """
+    ops, op_weights = zip(*weights.items())
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(i):
+        rng = random.Random(seed * 1000 + i)
+        client = target.client()
+        local_latencies = defaultdict(list)
+        local_errors = defaultdict(int)
+        while time.perf_counter() < stop_at:
+            op = rng.choices(ops, op_weights)[0]
+            note_id = None
+            if op in ('get', 'update', 'delete'):
+                note_id = pool.pick(rng, remove=(op == 'delete'))
+                if note_id is None:
+                    op = 'create'
+            method, path, query, body = request_args(op, rng, note_id)
+            start = time.perf_counter()
+            try:
+                status, payload = target.call(client, method, path, query, body)
+            except Exception:
+                status, payload = 599, None
+            elapsed = time.perf_counter() - start
+
+            endpoint = ENDPOINTS[op]
+            local_latencies[endpoint].append(elapsed)
+            if status >= 500:
+                local_errors[endpoint] += 1
+            elif op == 'create' and status == 201:
+                pool.add(payload['note_id'])
+
+        with lock:
+            for endpoint, values in local_latencies.items():
+                latencies[endpoint].extend(values)
+            for endpoint, count in local_errors.items():
+                errors[endpoint] += count
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(sorted_values, p):
+    """Percentil por rango más cercano"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    summary = {}
+    all_values = []
+    for endpoint in ENDPOINTS.values():
+        values = sorted(latencies.get(endpoint, []))
+        if not values:
+            continue
+        all_values += values
+        summary[endpoint] = {
+            'requests': len(values),
+            'errors': errors.get(endpoint, 0),
+            'rps': len(values) / elapsed,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+        }
+    all_values.sort()
+    summary['TOTAL'] = {
+        'requests': len(all_values),
+        'errors': sum(errors.values()),
+        'rps': len(all_values) / elapsed,
+        'p50_ms': percentile(all_values, 50) * 1000,
+        'p95_ms': percentile(all_values, 95) * 1000,
+        'p99_ms': percentile(all_values, 99) * 1000,
+    }
+    return summary
+
+
+def print_summary(name, summary):
+    print(f"\n{name}")
+    print(f"{'endpoint':<36}{'peticiones':>11}{'errores':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, row in summary.items():
+        print(f"{endpoint:<36}{row['requests']:>11}{row['errors']:>9}{row['rps']:>9.1f}"
+              f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}")
+
+
+def compare(results, baseline, max_regression):
+    """Endpoints cuyo p95 empeora más de max_regression respecto a baseline"""
+    regressions = []
+    for target, summary in results.items():
+        for endpoint, row in summary.items():
+            previous = baseline.get(target, {}).get(endpoint)
+            if not previous or not previous['p95_ms']:
+                continue
+            change = row['p95_ms'] / previous['p95_ms'] - 1
+            if change > max_regression:
+                regressions.append((target, endpoint, previous['p95_ms'], row['p95_ms'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pruebas de carga contra un DynamoDB local')
+    parser.add_argument('--target', choices=['flask', 'lambda', 'all'], default='all')
+    parser.add_argument('--notes', type=int, default=1000, help='notas precargadas')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20, help='segundos por objetivo')
+    parser.add_argument('--warmup', type=float, default=2, help='segundos de calentamiento')
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--storage', choices=['dynamodb', 'memory', 'sqlite'], default='dynamodb',
+                        help='backend de almacenamiento (DB_TYPE)')
+    parser.add_argument('--endpoint', help='DynamoDB Local (por defecto, moto en memoria)')
+    parser.add_argument('--table-prefix', default='LoadTest')
+    parser.add_argument('--keep-tables', action='store_true')
+    parser.add_argument('--save', help='guardar los resultados en JSON')
+    parser.add_argument('--baseline', help='resultados anteriores (JSON) con los que comparar')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='empeoramiento de p95 tolerado')
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    dynamodb = args.storage == 'dynamodb'
+    endpoint, server = start_stand_in(args.endpoint) if dynamodb else (None, None)
+    sqlite_dir = tempfile.mkdtemp(prefix='notes-load-') if args.storage == 'sqlite' else None
+    sqlite_path = os.path.join(sqlite_dir, 'notes.db') if sqlite_dir else None
+    run_id = uuid.uuid4().hex[:8]
+    table_name = f'{args.table_prefix}-Notes-{run_id}'
+    index_table_name = f'{args.table_prefix}-NotesIndex-{run_id}'
+    configure_environment(endpoint, table_name, index_table_name, args.storage, sqlite_path)
+
+    print("=" * 72)
+    print(f"PRUEBA DE CARGA: {args.notes} notas, {args.concurrency} clientes, {args.duration:g}s")
+    if dynamodb:
+        print(f"DynamoDB: {endpoint}{' (moto)' if server else ''}, tablas {table_name} / {index_table_name}")
+    else:
+        print(f"Almacenamiento: {args.storage}{f' ({sqlite_path})' if sqlite_path else ''}")
+    print(f"Mezcla: {', '.join(f'{op}={weight:g}' for op, weight in weights.items())}")
+    print("=" * 72)
+
+    results = {}
+    try:
+        if dynamodb:
+            create_tables(table_name, index_table_name)
+        start = time.perf_counter()
+        pool = NotePool(preload(args.notes, args.seed))
+        print(f"✓ {len(pool.ids)} notas precargadas en {time.perf_counter() - start:.2f}s")
+
+        names = list(TARGETS) if args.target == 'all' else [args.target]
+        for name in names:
+            target = TARGETS[name]()
+            if args.warmup > 0:
+                run_load(target, pool, weights, args.concurrency, args.warmup, args.seed)
+            latencies, errors, elapsed = run_load(
+                target, pool, weights, args.concurrency, args.duration, args.seed
+            )
+            results[name] = summarize(latencies, errors, elapsed)
+            print_summary(name, results[name])
+    finally:
+        if dynamodb and not args.keep_tables:
+            delete_tables(table_name, index_table_name)
+        if server:
+            server.stop()
+        if sqlite_dir:
+            shutil.rmtree(sqlite_dir, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Resultados guardados en {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n✗ p95 peor que {args.baseline} (más de {args.max_regression:.0%}):")
+            for target, endpoint, before, after, change in regressions:
+                print(f"  {target:<8}{endpoint:<36}{before:>9.2f} -> {after:.2f} ms (+{change:.0%})")
+            sys.exit(1)
+        print(f"\n✓ Sin regresiones de p95 respecto a {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
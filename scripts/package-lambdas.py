@@ -1,10 +1,23 @@
 #!/usr/bin/env python3
 """
 Script para empaquetar las funciones Lambda en archivos ZIP
-Uso: python scripts/package-lambdas.py
+Uso: python scripts/package-lambdas.py [--slim] [--consolidated] [--profile-imports]
+
+  --slim             Dependencias y shared/ en una Lambda layer común
+                     (lambda-packages/layer.zip), sin tests, dist-info ni
+                     __pycache__, y con .pyc precompilados para el runtime.
+                     Los ZIP de cada función solo llevan su handler.
+  --consolidated     Además, router.zip: una sola función con todas las rutas
+                     (app-lambda/router) y cada handler como routes/<función>.py
+  --profile-imports  Informe de tiempo de import por función (-X importtime)
 """
 
+import argparse
+import compileall
+import json
 import os
+import py_compile
+import re
 import shutil
 import zipfile
 import subprocess
@@ -12,7 +25,23 @@ import sys
 
 LAMBDA_DIR = "app-lambda"
 OUTPUT_DIR = "lambda-packages"
-FUNCTIONS = ["create_note", "get_note", "list_notes", "update_note", "delete_note"]
+FUNCTIONS = [
+    "create_note", "get_note", "list_notes", "update_note", "delete_note",
+    "batch_create", "batch_get", "batch_delete", "search_notes", "list_tags",
+    "list_changes"
+]
+
+ROUTER = "router"
+
+# Runtime de las funciones (cloudformation/04-lambda-option-b.yml)
+RUNTIME_VERSION = (3, 11)
+LAYER_NAME = "layer"
+REPORT_FILE = os.path.join(OUTPUT_DIR, "report.json")
+
+# Directorios y ficheros que no hacen falta en tiempo de ejecución
+PRUNE_DIRS = {'__pycache__', 'tests', 'test'}
+PRUNE_DIR_SUFFIXES = ('.dist-info', '.egg-info')
+PRUNE_FILE_SUFFIXES = ('.pyc', '.pyo', '.pyi', '.c', '.h', '.pxd', '.pyx')
 
 
 def create_output_dir():
@@ -23,85 +52,295 @@ def create_output_dir():
     print(f"Directorio {OUTPUT_DIR}/ creado\n")
 
 
-def install_dependencies(function_name, temp_dir):
+def install_dependencies(requirements_files, temp_dir, slim=False):
     """Instalar dependencias en un directorio temporal"""
-    requirements_file = os.path.join(LAMBDA_DIR, function_name, "requirements.txt")
-    
-    if os.path.exists(requirements_file):
-        print(f"  Instalando dependencias...")
-        subprocess.run([
-            sys.executable, "-m", "pip", "install",
-            "-r", requirements_file,
-            "-t", temp_dir,
-            "--quiet"
-        ], check=True)
+    requirements = []
+    for requirements_file in requirements_files:
+        if os.path.exists(requirements_file):
+            requirements += ["-r", requirements_file]
+    if not requirements:
+        return
+
+    print(f"  Instalando dependencias...")
+    command = [
+        sys.executable, "-m", "pip", "install",
+        *requirements,
+        "-t", temp_dir,
+        "--quiet"
+    ]
+    if slim:
+        # Wheels binarios para el runtime de Lambda, no para la máquina local
+        command += [
+            "--platform", "manylinux2014_x86_64",
+            "--implementation", "cp",
+            "--python-version", ".".join(map(str, RUNTIME_VERSION)),
+            "--only-binary=:all:",
+            "--no-compile"
+        ]
+    subprocess.run(command, check=True)
 
 
 def copy_shared_code(temp_dir):
     """Copiar código compartido"""
     shared_src = os.path.join(LAMBDA_DIR, "shared")
     shared_dst = os.path.join(temp_dir, "shared")
-    
+
     if os.path.exists(shared_src):
-        shutil.copytree(shared_src, shared_dst)
+        shutil.copytree(shared_src, shared_dst, ignore=shutil.ignore_patterns('__pycache__'))
+
+
+def prune(directory):
+    """Eliminar tests, metadatos de instalación y cachés"""
+    removed = 0
+    for root, dirs, files in os.walk(directory):
+        for d in list(dirs):
+            if d in PRUNE_DIRS or d.endswith(PRUNE_DIR_SUFFIXES):
+                path = os.path.join(root, d)
+                removed += directory_size(path)
+                shutil.rmtree(path)
+                dirs.remove(d)
+        for f in files:
+            if f.endswith(PRUNE_FILE_SUFFIXES):
+                path = os.path.join(root, f)
+                removed += os.path.getsize(path)
+                os.remove(path)
+    print(f"  Eliminados {removed / (1024 * 1024):.2f} MB innecesarios")
+
+
+def precompile(directory):
+    """
+    Generar .pyc para el runtime. Con UNCHECKED_HASH Python no compara
+    fechas de modificación (el ZIP no las conserva de forma fiable) y no
+    intenta reescribir la caché en /var/task, que es de solo lectura.
+    """
+    if sys.version_info[:2] != RUNTIME_VERSION:
+        print(f"  ⚠ Python local {sys.version_info[0]}.{sys.version_info[1]} != runtime "
+              f"{RUNTIME_VERSION[0]}.{RUNTIME_VERSION[1]}: no se precompila")
+        return
+    compileall.compile_dir(
+        directory,
+        quiet=1,
+        optimize=0,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+    )
+
+
+def directory_size(directory):
+    total = 0
+    for root, dirs, files in os.walk(directory):
+        for f in files:
+            total += os.path.getsize(os.path.join(root, f))
+    return total
+
+
+def write_zip(source_dir, zip_path, prefix=""):
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for root, dirs, files in os.walk(source_dir):
+            dirs.sort()
+            for file in sorted(files):
+                file_path = os.path.join(root, file)
+                arcname = os.path.join(prefix, os.path.relpath(file_path, source_dir))
+                zipf.write(file_path, arcname)
+    return os.path.getsize(zip_path)
+
+
+def create_layer():
+    """Crear la layer común con dependencias y shared/"""
+    print("Empaquetando layer común...")
+    layer_dir = os.path.join(OUTPUT_DIR, f"{LAYER_NAME}_temp")
+    os.makedirs(layer_dir)
+
+    requirements = [os.path.join(LAMBDA_DIR, f, "requirements.txt") for f in FUNCTIONS]
+    install_dependencies(sorted(set(requirements)), layer_dir, slim=True)
+    copy_shared_code(layer_dir)
+    prune(layer_dir)
+    precompile(layer_dir)
+
+    # Las layers de Python se montan en /opt/python
+    zip_path = os.path.join(OUTPUT_DIR, f"{LAYER_NAME}.zip")
+    size = write_zip(layer_dir, zip_path, prefix="python")
+    print(f"  ✓ Creado: {zip_path} ({size / (1024 * 1024):.2f} MB)\n")
+    return layer_dir, size
 
 
-def create_zip(function_name):
+def create_zip(function_name, slim=False):
     """Crear archivo ZIP para una función Lambda"""
     print(f"Empaquetando {function_name}...")
-    
+
     # Directorio temporal
     temp_dir = os.path.join(OUTPUT_DIR, f"{function_name}_temp")
     os.makedirs(temp_dir)
-    
-    # Instalar dependencias
-    install_dependencies(function_name, temp_dir)
-    
-    # Copiar código compartido
-    copy_shared_code(temp_dir)
-    
+
+    if not slim:
+        # Instalar dependencias
+        install_dependencies([os.path.join(LAMBDA_DIR, function_name, "requirements.txt")], temp_dir)
+
+        # Copiar código compartido
+        copy_shared_code(temp_dir)
+
     # Copiar handler
     handler_src = os.path.join(LAMBDA_DIR, function_name, "handler.py")
     handler_dst = os.path.join(temp_dir, "handler.py")
     shutil.copy(handler_src, handler_dst)
-    
+
+    if slim:
+        precompile(temp_dir)
+
     # Crear ZIP
     zip_path = os.path.join(OUTPUT_DIR, f"{function_name}.zip")
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, temp_dir)
-                zipf.write(file_path, arcname)
-    
-    # Limpiar directorio temporal
-    shutil.rmtree(temp_dir)
-    
+    size = write_zip(temp_dir, zip_path)
+
     # Mostrar tamaño
-    size_mb = os.path.getsize(zip_path) / (1024 * 1024)
-    print(f"  ✓ Creado: {zip_path} ({size_mb:.2f} MB)\n")
+    print(f"  ✓ Creado: {zip_path} ({size / (1024 * 1024):.2f} MB)\n")
+    return temp_dir, size
+
+
+def create_router_zip(slim=False):
+    """Crear el ZIP de la función única con todas las rutas"""
+    print(f"Empaquetando {ROUTER} (consolidado)...")
+
+    temp_dir = os.path.join(OUTPUT_DIR, f"{ROUTER}_temp")
+    os.makedirs(temp_dir)
+
+    if not slim:
+        install_dependencies([os.path.join(LAMBDA_DIR, ROUTER, "requirements.txt")], temp_dir)
+        copy_shared_code(temp_dir)
+
+    shutil.copy(os.path.join(LAMBDA_DIR, ROUTER, "handler.py"), os.path.join(temp_dir, "handler.py"))
+
+    # Cada handler como módulo del paquete routes
+    routes_dir = os.path.join(temp_dir, "routes")
+    os.makedirs(routes_dir)
+    open(os.path.join(routes_dir, "__init__.py"), 'w').close()
+    for function_name in FUNCTIONS:
+        shutil.copy(
+            os.path.join(LAMBDA_DIR, function_name, "handler.py"),
+            os.path.join(routes_dir, f"{function_name}.py")
+        )
+
+    if slim:
+        precompile(temp_dir)
+
+    zip_path = os.path.join(OUTPUT_DIR, f"{ROUTER}.zip")
+    size = write_zip(temp_dir, zip_path)
+    print(f"  ✓ Creado: {zip_path} ({size / (1024 * 1024):.2f} MB)\n")
+    return temp_dir, size
+
+
+def profile_imports(function_dir, layer_dir=None):
+    """
+    Importar el handler con -X importtime en un proceso limpio.
+    Devuelve el tiempo total de import (ms) y los módulos más costosos.
+    """
+    path = [os.path.abspath(d) for d in [function_dir, layer_dir] if d]
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(path),
+        PYTHONDONTWRITEBYTECODE="1",
+        AWS_DEFAULT_REGION=os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import handler"],
+        cwd=function_dir,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr else 'error'}
+
+    # Cada línea: "import time: self | cumulative | <sangría>módulo". Los
+    # submódulos aparecen (con más sangría) justo antes del módulo que los importa
+    line_re = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)")
+    children = []
+    handler_us = None
+    handler_children = []
+    for line in result.stderr.splitlines():
+        match = line_re.match(line)
+        if not match:
+            continue
+        depth = (len(match.group(3)) - 1) // 2
+        name, cumulative = match.group(4), int(match.group(2))
+        if depth == 1:
+            children.append((name, cumulative))
+        elif depth == 0:
+            if name == 'handler':
+                handler_us = cumulative
+                handler_children = children
+            children = []
+
+    if handler_us is None:
+        return {'error': 'sin datos de importtime'}
+
+    top = sorted(handler_children, key=lambda entry: entry[1], reverse=True)[:5]
+    return {
+        'import_ms': round(handler_us / 1000, 1),
+        'top_imports_ms': {name: round(us / 1000, 1) for name, us in top}
+    }
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--slim', action='store_true')
+    parser.add_argument('--consolidated', action='store_true')
+    parser.add_argument('--profile-imports', action='store_true')
+    args = parser.parse_args()
+
     print("=" * 60)
-    print("EMPAQUETADO DE FUNCIONES LAMBDA")
+    print("EMPAQUETADO DE FUNCIONES LAMBDA" + (" (SLIM)" if args.slim else ""))
     print("=" * 60)
     print()
-    
+
     # Crear directorio de salida
     create_output_dir()
-    
+
+    report = {'slim': args.slim, 'consolidated': args.consolidated, 'functions': {}}
+    layer_dir = None
+    if args.slim:
+        layer_dir, layer_size = create_layer()
+        report['layer_zip_bytes'] = layer_size
+
     # Empaquetar cada función
+    packaged = []
     for function in FUNCTIONS:
-        create_zip(function)
-    
+        temp_dir, size = create_zip(function, slim=args.slim)
+        packaged.append((function, temp_dir))
+        report['functions'][function] = {'zip_bytes': size}
+
+    if args.consolidated:
+        temp_dir, size = create_router_zip(slim=args.slim)
+        packaged.append((ROUTER, temp_dir))
+        report['functions'][ROUTER] = {'zip_bytes': size}
+
+    temp_dirs = [temp_dir for _, temp_dir in packaged]
+
+    if args.profile_imports:
+        print("Tiempo de import por función (-X importtime):")
+        for function, temp_dir in packaged:
+            profile = profile_imports(temp_dir, layer_dir)
+            report['functions'][function].update(profile)
+            if 'error' in profile:
+                print(f"  {function:<14} error: {profile['error']}")
+            else:
+                top = ", ".join(f"{name} {ms}ms" for name, ms in profile['top_imports_ms'].items())
+                print(f"  {function:<14} {profile['import_ms']:>8.1f} ms   ({top})")
+        print()
+
+    # Limpiar directorios temporales
+    for temp_dir in temp_dirs + ([layer_dir] if layer_dir else []):
+        shutil.rmtree(temp_dir)
+
+    with open(REPORT_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+
     print("=" * 60)
     print("EMPAQUETADO COMPLETADO")
     print("=" * 60)
     print(f"\nArchivos ZIP creados en: {OUTPUT_DIR}/")
+    print(f"Informe de tamaños: {REPORT_FILE}")
     print("\nPróximo paso:")
     print("  python scripts/deploy-lambda.py")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -87,7 +87,7 @@ def main():
     print("Construyendo imagen Docker...")
     image_name = f"{repo_uri}:{IMAGE_TAG}"
     
-    run_command(['docker', 'build', '-t', image_name, 'app-ecs/'])
+    run_command(['docker', 'build', '-t', image_name, '-f', 'app-ecs/DockerFile', '.'])
     print("Imagen construida exitosamente\n")
     
     # Subir imagen
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Script para (re)construir los índices (búsqueda de texto y tags) a partir de
+la tabla de notas
+Uso: python scripts/rebuild-indexes.py [segmentos]
+
+Escribe las entradas de todas las notas y recalcula los contadores de tags;
+las entradas de notas ya borradas no se eliminan, pero las consultas las
+descartan.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app-lambda'))
+from shared.scan import iter_parallel_scan, resolve_segments
+from shared.clients import get_resource
+from shared.dynamo import IndexTable
+from shared.indexes import index_changes
+from shared.tags import TAG_COUNTS_PK, note_tags
+
+TABLE_NAME = "Notes"
+INDEX_TABLE_NAME = "NotesIndex"
+REGION = "us-east-1"
+
+
+def main():
+    segments = resolve_segments(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+
+    print(f"Indexando tabla {TABLE_NAME} en {INDEX_TABLE_NAME} con {segments} segmentos...")
+
+    dynamodb = get_resource(REGION)
+    table = dynamodb.Table(TABLE_NAME)
+    index = IndexTable(INDEX_TABLE_NAME, region_name=REGION)
+
+    start = time.time()
+    count = 0
+    unprocessed = 0
+    tag_counts = Counter()
+    try:
+        for page in iter_parallel_scan(table, segments):
+            # Los contadores se escriben al final con el valor absoluto
+            puts, _, _ = index_changes([(None, item) for item in page])
+            unprocessed += index.write(puts, [])
+            for item in page:
+                tag_counts.update(note_tags(item))
+            count += len(page)
+
+        # Tags que ya no usa ninguna nota quedan a 0
+        for item in index.query_partition(TAG_COUNTS_PK):
+            tag_counts.setdefault(item['sk'], 0)
+        unprocessed += index.write(
+            [{'pk': TAG_COUNTS_PK, 'sk': tag, 'count': n} for tag, n in tag_counts.items()], []
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"✓ {count} notas y {len(tag_counts)} tags indexados en {time.time() - start:.2f}s")
+    if unprocessed:
+        print(f"⚠ {unprocessed} entradas sin procesar: vuelve a ejecutar el script")
+
+
+if __name__ == '__main__':
+    main()